@@ -1,5 +1,7 @@
 # FILE: noosphera/api_server/deps.py
 import logging
+from functools import partial
+
 from fastapi import Request, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -8,8 +10,10 @@ from ..db.session import get_session
 from ..security.auth import AuthContext, require_api_key
 
 # chat service factory bits
-from ..repositories.chat_repository import ChatRepository
+from ..repositories.chat_repository import open_chat_repository
 from ..services.chat_service import ChatService
+from ..services.documents import DocumentStore
+from ..services.semantic_cache import SemanticCache
 from ..ports.llm import MockLLM
 from ..ports.llm_provider_adapter import ProviderBackedLLM
 from ..providers.manager import ProviderManager
@@ -66,29 +70,77 @@ def get_provider_manager(
     return ProviderManager(cfg, logger)
 
 
+def _tenant_schema(request: Request) -> str:
+    # Tenant model is attached by require_api_key
+    tenant = getattr(request.state, "tenant", None)
+    if tenant is None or not getattr(tenant, "db_schema_name", None):
+        raise RuntimeError("Tenant context missing or invalid")
+    return tenant.db_schema_name
+
+
+def get_document_store(
+    request: Request,
+    settings: Settings = Depends(get_settings),
+    pm: ProviderManager = Depends(get_provider_manager),
+) -> DocumentStore | None:
+    """
+    The current tenant's document store, or None when chat.documents is disabled (or has
+    no embedding model, or providers are off).
+    """
+    docs = settings.chat.documents
+    if not (docs.enabled and docs.embedding_model and settings.providers.enabled):
+        return None
+    return DocumentStore.from_settings(pm, settings, schema=_tenant_schema(request))
+
+
 async def get_chat_service(
     request: Request,
-    db: AsyncSession = Depends(get_db),
     settings: Settings = Depends(get_settings),
     pm: ProviderManager = Depends(get_provider_manager),
+    documents: DocumentStore | None = Depends(get_document_store),
 ) -> ChatService:
     """
     Construct a ChatService scoped to the current tenant.
-    Chooses LLM adapter based on config toggles.
+    Chooses LLM adapter based on config toggles. The service opens its own short-lived
+    sessions per DB phase, so no request-scoped session is held across the LLM call.
     """
-    # Tenant model is attached by require_api_key
-    tenant = getattr(request.state, "tenant", None)
-    if tenant is None or not getattr(tenant, "db_schema_name", None):
-        raise RuntimeError("Tenant context missing or invalid")
-
-    schema: str = tenant.db_schema_name
-    repo = ChatRepository(session=db, schema=schema)
+    schema = _tenant_schema(request)
 
     if settings.chat.mock_llm_enabled:
         llm = MockLLM()
     elif settings.providers.enabled:
-        llm = ProviderBackedLLM(pm, settings.providers.default_model or None)
+        llm = ProviderBackedLLM(
+            pm,
+            settings.providers.default_model or None,
+            response_cache=getattr(request.app.state, "response_cache", None),
+            cache_scope=schema,
+            deterministic_only=settings.providers.response_cache.deterministic_only,
+        )
     else:
         llm = MockLLM()  # conservative fallback
 
-    return ChatService(repo=repo, llm=llm, settings=settings, schema=schema)
+    semantic = settings.chat.semantic_cache
+    semantic_cache = (
+        SemanticCache(
+            pm,
+            embedding_model=semantic.embedding_model,
+            dimensions=semantic.dimensions,
+            embedding_provider=semantic.embedding_provider,
+            min_similarity=semantic.min_similarity,
+            ttl_s=semantic.ttl_s,
+        )
+        if semantic.enabled and semantic.embedding_model and settings.providers.enabled
+        else None
+    )
+
+    return ChatService(
+        repo_factory=partial(open_chat_repository, schema),
+        llm=llm,
+        settings=settings,
+        schema=schema,
+        history_cache=getattr(request.app.state, "history_cache", None),
+        summarizer=getattr(request.app.state, "summarizer", None),
+        semantic_cache=semantic_cache,
+        memory=getattr(request.app.state, "memory", None),
+        documents=documents,
+    )
@@ -2,6 +2,7 @@
 from __future__ import annotations
 from importlib.metadata import version
 import json
+import logging
 from typing import Any
 
 from fastapi import Depends, FastAPI
@@ -15,9 +16,21 @@ from ..observability.logging import setup_logging
 from ..observability.middleware import RequestContextMiddleware  # NEW
 from ..observability.metrics import make_metrics_app  # NEW
 from ..observability.tracing import setup_tracing  # NEW
+from ..providers.manager import ProviderManager
+from ..services.chat_partitions import ChatPartitionMaintainer
+from ..services.conversation_memory import ConversationMemory
+from ..services.key_usage import KeyUsageRecorder
+from ..services.history_cache import SessionHistoryCache
+from ..providers.response_cache import ResponseCache
+from ..services.session_summary import SessionSummarizer
 from ..services.tenant_manager import TenantManager
+from ..security.access_tokens import AccessTokenIssuer
+from ..security.crypto import configure_crypto_executor, configure_key_hashing, shutdown_crypto_executor
+from ..security.directory import KeyDirectory, libpq_dsn
+from ..security.flood import AuthFloodGuard
+from ..security.key_cache import VerifiedKeyCache
 from ..security.security_schemes import api_key_scheme
-from .routes import health_router, chat_router, models_router, system_router  # NEW
+from .routes import auth_router, health_router, chat_router, documents_router, models_router, system_router  # NEW
 
 
 def _enable_openapi_api_key(app: FastAPI, header_name: str) -> None:
@@ -38,6 +51,13 @@ def _enable_openapi_api_key(app: FastAPI, header_name: str) -> None:
             "in": "header",
             "name": header_name,
         }
+        # Short-lived `nsat_` tokens from POST /api/v1/auth/token
+        openapi_schema["components"]["securitySchemes"]["AccessTokenAuth"] = {
+            "type": "http",
+            "scheme": "bearer",
+            "bearerFormat": "nsat",
+        }
+        openapi_schema["security"] = [{"ApiKeyAuth": []}, {"AccessTokenAuth": []}]
         app.openapi_schema = openapi_schema
         return app.openapi_schema
 
@@ -58,6 +78,23 @@ def create_app() -> FastAPI:
     # Single source of truth for runtime config
     app.state.settings = settings
 
+    # Flood protection for failed API-key attempts (pure in-memory, no DB needed)
+    flood = settings.security.flood
+    app.state.auth_guard = (
+        AuthFloodGuard(
+            negative_ttl_s=flood.negative_ttl_s,
+            prefix_burst=flood.prefix_burst,
+            prefix_refill_per_s=flood.prefix_refill_per_s,
+            ip_burst=flood.ip_burst,
+            ip_refill_per_s=flood.ip_refill_per_s,
+            max_tracked=flood.max_tracked,
+            client_ip_header=flood.client_ip_header,
+            trusted_proxies=flood.trusted_proxies,
+        )
+        if flood.enabled
+        else None
+    )
+
     # Request context middleware (correlation ID + metrics)
     app.add_middleware(
         RequestContextMiddleware,
@@ -76,11 +113,128 @@ def create_app() -> FastAPI:
         # Step 1.2: Initialize database engines & run core migrations
         await init_engines(settings)
         await run_core_migrations(settings)
-        app.state.tenant_manager = TenantManager(get_admin_engine(), get_app_engine())
+        configure_crypto_executor(
+            settings.crypto.executor,
+            max_workers=settings.crypto.max_workers,
+            max_queue=settings.crypto.max_queue,
+        )
+        configure_key_hashing(settings.security.key_pepper)
+        key_cache = (
+            VerifiedKeyCache(
+                ttl_s=settings.security.auth_cache_ttl_s,
+                max_entries=settings.security.auth_cache_max_entries,
+            )
+            if settings.security.auth_cache_enabled
+            else None
+        )
+        usage_recorder = None
+        if settings.security.last_used_flush_interval_s > 0:
+            usage_recorder = KeyUsageRecorder(flush_interval_s=settings.security.last_used_flush_interval_s)
+            usage_recorder.start()
+        app.state.key_usage = usage_recorder
+        directory = None
+        if settings.security.directory_enabled:
+            directory = KeyDirectory(libpq_dsn(settings.database.url))
+            await directory.start()
+        app.state.key_directory = directory
+        chat = settings.chat
+        app.state.history_cache = (
+            SessionHistoryCache(
+                max_messages=chat.history_max_messages,
+                max_sessions=chat.history_cache_max_sessions,
+                max_bytes=chat.history_cache_max_bytes,
+                overlap_s=chat.history_cache_overlap_s,
+            )
+            if chat.history_cache_enabled
+            else None
+        )
+        rcache = settings.providers.response_cache
+        app.state.response_cache = (
+            ResponseCache(ttl_s=rcache.ttl_s, max_entries=rcache.max_entries, max_bytes=rcache.max_bytes)
+            if rcache.enabled
+            else None
+        )
+        app.state.summarizer = (
+            SessionSummarizer(
+                every_turns=chat.summary_every_turns,
+                keep_messages=chat.summary_keep_messages,
+                max_tokens=chat.summary_max_tokens,
+                batch_max_messages=chat.summary_batch_max_messages,
+                model=chat.summary_model,
+                provider=chat.summary_provider,
+                context_windows=chat.context_windows,
+                context_window_default=chat.context_window_default,
+            )
+            if chat.summary_enabled
+            else None
+        )
+        mem = chat.memory
+        memory = None
+        if mem.enabled and mem.embedding_model and settings.providers.enabled:
+            memory = ConversationMemory(
+                ProviderManager(settings, logging.getLogger("noosphera")),
+                embedding_model=mem.embedding_model,
+                dimensions=mem.dimensions,
+                embedding_provider=mem.embedding_provider,
+                top_k=mem.top_k,
+                min_similarity=mem.min_similarity,
+                max_tokens=mem.max_tokens,
+                scope=mem.scope,
+                batch_size=mem.index_batch_size,
+                flush_interval_s=mem.index_flush_interval_s,
+                max_pending=mem.index_max_pending,
+            )
+            memory.start()
+        app.state.memory = memory
+        access_tokens = (
+            AccessTokenIssuer(settings.security.access_token_secret, ttl_s=settings.security.access_token_ttl_s)
+            if settings.security.access_token_secret
+            else None
+        )
+        partitioning = chat.partitioning
+        app.state.tenant_manager = TenantManager(
+            get_admin_engine(),
+            get_app_engine(),
+            key_cache=key_cache,
+            usage_recorder=usage_recorder,
+            directory=directory,
+            access_tokens=access_tokens,
+            chat_partition_months_ahead=partitioning.months_ahead if partitioning.enabled else None,
+        )
+        partitions = None
+        if partitioning.enabled:
+            partitions = ChatPartitionMaintainer(
+                get_admin_engine(),
+                months_ahead=partitioning.months_ahead,
+                retention_months=partitioning.retention_months,
+                interval_s=partitioning.maintenance_interval_s,
+                lock_timeout_s=partitioning.lock_timeout_s,
+            )
+            partitions.start()
+        app.state.chat_partitions = partitions
         return None
 
     @app.on_event("shutdown")
     async def _shutdown() -> None:
+        directory = getattr(app.state, "key_directory", None)
+        if directory is not None:
+            await directory.stop()
+        # Flush buffered key usage before the engines go away
+        usage_recorder = getattr(app.state, "key_usage", None)
+        if usage_recorder is not None:
+            await usage_recorder.stop()
+        # Pending summaries are best-effort; they are redone at the session's next trigger
+        summarizer = getattr(app.state, "summarizer", None)
+        if summarizer is not None:
+            await summarizer.stop()
+        # Index messages still queued for long-term memory
+        memory = getattr(app.state, "memory", None)
+        if memory is not None:
+            await memory.stop()
+        partitions = getattr(app.state, "chat_partitions", None)
+        if partitions is not None:
+            await partitions.stop()
+        shutdown_crypto_executor()
         # Step 1.2: Dispose DB engines
         await dispose_engines()
         return None
@@ -96,9 +250,15 @@ def create_app() -> FastAPI:
     if app.state.settings.features.auth_enabled:
         _enable_openapi_api_key(app, app.state.settings.security.api_key_header)
 
+        # API key -> short-lived access token exchange (needs auth to mean anything)
+        app.include_router(auth_router, prefix="/api/v1", tags=["auth"], dependencies=protected_deps)
+
     # Chat routes (protected)
     app.include_router(chat_router, prefix="/api/v1", tags=["chat"], dependencies=protected_deps)
 
+    # Document store uploads (protected; 404 unless chat.documents is enabled)
+    app.include_router(documents_router, prefix="/api/v1", tags=["documents"], dependencies=protected_deps)
+
     # Models listing (protected)
     app.include_router(models_router, prefix="/api/v1", tags=["models"], dependencies=protected_deps)
 
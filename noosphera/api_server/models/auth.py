@@ -0,0 +1,17 @@
+# FILE: noosphera/api_server/models/auth.py
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class AccessTokenResponse(BaseModel):
+    """
+    Short-lived access token exchanged from an `ns_` API key.
+    Send it as `Authorization: Bearer <access_token>` until `expires_at`.
+    """
+    access_token: str
+    token_type: str = "Bearer"
+    expires_in: int
+    expires_at: datetime
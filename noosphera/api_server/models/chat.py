@@ -20,6 +20,8 @@ class ChatRequest(BaseModel):
     provider: Optional[str] = None
     temperature: Optional[float] = None
     max_tokens: Optional[int] = None
+    cache: bool = True  # false: never answer from (or store in) the response cache
+    collection: Optional[constr(min_length=1, max_length=200)] = None  # ground the reply in this document collection
 
 
 class ChatReply(BaseModel):
@@ -46,3 +48,12 @@ class ChatMessageOut(BaseModel):
     role: Literal["system", "user", "assistant"]
     content: str
     created_at: datetime
+
+
+class ChatSearchHit(BaseModel):
+    id: UUID
+    session_id: UUID
+    role: Literal["system", "user", "assistant"]
+    created_at: datetime
+    rank: float
+    snippet: str  # matching fragments, terms wrapped in <b>...</b>
@@ -0,0 +1,18 @@
+# FILE: noosphera/api_server/models/documents.py
+from __future__ import annotations
+
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class DocumentIngestResponse(BaseModel):
+    document_id: UUID
+    collection: str
+    name: Optional[str] = None
+    chunks: int
+    embedded: int  # chunks sent to the embedding model
+    deduplicated: int  # chunks whose embedding was already stored
+    elapsed_s: float
+    chunks_per_s: float
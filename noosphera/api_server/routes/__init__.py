@@ -3,5 +3,7 @@ from .health import health_router
 from .chat import chat_router  # NEW
 from .models import models_router  # NEW
 from .system import system_router  # NEW (1.6)
+from .auth import auth_router
+from .documents import documents_router
 
-__all__ = ["health_router", "chat_router", "models_router", "system_router"]
+__all__ = ["health_router", "chat_router", "models_router", "system_router", "auth_router", "documents_router"]
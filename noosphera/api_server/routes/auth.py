@@ -0,0 +1,33 @@
+# FILE: noosphera/api_server/routes/auth.py
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from ..models.auth import AccessTokenResponse
+from ...security.auth import AuthContext, require_api_key
+from ...services.tenant_manager import TenantManager
+
+auth_router = APIRouter()
+
+
+@auth_router.post("/auth/token", response_model=AccessTokenResponse, summary="Exchange an API key for an access token")
+async def issue_access_token(
+    request: Request,
+    ctx: AuthContext = Depends(require_api_key),
+) -> AccessTokenResponse:
+    if ctx.auth_method != "api_key":
+        # No self-renewal: refreshing requires the long-lived key, so revocation sticks.
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="An API key is required to issue access tokens")
+    tm: TenantManager = request.app.state.tenant_manager  # type: ignore[attr-defined]
+    if tm.access_tokens is None:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Access tokens not enabled")
+
+    token, exp = tm.access_tokens.issue(request.state.tenant, request.state.api_key)
+    return AccessTokenResponse(
+        access_token=token,
+        expires_in=max(0, exp - int(time.time())),
+        expires_at=datetime.fromtimestamp(exp, tz=timezone.utc),
+    )
@@ -1,75 +1,143 @@
 # FILE: noosphera/api_server/routes/chat.py
 from __future__ import annotations
 
-from typing import Optional
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Optional, Sequence
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Request, Query
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
 
 from ..models.chat import (
     ChatRequest,
     ChatResponse,
     ChatSessionSummary,
     ChatMessageOut,
+    ChatSearchHit,
     ChatReply,
 )
-from ..deps import get_current_tenant, get_db, get_settings, get_chat_service
+from ..deps import get_current_tenant, get_document_store, get_settings, get_chat_service
 from ...config.schema import Settings
+from ...core.cursor import decode_cursor, decode_search_cursor, encode_cursor, encode_search_cursor
+from ...core.errors import IdempotencyInProgressError, IdempotencyKeyReusedError
+from ...repositories.chat_repository import MESSAGE_OUT_FIELDS, SEARCH_OUT_FIELDS, SESSION_OUT_FIELDS
 from ...security.auth import AuthContext
+from ...services.chat_export import (
+    CONTENT_ENCODINGS,
+    NDJSON_MEDIA_TYPE,
+    Compression,
+    ExportStats,
+    check_compression,
+    ndjson_export,
+)
 from ...services.chat_service import ChatService
+from ...services.documents import DocumentStore
 from ...db.engine import get_admin_engine
 
+log = logging.getLogger(__name__)
+
 chat_router = APIRouter()
 
+# Response header carrying the opaque cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _cursor_position(cursor: Optional[str], decode: Callable[[str], tuple] = decode_cursor) -> Optional[Any]:
+    if cursor is None:
+        return None
+    try:
+        return decode(cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+def _rows_response(
+    fields: Sequence[str],
+    rows: Sequence[tuple],
+    position: Optional[tuple],
+    encode: Callable[[Any], str] = encode_cursor,
+) -> Response:
+    """
+    Serialize projected rows straight to JSON (shape of the route's response_model, which
+    stays for the OpenAPI schema) without building and re-validating Pydantic models.
+    """
+    headers = {NEXT_CURSOR_HEADER: encode(position)} if position is not None else None
+    body = to_json([dict(zip(fields, r)) for r in rows])
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 @chat_router.post("/chat", response_model=ChatResponse, summary="Create/continue a session and get assistant reply")
 async def post_chat(
     req: ChatRequest,
     request: Request,
+    response: Response,
     ctx: AuthContext = Depends(get_current_tenant),
-    db: AsyncSession = Depends(get_db),
     settings: Settings = Depends(get_settings),
     svc: ChatService = Depends(get_chat_service),
+    documents: Optional[DocumentStore] = Depends(get_document_store),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255),
 ) -> ChatResponse:
+    if req.collection is not None and documents is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Document store is not enabled")
+
     # 1) ensure per-tenant tables
     await svc.ensure_bootstrap(get_admin_engine())
 
-    # 2) ensure/resolve session
-    session_id = await svc.ensure_session(req.session_id)
-
-    # 3) run turn
-    reply = await svc.run_turn(
-        session_id,
-        incoming_role=req.message.role,
-        incoming_text=req.message.content,
-        model=req.model,
-        provider=req.provider,
-        temperature=req.temperature,
-        max_tokens=req.max_tokens,
-    )
+    # 2) run turn (resolves/creates the session in the same exchange)
+    async def _turn() -> dict:
+        reply = await svc.run_turn(
+            req.session_id,
+            incoming_role=req.message.role,
+            incoming_text=req.message.content,
+            model=req.model,
+            provider=req.provider,
+            temperature=req.temperature,
+            max_tokens=req.max_tokens,
+            cache_enabled=req.cache,
+            collection=req.collection,
+        )
+        return ChatResponse(
+            session_id=reply["session_id"],
+            reply=ChatReply(role=reply["role"], content=reply["content"]),
+            model=reply.get("model"),
+            provider=reply.get("provider"),
+            usage=reply.get("usage"),
+        ).model_dump(mode="json")
 
-    return ChatResponse(
-        session_id=session_id,
-        reply=ChatReply(role=reply["role"], content=reply["content"]),
-        model=reply.get("model"),
-        provider=reply.get("provider"),
-        usage=reply.get("usage"),
-    )
+    if idempotency_key is None:
+        return ChatResponse(**await _turn())
+
+    # Replays return the stored response; concurrent duplicates wait for the original.
+    request_hash = hashlib.sha256(req.model_dump_json().encode("utf-8")).hexdigest()
+    try:
+        body, replayed = await svc.run_idempotent(idempotency_key, request_hash, _turn)
+    except IdempotencyKeyReusedError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    except IdempotencyInProgressError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(exc),
+            headers={"Retry-After": str(max(1, int(exc.retry_after_s)))},
+        ) from exc
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return ChatResponse(**body)
 
 @chat_router.get("/chat/sessions", response_model=list[ChatSessionSummary], summary="List chat sessions (newest first)")
 async def list_chat_sessions(
     request: Request,
     ctx: AuthContext = Depends(get_current_tenant),
-    db: AsyncSession = Depends(get_db),
     settings: Settings = Depends(get_settings),
     svc: ChatService = Depends(get_chat_service),
     limit: int = Query(50, ge=1, le=200),
-) -> list[ChatSessionSummary]:
+    cursor: Optional[str] = Query(None, description=f"Opaque token from the {NEXT_CURSOR_HEADER} header"),
+) -> Response:
     await svc.ensure_bootstrap(get_admin_engine())
-    # Simple list; "before" cursor can be added later if needed
-    items = await svc._repo.list_sessions(limit=limit)
-    return [ChatSessionSummary(**it) for it in items]
+    items, nxt = await svc.list_sessions(limit=limit, after=_cursor_position(cursor))
+    return _rows_response(SESSION_OUT_FIELDS, items, nxt)
 
 
 @chat_router.get(
@@ -81,15 +149,85 @@ async def get_session_messages(
     session_id: UUID,
     request: Request,
     ctx: AuthContext = Depends(get_current_tenant),
-    db: AsyncSession = Depends(get_db),
     settings: Settings = Depends(get_settings),
     svc: ChatService = Depends(get_chat_service),
     limit: int = Query(100, ge=1, le=500),
-    before: Optional[UUID] = Query(None),
-) -> list[ChatMessageOut]:
+    cursor: Optional[str] = Query(None, description=f"Opaque token from the {NEXT_CURSOR_HEADER} header"),
+    before: Optional[UUID] = Query(None, description="Deprecated: message id to page back from; use cursor"),
+) -> Response:
+    await svc.ensure_bootstrap(get_admin_engine())
+    rows, nxt = await svc.list_messages(
+        session_id, limit=limit, before=before, after=_cursor_position(cursor)
+    )
+    return _rows_response(MESSAGE_OUT_FIELDS, rows, nxt)
+
+
+@chat_router.get(
+    "/chat/search",
+    response_model=list[ChatSearchHit],
+    summary="Full-text search over the tenant's messages (best match first)",
+)
+async def search_chat_messages(
+    request: Request,
+    ctx: AuthContext = Depends(get_current_tenant),
+    svc: ChatService = Depends(get_chat_service),
+    q: str = Query(..., min_length=1, max_length=500, description='Web-search syntax: words, "phrase", or, -word'),
+    session_id: Optional[UUID] = Query(None, description="Search within one session"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description=f"Opaque token from the {NEXT_CURSOR_HEADER} header"),
+) -> Response:
+    await svc.ensure_bootstrap(get_admin_engine())
+    rows, nxt = await svc.search_messages(
+        q, session_id=session_id, limit=limit, after=_cursor_position(cursor, decode_search_cursor)
+    )
+    return _rows_response(SEARCH_OUT_FIELDS, rows, nxt, encode_search_cursor)
+
+
+@chat_router.get(
+    "/chat/export",
+    response_class=StreamingResponse,
+    summary="Stream the tenant's chat history as NDJSON",
+)
+async def export_chat_history(
+    request: Request,
+    ctx: AuthContext = Depends(get_current_tenant),
+    svc: ChatService = Depends(get_chat_service),
+    session_id: Optional[UUID] = Query(None, description="Export a single session"),
+    since: Optional[datetime] = Query(None, description="Only messages created at or after this instant"),
+    compression: Compression = Query("none", description="Sent as Content-Encoding"),
+) -> StreamingResponse:
     await svc.ensure_bootstrap(get_admin_engine())
-    exists = await svc._repo.get_session_exists(session_id)
-    if not exists:
-        return []
-    rows = await svc._repo.fetch_session_messages(session_id, limit=limit, before=before)
-    return [ChatMessageOut(**r) for r in rows]
+    try:
+        check_compression(compression)
+    except (ValueError, RuntimeError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    stats = ExportStats()
+
+    async def _body() -> AsyncIterator[bytes]:
+        # One pooled connection is held until the client has read everything.
+        try:
+            async for chunk in ndjson_export(
+                svc.iter_transcript(session_id=session_id, since=since), compression=compression, stats=stats
+            ):
+                yield chunk
+        finally:
+            log.info(
+                "chat_export_finished",
+                extra={
+                    "tenant_id": str(ctx.tenant_id),
+                    "sessions": stats.sessions,
+                    "messages": stats.messages,
+                    "raw_bytes": stats.raw_bytes,
+                    "out_bytes": stats.out_bytes,
+                    "elapsed_s": round(stats.elapsed_s, 3),
+                    "rows_per_s": round(stats.rows_per_s, 1),
+                    "mb_per_s": round(stats.mb_per_s, 2),
+                },
+            )
+
+    headers = {"Content-Disposition": f'attachment; filename="chat-{ctx.tenant_id}.ndjson"'}
+    encoding = CONTENT_ENCODINGS[compression]
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return StreamingResponse(_body(), media_type=NDJSON_MEDIA_TYPE, headers=headers)
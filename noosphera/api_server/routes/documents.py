@@ -0,0 +1,80 @@
+# FILE: noosphera/api_server/routes/documents.py
+from __future__ import annotations
+
+import logging
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+
+from ..deps import get_current_tenant, get_document_store, get_settings
+from ..models.documents import DocumentIngestResponse
+from ...config.schema import Settings
+from ...db.engine import get_admin_engine
+from ...security.auth import AuthContext
+from ...services.chunking import decode_lines
+from ...services.documents import DocumentStore, IngestStats
+
+log = logging.getLogger(__name__)
+
+documents_router = APIRouter()
+
+
+@documents_router.post(
+    "/documents",
+    response_model=DocumentIngestResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Upload a text document (raw UTF-8 body) into a collection",
+)
+async def upload_document(
+    request: Request,
+    ctx: AuthContext = Depends(get_current_tenant),
+    settings: Settings = Depends(get_settings),
+    store: Optional[DocumentStore] = Depends(get_document_store),
+    collection: str = Query(..., min_length=1, max_length=200),
+    name: Optional[str] = Query(None, max_length=500, description="Shown with retrieved chunks"),
+) -> DocumentIngestResponse:
+    if store is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document store is not enabled")
+    limit = settings.chat.documents.max_upload_bytes
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > limit:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Document too large")
+    await store.ensure_bootstrap(get_admin_engine())
+
+    async def _body() -> AsyncIterator[bytes]:
+        # The body is chunked as it arrives; it is never held in memory whole.
+        received = 0
+        async for data in request.stream():
+            received += len(data)
+            if received > limit:
+                raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Document too large")
+            yield data
+
+    stats = IngestStats()
+    try:
+        await store.ingest(decode_lines(_body()), collection=collection, name=name, stats=stats)
+    finally:
+        log.info(
+            "document_ingest_finished",
+            extra={
+                "tenant_id": str(ctx.tenant_id),
+                "document_id": str(stats.document_id),
+                "collection": collection,
+                "chunks": stats.chunks,
+                "embedded": stats.embedded,
+                "deduplicated": stats.deduplicated,
+                "elapsed_s": round(stats.elapsed_s, 3),
+                "chunks_per_s": round(stats.chunks_per_s, 1),
+                "complete": stats.finished is not None,
+            },
+        )
+    return DocumentIngestResponse(
+        document_id=stats.document_id,
+        collection=collection,
+        name=name,
+        chunks=stats.chunks,
+        embedded=stats.embedded,
+        deduplicated=stats.deduplicated,
+        elapsed_s=stats.elapsed_s,
+        chunks_per_s=stats.chunks_per_s,
+    )
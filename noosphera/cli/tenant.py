@@ -2,11 +2,24 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import logging
+import os
+import sys
 from datetime import datetime
+from typing import AsyncIterator
 from uuid import UUID
 
 from ..config.loader import load_settings
 from ..db.engine import get_admin_engine, get_app_engine, init_engines, run_core_migrations
+from ..db.models.core import KeyStatus, TenantStatus
+from ..db.tenant_chat_bootstrap import build_search_index
+from ..repositories.chat_repository import open_chat_repository
+from ..security.crypto import HMAC_SCHEME, configure_key_hashing
+from ..services.chat_export import ExportStats, check_compression, ndjson_export
+from ..services.chat_import import import_transcript, open_ndjson
+from ..providers.manager import ProviderManager
+from ..services.chat_partitions import ChatPartitionMaintainer
+from ..services.documents import DocumentStore
 from ..services.tenant_manager import TenantManager
 
 
@@ -20,7 +33,13 @@ async def _ensure_ready() -> TenantManager:
     settings = load_settings()
     await init_engines(settings)
     await run_core_migrations(settings)  # idempotent
-    return TenantManager(get_admin_engine(), get_app_engine())
+    configure_key_hashing(settings.security.key_pepper)
+    partitioning = settings.chat.partitioning
+    return TenantManager(
+        get_admin_engine(),
+        get_app_engine(),
+        chat_partition_months_ahead=partitioning.months_ahead if partitioning.enabled else None,
+    )
 
 
 async def _cmd_create_tenant(name: str) -> int:
@@ -56,6 +75,142 @@ async def _cmd_revoke_key(prefix: str) -> int:
     return 0
 
 
+async def _cmd_set_tenant_status(tenant: UUID, status: TenantStatus) -> int:
+    tm = await _ensure_ready()
+    await tm.set_tenant_status(tenant, status)
+    print(f"TENANT {status.value.upper()}: {tenant}")
+    return 0
+
+
+async def _cmd_set_chat_retention(tenant: UUID, months: int | None) -> int:
+    tm = await _ensure_ready()
+    await tm.set_chat_retention(tenant, months)
+    shown = "default" if months is None else ("forever" if months == 0 else f"{months} months")
+    print(f"CHAT RETENTION {tenant}: {shown}")
+    return 0
+
+
+async def _cmd_maintain_chat_partitions() -> int:
+    await _ensure_ready()
+    partitioning = load_settings().chat.partitioning
+    report = await ChatPartitionMaintainer(
+        get_admin_engine(),
+        months_ahead=partitioning.months_ahead,
+        retention_months=partitioning.retention_months,
+        lock_timeout_s=partitioning.lock_timeout_s,
+    ).run_once()
+    for name in report.created:
+        print(f"CREATED {name}")
+    for name in report.dropped:
+        print(f"DROPPED {name}")
+    for schema in report.failed:
+        print(f"FAILED  {schema}")
+    return 1 if report.failed else 0
+
+
+async def _cmd_export(
+    tenant: UUID, session: UUID | None, since: str | None, output: str, compression: str | None
+) -> int:
+    tm = await _ensure_ready()
+    t = await tm.get_tenant(tenant)
+    if compression is None:
+        compression = "gzip" if output.endswith(".gz") else "zstd" if output.endswith(".zst") else "none"
+    check_compression(compression)
+    await tm.ensure_chat_tables(t.db_schema_name)
+    stats = ExportStats()
+    out = sys.stdout.buffer if output == "-" else open(output, "wb")
+    try:
+        async with open_chat_repository(t.db_schema_name) as repo:
+            rows = repo.iter_transcript(
+                session_id=session,
+                since=datetime.fromisoformat(since) if since else None,
+                batch_size=load_settings().chat.export_batch_size,
+            )
+            async for chunk in ndjson_export(rows, compression=compression, stats=stats):  # type: ignore[arg-type]
+                out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    print(f"EXPORTED {stats.describe()}", file=sys.stderr)
+    return 0
+
+
+async def _cmd_import(
+    tenant: UUID, input_path: str, batch_rows: int, defer_indexes: bool, skip_existing: bool
+) -> int:
+    tm = await _ensure_ready()
+    t = await tm.get_tenant(tenant)
+    await tm.ensure_chat_tables(t.db_schema_name)
+    src = open_ndjson(input_path)
+    try:
+        stats = await import_transcript(
+            get_admin_engine(),
+            t.db_schema_name,
+            src,
+            batch_rows=batch_rows,
+            defer_indexes=defer_indexes,
+            skip_existing=skip_existing,
+        )
+    finally:
+        if src is not sys.stdin.buffer:
+            src.close()
+    print(f"IMPORTED {stats.describe()}", file=sys.stderr)
+    return 0
+
+
+async def _read_lines(path: str) -> AsyncIterator[str]:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            yield line
+
+
+async def _cmd_ingest(tenant: UUID, collection: str, paths: list[str]) -> int:
+    tm = await _ensure_ready()
+    t = await tm.get_tenant(tenant)
+    settings = load_settings()
+    if not settings.providers.enabled:
+        print("providers are disabled; documents cannot be embedded", file=sys.stderr)
+        return 1
+    store = DocumentStore.from_settings(
+        ProviderManager(settings, logging.getLogger("noosphera")), settings, schema=t.db_schema_name
+    )
+    await store.ensure_bootstrap(get_admin_engine())
+    for path in paths:
+        stats = await store.ingest(_read_lines(path), collection=collection, name=os.path.basename(path))
+        print(f"INGESTED {path} -> {stats.document_id}: {stats.describe()}", file=sys.stderr)
+    return 0
+
+
+async def _cmd_build_search_index(tenant: UUID | None) -> int:
+    tm = await _ensure_ready()
+    tenants = [await tm.get_tenant(tenant)] if tenant is not None else await tm.list_tenants()
+    failed = 0
+    for t in tenants:
+        try:
+            await tm.ensure_chat_tables(t.db_schema_name)
+            built = await build_search_index(get_admin_engine(), t.db_schema_name)
+        except Exception as exc:
+            failed += 1
+            print(f"FAILED  {t.db_schema_name}: {exc}")
+            continue
+        print(f"{'BUILT' if built else 'OK'}     {t.db_schema_name}  {' '.join(built)}".rstrip())
+    return 1 if failed else 0
+
+
+async def _cmd_key_hash_status() -> int:
+    tm = await _ensure_ready()
+    rows = await tm.key_hash_report()
+    print("API KEY HASHES (scheme, status, count)")
+    for scheme, status, count in rows:
+        print(f"{scheme:<12} {status.value:<8} {count}")
+    active = [(sc, n) for sc, st, n in rows if st == KeyStatus.active]
+    total = sum(n for _, n in active)
+    done = sum(n for sc, n in active if sc == HMAC_SCHEME)
+    pct = 100.0 * done / total if total else 100.0
+    print(f"active keys migrated to {HMAC_SCHEME}: {done}/{total} ({pct:.1f}%)")
+    return 0
+
+
 def main(argv: list[str] | None = None) -> int:
     p = argparse.ArgumentParser(prog="noosphera-tenant", description="Tenant admin CLI")
     sub = p.add_subparsers(dest="cmd", required=True)
@@ -73,6 +228,57 @@ def main(argv: list[str] | None = None) -> int:
     p_rk = sub.add_parser("revoke-key", help="Revoke an API key by prefix")
     p_rk.add_argument("--prefix", required=True)
 
+    p_st = sub.add_parser("suspend-tenant", help="Suspend a tenant (its keys stop authenticating)")
+    p_st.add_argument("--tenant", required=True, type=UUID)
+
+    p_at = sub.add_parser("activate-tenant", help="Re-activate a suspended tenant")
+    p_at.add_argument("--tenant", required=True, type=UUID)
+
+    sub.add_parser("key-hash-status", help="Report API key hash schemes (bcrypt -> HMAC migration)")
+
+    p_ex = sub.add_parser("export", help="Stream a tenant's chat history as NDJSON")
+    p_ex.add_argument("--tenant", required=True, type=UUID)
+    p_ex.add_argument("--session", required=False, type=UUID, default=None, help="Export a single session")
+    p_ex.add_argument("--since", required=False, default=None, help="ISO date/time; only newer messages")
+    p_ex.add_argument("--output", "-o", default="-", help="File path (default: stdout)")
+    p_ex.add_argument(
+        "--compression",
+        choices=["none", "gzip", "zstd"],
+        default=None,
+        help="Default: from the output suffix (.gz, .zst), else none",
+    )
+
+    p_im = sub.add_parser("import", help="Bulk-load NDJSON chat transcripts (export format) with COPY")
+    p_im.add_argument("--tenant", required=True, type=UUID)
+    p_im.add_argument("--input", "-i", default="-", help="File path, .gz/.zst decompressed (default: stdin)")
+    p_im.add_argument("--batch-rows", type=int, default=50_000, help="Rows per COPY transaction")
+    p_im.add_argument(
+        "--defer-indexes", action="store_true", help="Drop secondary indexes during the load, rebuild after"
+    )
+    p_im.add_argument("--skip-existing", action="store_true", help="Skip rows whose id already exists")
+
+    p_in = sub.add_parser("ingest", help="Chunk, embed and store text documents in a collection")
+    p_in.add_argument("--tenant", required=True, type=UUID)
+    p_in.add_argument("--collection", required=True)
+    p_in.add_argument("paths", nargs="+", metavar="PATH", help="UTF-8 text files")
+
+    p_si = sub.add_parser(
+        "build-search-index",
+        help="Build the chat full-text search index concurrently (all tenants by default). Tenants "
+        "created before search existed have no index until this is run.",
+    )
+    p_si.add_argument("--tenant", required=False, type=UUID, default=None)
+
+    p_cr = sub.add_parser("set-chat-retention", help="Months of chat history kept (partitioned tenants)")
+    p_cr.add_argument("--tenant", required=True, type=UUID)
+    g_cr = p_cr.add_mutually_exclusive_group(required=True)
+    g_cr.add_argument("--months", type=int, help="whole months kept; 0 = keep everything")
+    g_cr.add_argument("--default", action="store_true", help="use chat.partitioning.retention_months")
+
+    sub.add_parser(
+        "maintain-chat-partitions", help="Create upcoming chat partitions and drop expired ones now"
+    )
+
     args = p.parse_args(argv)
 
     if args.cmd == "create-tenant":
@@ -83,6 +289,26 @@ def main(argv: list[str] | None = None) -> int:
         return asyncio.run(_cmd_create_key(args.tenant, args.name, args.expires))
     if args.cmd == "revoke-key":
         return asyncio.run(_cmd_revoke_key(args.prefix))
+    if args.cmd == "suspend-tenant":
+        return asyncio.run(_cmd_set_tenant_status(args.tenant, TenantStatus.suspended))
+    if args.cmd == "activate-tenant":
+        return asyncio.run(_cmd_set_tenant_status(args.tenant, TenantStatus.active))
+    if args.cmd == "key-hash-status":
+        return asyncio.run(_cmd_key_hash_status())
+    if args.cmd == "export":
+        return asyncio.run(_cmd_export(args.tenant, args.session, args.since, args.output, args.compression))
+    if args.cmd == "import":
+        return asyncio.run(
+            _cmd_import(args.tenant, args.input, args.batch_rows, args.defer_indexes, args.skip_existing)
+        )
+    if args.cmd == "ingest":
+        return asyncio.run(_cmd_ingest(args.tenant, args.collection, args.paths))
+    if args.cmd == "build-search-index":
+        return asyncio.run(_cmd_build_search_index(args.tenant))
+    if args.cmd == "set-chat-retention":
+        return asyncio.run(_cmd_set_chat_retention(args.tenant, None if args.default else args.months))
+    if args.cmd == "maintain-chat-partitions":
+        return asyncio.run(_cmd_maintain_chat_partitions())
 
     print("Unknown command")
     return 2
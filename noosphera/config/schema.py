@@ -1,6 +1,8 @@
 # FILE: noosphera/config/schema.py
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic import BaseModel, ConfigDict, Field
 
 
@@ -45,6 +47,16 @@ class OllamaSettings(BaseModel):
     default_model: str | None = Field(default=None)
 
 
+# Exact-match cache of completions, per tenant, with coalescing of identical in-flight requests
+class ResponseCacheSettings(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    enabled: bool = Field(default=True)
+    deterministic_only: bool = Field(default=True)  # only cache requests with temperature == 0
+    ttl_s: float = Field(default=300.0, gt=0)
+    max_entries: int = Field(default=10_000, ge=1)
+    max_bytes: int = Field(default=64 * 1024 * 1024, ge=0)
+
+
 class ProvidersSettings(BaseModel):
     model_config = ConfigDict(extra="ignore")
     enabled: bool = Field(default=False)
@@ -52,6 +64,7 @@ class ProvidersSettings(BaseModel):
     default_model: str | None = Field(default=None)
     openai: OpenAISettings = Field(default_factory=OpenAISettings)
     ollama: OllamaSettings = Field(default_factory=OllamaSettings)
+    response_cache: ResponseCacheSettings = Field(default_factory=ResponseCacheSettings)
 
 
 class FeatureFlags(BaseModel):
@@ -59,10 +72,103 @@ class FeatureFlags(BaseModel):
     auth_enabled: bool = Field(default=False)
 
 
+# Flood protection for failed API-key attempts (checked before DB/bcrypt)
+class AuthFloodSettings(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    enabled: bool = Field(default=True)
+    negative_ttl_s: float = Field(default=300.0, gt=0)
+    prefix_burst: int = Field(default=10, ge=1)
+    prefix_refill_per_s: float = Field(default=0.2, ge=0)
+    ip_burst: int = Field(default=30, ge=1)
+    ip_refill_per_s: float = Field(default=0.5, ge=0)
+    max_tracked: int = Field(default=100_000, ge=1)
+    # Behind a proxy/load balancer: take the client IP from this header (e.g. X-Forwarded-For)
+    # when the peer is one of trusted_proxies (CIDRs); otherwise all clients share its IP.
+    client_ip_header: str | None = Field(default=None)
+    trusted_proxies: list[str] = Field(default_factory=list)
+
+
 # NEW (Step 1.3): security settings surface
 class SecuritySettings(BaseModel):
     model_config = ConfigDict(extra="ignore")
     api_key_header: str = Field(default="X-Noosphera-API-Key")
+    # In-process cache of verified API keys (skips DB + bcrypt on hits)
+    auth_cache_enabled: bool = Field(default=True)
+    auth_cache_ttl_s: float = Field(default=60.0, gt=0)
+    auth_cache_max_entries: int = Field(default=10_000, ge=1)
+    # Write-behind interval for api_keys.last_used_at (0 = update inline per request)
+    last_used_flush_interval_s: float = Field(default=5.0, ge=0)
+    # Per-worker replica of the key directory kept coherent via LISTEN/NOTIFY
+    directory_enabled: bool = Field(default=False)
+    # Server-side pepper for HMAC-SHA256 key hashes (empty = keep issuing bcrypt hashes)
+    key_pepper: str | None = Field(default=None)
+    # HMAC secret for short-lived `nsat_` access tokens (empty = token exchange disabled).
+    # Revocation denylists are per worker; they reach other workers only via the directory.
+    access_token_secret: str | None = Field(default=None)
+    access_token_ttl_s: int = Field(default=300, ge=1)
+    flood: AuthFloodSettings = Field(default_factory=AuthFloodSettings)
+
+
+# Dedicated executor for bcrypt hashing/verification
+class CryptoSettings(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    executor: Literal["thread", "process"] = Field(default="thread")
+    max_workers: int = Field(default=4, ge=1)
+    max_queue: int = Field(default=64, ge=0)
+
+
+# Embedding-based answer cache per tenant (pgvector, HNSW); needs providers.enabled
+class SemanticCacheSettings(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    enabled: bool = Field(default=False)
+    embedding_provider: str | None = Field(default=None)  # defaults to providers.default_provider
+    embedding_model: str | None = Field(default=None)
+    dimensions: int = Field(default=1536, ge=1, le=2000)  # HNSW indexes vectors up to 2000 dims
+    min_similarity: float = Field(default=0.95, gt=0, le=1)  # cosine similarity to serve a hit
+    ttl_s: float = Field(default=86_400.0, gt=0)
+
+
+# Long-term memory: older messages recalled by embedding similarity (pgvector, HNSW)
+class ChatMemorySettings(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    enabled: bool = Field(default=False)
+    embedding_provider: str | None = Field(default=None)  # defaults to providers.default_provider
+    embedding_model: str | None = Field(default=None)
+    dimensions: int = Field(default=1536, ge=1, le=2000)
+    scope: Literal["session", "tenant"] = Field(default="session")  # tenant: across all sessions
+    top_k: int = Field(default=4, ge=1, le=50)
+    min_similarity: float = Field(default=0.5, gt=0, le=1)
+    max_tokens: int = Field(default=1024, ge=16)  # at most half the prompt budget is used
+    index_batch_size: int = Field(default=64, ge=1)
+    index_flush_interval_s: float = Field(default=1.0, gt=0)
+    index_max_pending: int = Field(default=10000, ge=1)
+
+
+# Tenant document store for retrieval-augmented chat (chunks embedded into pgvector)
+class ChatDocumentSettings(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    enabled: bool = Field(default=False)
+    embedding_provider: str | None = Field(default=None)  # defaults to providers.default_provider
+    embedding_model: str | None = Field(default=None)
+    dimensions: int = Field(default=1536, ge=1, le=2000)
+    chunk_tokens: int = Field(default=400, ge=16)
+    chunk_overlap_tokens: int = Field(default=40, ge=0)  # capped at half of chunk_tokens
+    embed_batch_size: int = Field(default=128, ge=1)  # chunks per embedding request (and COPY batch)
+    top_k: int = Field(default=5, ge=1, le=50)
+    min_similarity: float = Field(default=0.3, gt=0, le=1)
+    max_tokens: int = Field(default=2048, ge=16)  # at most half the prompt budget is used
+    ef_search: int = Field(default=100, ge=1, le=1000)  # HNSW candidate list per retrieval
+    max_upload_bytes: int = Field(default=20 * 1024 * 1024, ge=1)
+
+
+# Month-partitioned chat_messages for new tenant schemas, with partition-drop retention
+class ChatPartitioningSettings(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    enabled: bool = Field(default=False)
+    months_ahead: int = Field(default=3, ge=1)  # partitions kept ready beyond the current month
+    retention_months: int = Field(default=0, ge=0)  # default per tenant; 0 = keep everything
+    maintenance_interval_s: float = Field(default=3600.0, gt=0)
+    lock_timeout_s: float = Field(default=5.0, gt=0)  # DETACH waits at most this for its lock
 
 
 # NEW (Step 1.4): chat settings surface
@@ -70,6 +176,32 @@ class ChatSettings(BaseModel):
     model_config = ConfigDict(extra="ignore")
     history_max_messages: int = Field(default=20, ge=1)
     mock_llm_enabled: bool = Field(default=True)
+    # Token-budgeted context: history is trimmed to context window - reply reserve
+    context_window_default: int = Field(default=8192, ge=256)
+    context_windows: dict[str, int] = Field(default_factory=dict)  # model (or prefix) -> tokens
+    reply_reserve_tokens: int = Field(default=1024, ge=1)  # used when a request sets no max_tokens
+    # Per-worker cache of recent messages per session (context assembly without a full re-read)
+    history_cache_enabled: bool = Field(default=True)
+    history_cache_max_sessions: int = Field(default=10000, ge=1)
+    history_cache_max_bytes: int = Field(default=64 * 1024 * 1024, ge=0)
+    history_cache_overlap_s: float = Field(default=2.0, ge=0)
+    # Rolling per-session summary of older messages, refreshed in the background
+    summary_enabled: bool = Field(default=False)
+    summary_every_turns: int = Field(default=5, ge=1)
+    summary_keep_messages: int = Field(default=6, ge=0)  # newest messages always sent verbatim
+    summary_max_tokens: int = Field(default=512, ge=16)
+    summary_batch_max_messages: int = Field(default=200, ge=1)
+    summary_model: str | None = Field(default=None)  # defaults to the turn's model/provider
+    summary_provider: str | None = Field(default=None)
+    semantic_cache: SemanticCacheSettings = Field(default_factory=SemanticCacheSettings)
+    memory: ChatMemorySettings = Field(default_factory=ChatMemorySettings)
+    documents: ChatDocumentSettings = Field(default_factory=ChatDocumentSettings)
+    # Idempotency-Key handling for POST /chat
+    idempotency_ttl_s: float = Field(default=86_400.0, gt=0)  # how long replays are served
+    idempotency_wait_s: float = Field(default=30.0, ge=0)  # duplicate waits for the original, then 409
+    idempotency_lease_s: float = Field(default=300.0, gt=0)  # pending older than this is taken over
+    partitioning: ChatPartitioningSettings = Field(default_factory=ChatPartitioningSettings)
+    export_batch_size: int = Field(default=2000, ge=1)  # rows per server-side cursor fetch
 
 
 # NEW (Step 1.6): metrics settings
@@ -105,6 +237,7 @@ class Settings(BaseModel):
     database: DatabaseSettings
     providers: ProvidersSettings
     security: SecuritySettings  # NEW (Step 1.3)
+    crypto: CryptoSettings
     features: FeatureFlags
     chat: ChatSettings  # NEW (Step 1.4)
     metrics: MetricsSettings  # NEW (Step 1.6)
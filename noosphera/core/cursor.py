@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+
+# Keyset position of a row: (created_at, id), the order every listing is sorted by.
+Position = tuple[datetime, UUID]
+
+# Keyset position of a search hit: (rank, created_at, id), the order search results are sorted by.
+SearchPosition = tuple[float, datetime, UUID]
+
+
+def _fields(token: str, n: int) -> list[str]:
+    """The `n` string fields of a page token; ValueError for anything else."""
+    raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    fields = json.loads(raw)
+    if not isinstance(fields, list) or len(fields) != n or not all(isinstance(f, str) for f in fields):
+        raise ValueError("unexpected cursor shape")
+    return fields
+
+
+def encode_cursor(position: Position) -> str:
+    """Opaque, URL-safe page token for the row at `position`."""
+    created_at, row_id = position
+    raw = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str) -> Position:
+    """Inverse of `encode_cursor`. Raises ValueError for malformed tokens."""
+    try:
+        ts, row_id = _fields(token, 2)
+        created_at = datetime.fromisoformat(ts)
+        if created_at.tzinfo is None:
+            raise ValueError("naive timestamp")
+        return created_at, UUID(row_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def encode_search_cursor(position: SearchPosition) -> str:
+    """Opaque page token for the search hit at `position`; the rank round-trips exactly."""
+    rank, created_at, row_id = position
+    raw = json.dumps([float(rank).hex(), created_at.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_search_cursor(token: str) -> SearchPosition:
+    """Inverse of `encode_search_cursor`. Raises ValueError for malformed tokens."""
+    try:
+        rank, ts, row_id = _fields(token, 3)
+        created_at = datetime.fromisoformat(ts)
+        if created_at.tzinfo is None:
+            raise ValueError("naive timestamp")
+        return float.fromhex(rank), created_at, UUID(row_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
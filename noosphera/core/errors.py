@@ -8,3 +8,27 @@ class ConfigError(NoospheraError):
 
 class StartupError(NoospheraError):
     """Application startup error."""
+
+
+class CryptoSaturatedError(NoospheraError):
+    """Crypto executor queue is full; caller should back off and retry."""
+
+
+class IdempotencyKeyReusedError(NoospheraError):
+    """An Idempotency-Key was sent again with a different request body."""
+
+
+class IdempotencyInProgressError(NoospheraError):
+    """The original request for an Idempotency-Key is still running; retry later."""
+
+    def __init__(self, message: str, *, retry_after_s: float) -> None:
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
+
+
+class AuthThrottledError(NoospheraError):
+    """Too many failed authentication attempts; retry after `retry_after_s` seconds."""
+
+    def __init__(self, message: str, *, retry_after_s: float) -> None:
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
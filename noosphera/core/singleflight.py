@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesce concurrent async calls sharing a key into a single execution.
+
+    The first caller (leader) runs `fn`; callers arriving while it is in flight await the
+    same outcome (result or exception). Nothing is retained once the call completes.
+    If the leader is cancelled, a waiting caller takes over instead of failing.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Future[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """
+        Run `fn` once per key at a time. Returns (result, shared) where `shared` is True
+        when the result came from another caller's execution.
+        """
+        while True:
+            fut = self._inflight.get(key)
+            if fut is None:
+                break
+            try:
+                return await asyncio.shield(fut), True
+            except asyncio.CancelledError:
+                if fut.cancelled():
+                    continue  # leader went away; retry as leader
+                raise
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            res = await fn()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except BaseException as exc:
+            fut.set_exception(exc)
+            fut.exception()  # mark retrieved; waiters (if any) re-raise it
+            raise
+        else:
+            fut.set_result(res)
+            return res, False
+        finally:
+            self._inflight.pop(key, None)
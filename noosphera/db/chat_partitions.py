@@ -0,0 +1,164 @@
+# FILE: noosphera/db/chat_partitions.py
+# RATIONALE:
+# A partitioned chat_messages (see CHAT_PARTITIONED_LAYOUT) has one partition per UTC month,
+# named chat_messages_pYYYYMM. Partitions are created ahead of time so inserts never land in
+# the default partition (a default partition holding rows of a month blocks creating that
+# month's partition), and retention drops whole months: DETACH + DROP is a catalog operation,
+# not a long DELETE that bloats every index. All functions serialize on the same advisory
+# lock as layout upgrades and are no-ops for schemas with a plain chat_messages.
+from __future__ import annotations
+
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from .tenancy import _validate_schema_name
+
+log = logging.getLogger(__name__)
+
+_PARTITION_RE = re.compile(r"^chat_messages_p(\d{4})(\d{2})$")
+
+
+def month_start(ts: datetime) -> datetime:
+    """First instant (UTC) of the month containing `ts`."""
+    ts = ts.astimezone(timezone.utc)
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, n: int) -> datetime:
+    """`month` (a month start) moved by `n` months."""
+    idx = month.year * 12 + (month.month - 1) + n
+    return month.replace(year=idx // 12, month=idx % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"chat_messages_p{month:%Y%m}"
+
+
+async def _lock(conn: AsyncConnection, schema: str) -> None:
+    await conn.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext('noosphera.layout'), hashtext(:s))"), {"s": schema}
+    )
+
+
+async def is_partitioned(conn: AsyncConnection, schema: str) -> bool:
+    """True if `schema`.chat_messages is a partitioned table."""
+    res = await conn.execute(
+        text(
+            "SELECT 1 FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = :s AND c.relname = 'chat_messages' AND c.relkind = 'p'"
+        ),
+        {"s": schema},
+    )
+    return res.first() is not None
+
+
+async def list_month_partitions(conn: AsyncConnection, schema: str) -> dict[datetime, str]:
+    """Attached monthly partitions of `schema`.chat_messages: month start -> partition name."""
+    res = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "JOIN pg_namespace n ON n.oid = p.relnamespace "
+            "WHERE n.nspname = :s AND p.relname = 'chat_messages'"
+        ),
+        {"s": schema},
+    )
+    months: dict[datetime, str] = {}
+    for (name,) in res:
+        m = _PARTITION_RE.match(name)
+        if m:
+            months[datetime(int(m.group(1)), int(m.group(2)), 1, tzinfo=timezone.utc)] = name
+    return months
+
+
+async def create_partitions_for(conn: AsyncConnection, schema: str, months: Iterable[datetime]) -> list[str]:
+    """
+    Create the partitions of the months containing `months` that do not exist yet. Returns
+    the names created. A month whose rows already sit in the default partition is skipped
+    with a warning (it cannot be attached without moving them).
+    """
+    _validate_schema_name(schema)
+    await _lock(conn, schema)
+    if not await is_partitioned(conn, schema):
+        return []
+    existing = await list_month_partitions(conn, schema)
+    created: list[str] = []
+    for month in sorted({month_start(m) for m in months}):
+        if month in existing:
+            continue
+        name = partition_name(month)
+        try:
+            async with conn.begin_nested():
+                await conn.execute(
+                    text(
+                        f'CREATE TABLE IF NOT EXISTS "{schema}".{name} PARTITION OF "{schema}".chat_messages '
+                        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+                    )
+                )
+        except Exception as exc:
+            log.warning("chat partition %s.%s not created: %s", schema, name, exc)
+            continue
+        created.append(name)
+    return created
+
+
+async def create_month_partitions(
+    conn: AsyncConnection, schema: str, *, months_ahead: int, now: Optional[datetime] = None
+) -> list[str]:
+    """Create the missing partitions of the current month and the `months_ahead` following."""
+    first = month_start(now or datetime.now(timezone.utc))
+    return await create_partitions_for(conn, schema, (add_months(first, i) for i in range(int(months_ahead) + 1)))
+
+
+async def drop_expired_partitions(
+    conn: AsyncConnection,
+    schema: str,
+    *,
+    retention_months: int,
+    now: Optional[datetime] = None,
+    lock_timeout_s: float = 5.0,
+) -> list[str]:
+    """
+    Detach and drop monthly partitions that ended more than `retention_months` whole months
+    before the current month (so at least that many full months are kept). Returns the
+    names dropped. The default partition is never touched. Long-term memory vectors of the
+    dropped months (message_embeddings, which has no foreign key to the partitions) are
+    deleted in the same transaction, before chat_messages is locked.
+
+    DETACH briefly locks chat_messages exclusively; `lock_timeout_s` bounds how long it waits
+    behind running queries (the next run retries).
+    """
+    _validate_schema_name(schema)
+    if retention_months <= 0:
+        return []
+    await _lock(conn, schema)
+    if not await is_partitioned(conn, schema):
+        return []
+    cutoff = add_months(month_start(now or datetime.now(timezone.utc)), -int(retention_months))
+    expired = [
+        (month, name)
+        for month, name in sorted((await list_month_partitions(conn, schema)).items())
+        if add_months(month, 1) <= cutoff
+    ]
+    if not expired:
+        return []
+    res = await conn.execute(text("SELECT to_regclass(:t)"), {"t": f'"{schema}".message_embeddings'})
+    if res.scalar_one_or_none() is not None:
+        for month, _ in expired:  # per month: rows of months without a partition live on
+            await conn.execute(
+                text(f'DELETE FROM "{schema}".message_embeddings WHERE created_at >= :lo AND created_at < :hi'),
+                {"lo": month, "hi": add_months(month, 1)},
+            )
+    await conn.execute(text(f"SET LOCAL lock_timeout = '{int(lock_timeout_s * 1000)}ms'"))
+    dropped: list[str] = []
+    for month, name in expired:
+        await conn.execute(text(f'ALTER TABLE "{schema}".chat_messages DETACH PARTITION "{schema}".{name}'))
+        await conn.execute(text(f'DROP TABLE "{schema}".{name}'))
+        dropped.append(name)
+    return dropped
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002_auth_notify"
+down_revision = "0001_core"
+branch_labels = None
+depends_on = None
+
+# Must match noosphera.security.directory.AUTH_CHANNEL
+_CHANNEL = "noosphera_auth"
+
+
+def upgrade() -> None:
+    # Publish auth-relevant changes so every worker can refresh its in-memory key directory.
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION core.notify_auth_change() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+          rec RECORD;
+        BEGIN
+          IF TG_OP = 'DELETE' THEN rec := OLD; ELSE rec := NEW; END IF;
+          IF TG_TABLE_NAME = 'api_keys' THEN
+            PERFORM pg_notify('{_CHANNEL}', json_build_object(
+              'table', 'api_keys', 'op', TG_OP, 'key_prefix', rec.key_prefix, 'tenant_id', rec.tenant_id
+            )::text);
+          ELSE
+            PERFORM pg_notify('{_CHANNEL}', json_build_object(
+              'table', 'tenants', 'op', TG_OP, 'tenant_id', rec.id
+            )::text);
+          END IF;
+          RETURN NULL;
+        END
+        $$
+        """
+    )
+    # UPDATE OF limits notifications to columns auth depends on (not last_used_at).
+    op.execute(
+        """
+        CREATE TRIGGER trg_api_keys_notify_auth
+        AFTER INSERT OR DELETE OR UPDATE OF key_prefix, key_hash, status, expires_at, tenant_id
+        ON core.api_keys
+        FOR EACH ROW EXECUTE FUNCTION core.notify_auth_change()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_tenants_notify_auth
+        AFTER INSERT OR DELETE OR UPDATE OF name, db_schema_name, status
+        ON core.tenants
+        FOR EACH ROW EXECUTE FUNCTION core.notify_auth_change()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_tenants_notify_auth ON core.tenants")
+    op.execute("DROP TRIGGER IF EXISTS trg_api_keys_notify_auth ON core.api_keys")
+    op.execute("DROP FUNCTION IF EXISTS core.notify_auth_change()")
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003_tenant_chat_retention"
+down_revision = "0002_auth_notify"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Per-tenant chat history retention in months for partitioned chat_messages.
+    # NULL = chat.partitioning.retention_months; 0 = keep everything.
+    op.add_column(
+        "tenants",
+        sa.Column("chat_retention_months", sa.Integer(), nullable=True),
+        schema="core",
+    )
+    op.create_check_constraint(
+        "ck_tenants_chat_retention_months",
+        "tenants",
+        "chat_retention_months IS NULL OR chat_retention_months >= 0",
+        schema="core",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("ck_tenants_chat_retention_months", "tenants", schema="core", type_="check")
+    op.drop_column("tenants", "chat_retention_months", schema="core")
@@ -11,6 +11,7 @@ from sqlalchemy import (
     Enum,
     ForeignKey,
     Index,
+    Integer,
     String,
     Text,
     UniqueConstraint,
@@ -41,6 +42,10 @@ class Tenant(Base):
     __table_args__ = (
         UniqueConstraint("name", name="uq_tenants_name"),
         UniqueConstraint("db_schema_name", name="uq_tenants_schema"),
+        CheckConstraint(
+            "chat_retention_months IS NULL OR chat_retention_months >= 0",
+            name="ck_tenants_chat_retention_months",
+        ),
         {"schema": "core"},
     )
 
@@ -50,6 +55,8 @@ class Tenant(Base):
     status: Mapped[TenantStatus] = mapped_column(
         Enum(TenantStatus, name="tenant_status", schema="core"), nullable=False, default=TenantStatus.active
     )
+    # Months of chat history kept in partitioned chat_messages; NULL = chat.partitioning default
+    chat_retention_months: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=text("now()"))
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=text("now()"), server_onupdate=text("now()")
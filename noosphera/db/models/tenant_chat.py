@@ -1,64 +1,78 @@
 # FILE: noosphera/db/models/tenant_chat.py
+# RATIONALE:
+# One set of tenant-agnostic models for every tenant. Tables live in the placeholder schema
+# TENANT_SCHEMA, which each statement renders into the real tenant schema through the
+# connection's schema_translate_map. Compiled statements are cached once for all tenants and
+# memory does not grow with the tenant count.
 from __future__ import annotations
 
 from datetime import datetime
-from functools import lru_cache
-from typing import Optional, Tuple
+from typing import Any, Optional
 from uuid import UUID
 
-from sqlalchemy import DateTime, ForeignKey, String, Text, UniqueConstraint, text
+from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import JSONB as PG_JSONB, UUID as PG_UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
+from ..tenancy import _validate_schema_name
 
-class _Base(DeclarativeBase):
+# Placeholder schema of tenant tables; never exists in the database.
+TENANT_SCHEMA = "tenant"
+
+# Text search configuration of the chat_messages search index; queries must use the same one.
+SEARCH_CONFIG = "simple"
+
+
+class TenantBase(DeclarativeBase):
     pass
 
 
-@lru_cache(maxsize=256)
-def get_chat_models(schema: str) -> Tuple[type[_Base], type, type]:
-    """
-    Return ORM Base and model classes bound to a specific tenant schema.
-    Cached per schema to avoid recreating classes.
-    """
-
-    class Base(_Base):
-        __abstract__ = True
-
-    class ChatSession(Base):
-        __tablename__ = "chat_sessions"
-        __table_args__ = ({"schema": schema},)
-
-        id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
-        created_at: Mapped[datetime] = mapped_column(
-            DateTime(timezone=True), server_default=text("now()"), nullable=False
-        )
-        name: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-
-        messages: Mapped[list["ChatMessage"]] = relationship(
-            back_populates="session", cascade="all, delete-orphan"
-        )
-
-    class ChatMessage(Base):
-        __tablename__ = "chat_messages"
-        __table_args__ = (
-            UniqueConstraint("id", name="uq_chat_messages_id"),
-            {"schema": schema},
-        )
-
-        id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
-        session_id: Mapped[UUID] = mapped_column(
-            PG_UUID(as_uuid=True),
-            ForeignKey(f'{schema}.chat_sessions.id', ondelete="CASCADE"),
-            nullable=False,
-        )
-        role: Mapped[str] = mapped_column(String(length=16), nullable=False)  # system|user|assistant
-        content: Mapped[str] = mapped_column(Text, nullable=False)
-        meta: Mapped[Optional[dict]] = mapped_column(PG_JSONB, nullable=True)
-        created_at: Mapped[datetime] = mapped_column(
-            DateTime(timezone=True), server_default=text("now()"), nullable=False
-        )
-
-        session: Mapped[ChatSession] = relationship(back_populates="messages")
-
-    return Base, ChatSession, ChatMessage
+class ChatSession(TenantBase):
+    __tablename__ = "chat_sessions"
+    __table_args__ = ({"schema": TENANT_SCHEMA},)
+
+    id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=text("now()"), nullable=False
+    )
+    name: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    summary: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    summary_through: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    summary_token_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    summary_token_counter: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    summary_updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    messages: Mapped[list["ChatMessage"]] = relationship(
+        back_populates="session", cascade="all, delete-orphan"
+    )
+
+
+class ChatMessage(TenantBase):
+    __tablename__ = "chat_messages"
+    __table_args__ = (
+        UniqueConstraint("id", name="uq_chat_messages_id"),
+        {"schema": TENANT_SCHEMA},
+    )
+
+    id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    session_id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey(f"{TENANT_SCHEMA}.chat_sessions.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    role: Mapped[str] = mapped_column(String(length=16), nullable=False)  # system|user|assistant
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    meta: Mapped[Optional[dict]] = mapped_column(PG_JSONB, nullable=True)
+    token_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    token_counter: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # Tokenizer.name
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=text("now()"), nullable=False
+    )
+
+    session: Mapped[ChatSession] = relationship(back_populates="messages")
+
+
+def tenant_execution_options(schema: str) -> dict[str, Any]:
+    """Execution options that render the tenant models into `schema`."""
+    _validate_schema_name(schema)
+    return {"schema_translate_map": {TENANT_SCHEMA: schema}}
@@ -20,15 +20,6 @@ async def create_tenant_schema(admin_engine: AsyncEngine, schema: str) -> None:
         await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
 
 
-async def set_search_path(session: AsyncSession, schema: str) -> None:
-    """
-    Set a request-local search_path to the tenant schema + public.
-    Keep 'core' accessed via explicit qualification.
-    """
-    _validate_schema_name(schema)
-    await session.execute(text(f'SET LOCAL search_path TO "{schema}", public'))
-
-
 async def assert_schema_exists(conn_or_session: Union[AsyncEngine, AsyncSession], schema: str) -> None:
     _validate_schema_name(schema)
     if isinstance(conn_or_session, AsyncEngine):
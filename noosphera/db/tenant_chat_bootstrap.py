@@ -1,53 +1,460 @@
 # FILE: noosphera/db/tenant_chat_bootstrap.py
+# RATIONALE:
+# Tenant tables are provisioned once (at tenant creation, or on first touch for older tenants)
+# instead of running DDL on every chat request. Each schema records the layout version it has
+# in "<schema>".noosphera_layout; a per-process registry remembers schemas known to be current,
+# so steady-state requests do no catalog work at all.
 from __future__ import annotations
 
+import logging
+from typing import Optional, Sequence
+
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from ..core.singleflight import SingleFlight
+from .chat_partitions import create_month_partitions, is_partitioned
+from .models.tenant_chat import SEARCH_CONFIG
+from .tenancy import _validate_schema_name
+
+log = logging.getLogger(__name__)
 
-from .tenancy import create_tenant_schema
+# Ordered DDL steps per component; the layout version is the number of steps applied.
+# Append-only: never edit or reorder a released step, add a new one instead. Steps must be
+# idempotent (IF NOT EXISTS) because schemas created before the marker existed replay them.
+CHAT_LAYOUT: tuple[str, ...] = (
+    '''
+    CREATE TABLE IF NOT EXISTS "{schema}".chat_sessions (
+      id UUID PRIMARY KEY,
+      created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+      name TEXT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS "{schema}".chat_messages (
+      id UUID PRIMARY KEY,
+      session_id UUID NOT NULL REFERENCES "{schema}".chat_sessions(id) ON DELETE CASCADE,
+      role TEXT NOT NULL CHECK (role IN ('system','user','assistant')),
+      content TEXT NOT NULL,
+      meta JSONB NULL,
+      created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+    ''',
+    # index for efficient listing
+    '''
+    CREATE INDEX IF NOT EXISTS ix_chat_messages_session_created
+    ON "{schema}".chat_messages (session_id, created_at DESC)
+    ''',
+    # v4: tokens of `content`, counted at insert for budgeted context assembly
+    '''
+    ALTER TABLE "{schema}".chat_messages ADD COLUMN IF NOT EXISTS token_count INTEGER NULL
+    ''',
+    # v5: rolling summary of messages up to summary_through (chat.summary_enabled)
+    '''
+    ALTER TABLE "{schema}".chat_sessions
+      ADD COLUMN IF NOT EXISTS summary TEXT NULL,
+      ADD COLUMN IF NOT EXISTS summary_through TIMESTAMPTZ NULL,
+      ADD COLUMN IF NOT EXISTS summary_token_count INTEGER NULL,
+      ADD COLUMN IF NOT EXISTS summary_updated_at TIMESTAMPTZ NULL
+    ''',
+    # v6: Idempotency-Key records for POST /chat (pending while the original runs)
+    '''
+    CREATE TABLE IF NOT EXISTS "{schema}".chat_idempotency (
+      key TEXT PRIMARY KEY,
+      request_hash TEXT NOT NULL,
+      status TEXT NOT NULL CHECK (status IN ('pending','done')),
+      response JSONB NULL,
+      created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+      updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+    ''',
+    # v7: expiry sweep
+    '''
+    CREATE INDEX IF NOT EXISTS ix_chat_idempotency_created
+    ON "{schema}".chat_idempotency (created_at)
+    ''',
+    # v8: keyset pagination on (created_at, id); supersedes ix_chat_messages_session_created
+    '''
+    CREATE INDEX IF NOT EXISTS ix_chat_messages_session_created_id
+    ON "{schema}".chat_messages (session_id, created_at DESC, id DESC)
+    ''',
+    '''
+    DROP INDEX IF EXISTS "{schema}".ix_chat_messages_session_created
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS ix_chat_sessions_created_id
+    ON "{schema}".chat_sessions (created_at DESC, id DESC)
+    ''',
+    # v11: time-range scans (exports, retention) on append-only rows; a few pages per GB
+    '''
+    CREATE INDEX IF NOT EXISTS ix_chat_messages_created_brin
+    ON "{schema}".chat_messages USING brin (created_at)
+    ''',
+    # v12: tokenizer that produced token_count / summary_token_count; counts are reused only
+    # when it matches (NULL = unknown, recounted). Nullable, no default: catalog-only.
+    '''
+    ALTER TABLE "{schema}".chat_messages ADD COLUMN IF NOT EXISTS token_counter TEXT NULL
+    ''',
+    '''
+    ALTER TABLE "{schema}".chat_sessions ADD COLUMN IF NOT EXISTS summary_token_counter TEXT NULL
+    ''',
+)
 
+# Applied before CHAT_LAYOUT when chat.partitioning is enabled: chat_messages is created
+# range-partitioned by created_at (monthly partitions, see db/chat_partitions.py), so the
+# CREATE TABLE steps of CHAT_LAYOUT find it and skip. Schemas that already have a plain
+# chat_messages keep it; nothing here converts existing data. The primary key must include
+# the partition key.
+CHAT_PARTITIONED_LAYOUT: tuple[str, ...] = (
+    CHAT_LAYOUT[0],
+    '''
+    CREATE TABLE IF NOT EXISTS "{schema}".chat_messages (
+      id UUID NOT NULL,
+      session_id UUID NOT NULL REFERENCES "{schema}".chat_sessions(id) ON DELETE CASCADE,
+      role TEXT NOT NULL CHECK (role IN ('system','user','assistant')),
+      content TEXT NOT NULL,
+      meta JSONB NULL,
+      created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+      token_count INTEGER NULL,
+      PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at)
+    ''',
+    # catch-all for rows outside every monthly partition; never dropped by retention
+    '''
+    DO $$
+    BEGIN
+      IF EXISTS (
+        SELECT 1 FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = '{schema}' AND c.relname = 'chat_messages' AND c.relkind = 'p'
+      ) THEN
+        CREATE TABLE IF NOT EXISTS "{schema}".chat_messages_default
+        PARTITION OF "{schema}".chat_messages DEFAULT;
+      END IF;
+    END $$
+    ''',
+)
 
-async def ensure_tenant_chat_tables(admin_engine: AsyncEngine, schema: str) -> None:
+
+def semantic_cache_layout(dimensions: int) -> tuple[str, ...]:
     """
-    Idempotently ensure the per-tenant chat tables exist.
-    Uses admin engine (DDL privileges). Validates/creates schema if missing.
+    Steps of the per-tenant semantic response cache for `dimensions`-wide embeddings.
+
+    The column is an untyped `vector` so a model change needs no table rewrite; each width
+    gets its own partial HNSW index (cosine distance) over an explicit cast, which queries
+    must repeat. Provisioned as component "semantic_cache_<dimensions>".
+    """
+    dims = int(dimensions)
+    return (
+        '''
+        CREATE TABLE IF NOT EXISTS "{schema}".semantic_cache (
+          id UUID PRIMARY KEY,
+          model TEXT NOT NULL,
+          prompt TEXT NOT NULL,
+          answer TEXT NOT NULL,
+          embedding vector NOT NULL,
+          meta JSONB NULL,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        ''',
+        f'''
+        CREATE INDEX IF NOT EXISTS ix_semantic_cache_hnsw_{dims}
+        ON "{{schema}}".semantic_cache USING hnsw ((embedding::vector({dims})) vector_cosine_ops)
+        WHERE vector_dims(embedding) = {dims}
+        ''',
+        # v3: bounded TTL sweep on store (ChatRepository.store_semantic_answer)
+        '''
+        CREATE INDEX IF NOT EXISTS ix_semantic_cache_created ON "{schema}".semantic_cache (created_at)
+        ''',
+    )
+
+
+def memory_layout(dimensions: int) -> tuple[str, ...]:
     """
-    await create_tenant_schema(admin_engine, schema)
+    Steps of the per-tenant long-term memory index (embeddings of chat messages) for
+    `dimensions`-wide embeddings; same untyped-column + partial HNSW scheme as the semantic
+    cache. Provisioned as component "chat_memory_<dimensions>".
+    """
+    dims = int(dimensions)
+    return (
+        '''
+        CREATE TABLE IF NOT EXISTS "{schema}".message_embeddings (
+          message_id UUID PRIMARY KEY,
+          session_id UUID NOT NULL REFERENCES "{schema}".chat_sessions(id) ON DELETE CASCADE,
+          model TEXT NOT NULL,
+          embedding vector NOT NULL,
+          created_at TIMESTAMPTZ NOT NULL
+        )
+        ''',
+        # session-scoped recall scans one session's vectors exactly
+        '''
+        CREATE INDEX IF NOT EXISTS ix_message_embeddings_session
+        ON "{schema}".message_embeddings (session_id)
+        ''',
+        f'''
+        CREATE INDEX IF NOT EXISTS ix_message_embeddings_hnsw_{dims}
+        ON "{{schema}}".message_embeddings USING hnsw ((embedding::vector({dims})) vector_cosine_ops)
+        WHERE vector_dims(embedding) = {dims}
+        ''',
+        # v4: partition retention deletes the vectors of dropped months by created_at range
+        '''
+        CREATE INDEX IF NOT EXISTS ix_message_embeddings_created_brin
+        ON "{schema}".message_embeddings USING brin (created_at)
+        ''',
+    )
+
+
+def documents_layout(dimensions: int) -> tuple[str, ...]:
+    """
+    Steps of the per-tenant document store (RAG) for `dimensions`-wide embeddings: documents,
+    their chunks with embeddings (untyped column + partial HNSW index, as above) and an index on
+    (content_hash, model) so already embedded chunks are found instead of re-embedded.
+    Provisioned as component "documents_<dimensions>".
+    """
+    dims = int(dimensions)
+    return (
+        '''
+        CREATE TABLE IF NOT EXISTS "{schema}".documents (
+          id UUID PRIMARY KEY,
+          collection TEXT NOT NULL,
+          name TEXT NULL,
+          content_hash TEXT NULL,
+          chunk_count INTEGER NOT NULL DEFAULT 0,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+          completed_at TIMESTAMPTZ NULL
+        )
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS ix_documents_collection_created
+        ON "{schema}".documents (collection, created_at DESC)
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS "{schema}".document_chunks (
+          id UUID PRIMARY KEY,
+          document_id UUID NOT NULL REFERENCES "{schema}".documents(id) ON DELETE CASCADE,
+          collection TEXT NOT NULL,
+          ord INTEGER NOT NULL,
+          content TEXT NOT NULL,
+          content_hash TEXT NOT NULL,
+          token_count INTEGER NULL,
+          model TEXT NOT NULL,
+          embedding vector NOT NULL
+        )
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS ix_document_chunks_document
+        ON "{schema}".document_chunks (document_id, ord)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS ix_document_chunks_hash_model
+        ON "{schema}".document_chunks (content_hash, model)
+        ''',
+        f'''
+        CREATE INDEX IF NOT EXISTS ix_document_chunks_hnsw_{dims}
+        ON "{{schema}}".document_chunks USING hnsw ((embedding::vector({dims})) vector_cosine_ops)
+        WHERE vector_dims(embedding) = {dims}
+        ''',
+    )
+
+
+# (schema, component) pairs known to be at their current layout version in this process.
+_READY: set[tuple[str, str]] = set()
+_flight: SingleFlight[None] = SingleFlight()
+
+
+async def _apply_layout(admin_engine: AsyncEngine, schema: str, component: str, steps: Sequence[str]) -> None:
+    target = len(steps)
     async with admin_engine.begin() as conn:
-        # chat_sessions
+        # Serialize bootstrap of this schema across workers; released at commit.
+        await conn.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext('noosphera.layout'), hashtext(:s))"), {"s": schema}
+        )
+        await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
         await conn.execute(
             text(
                 f'''
-                CREATE TABLE IF NOT EXISTS "{schema}".chat_sessions (
-                  id UUID PRIMARY KEY,
-                  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
-                  name TEXT NULL
+                CREATE TABLE IF NOT EXISTS "{schema}".noosphera_layout (
+                  component TEXT PRIMARY KEY,
+                  version INTEGER NOT NULL,
+                  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
                 )
                 '''
             )
         )
+        res = await conn.execute(
+            text(f'SELECT version FROM "{schema}".noosphera_layout WHERE component = :c'), {"c": component}
+        )
+        current = res.scalar_one_or_none() or 0
+        if current >= target:
+            return
 
-        # chat_messages
+        for step in steps[current:]:
+            await conn.execute(text(step.replace("{schema}", schema)))
         await conn.execute(
             text(
                 f'''
-                CREATE TABLE IF NOT EXISTS "{schema}".chat_messages (
-                  id UUID PRIMARY KEY,
-                  session_id UUID NOT NULL REFERENCES "{schema}".chat_sessions(id) ON DELETE CASCADE,
-                  role TEXT NOT NULL CHECK (role IN ('system','user','assistant')),
-                  content TEXT NOT NULL,
-                  meta JSONB NULL,
-                  created_at TIMESTAMPTZ NOT NULL DEFAULT now()
-                )
+                INSERT INTO "{schema}".noosphera_layout (component, version) VALUES (:c, :v)
+                ON CONFLICT (component) DO UPDATE SET version = EXCLUDED.version, updated_at = now()
                 '''
-            )
+            ),
+            {"c": component, "v": target},
         )
-        # index for efficient listing
+        log.info(
+            "tenant_layout_upgraded",
+            extra={"tenant_schema": schema, "component": component, "from_version": current, "to_version": target},
+        )
+
+
+async def ensure_tenant_layout(admin_engine: AsyncEngine, schema: str, component: str, steps: Sequence[str]) -> None:
+    """
+    Bring `component` in `schema` to the latest layout version, once per process.
+
+    Known-ready schemas return without touching the database; concurrent first touches in
+    this process share one bootstrap, and other workers wait on the advisory lock.
+    """
+    if (schema, component) in _READY:
+        return
+    _validate_schema_name(schema)
+
+    async def _run() -> None:
+        await _apply_layout(admin_engine, schema, component, steps)
+
+    await _flight.do((schema, component), _run)
+    _READY.add((schema, component))
+
+
+async def ensure_tenant_chat_tables(
+    admin_engine: AsyncEngine, schema: str, *, partition_months_ahead: Optional[int] = None
+) -> None:
+    """
+    Ensure the per-tenant chat tables exist at the current layout version.
+    Uses admin engine (DDL privileges). Creates the schema if missing.
+
+    With `partition_months_ahead`, a schema without chat tables gets a month-partitioned
+    chat_messages with partitions up to that many months ahead already in place.
+    """
+    if partition_months_ahead is not None:
+        await ensure_tenant_layout(admin_engine, schema, "chat_partitioned", CHAT_PARTITIONED_LAYOUT)
+    await ensure_tenant_layout(admin_engine, schema, "chat", CHAT_LAYOUT)
+    if partition_months_ahead is None or (schema, "chat_partitions") in _READY:
+        return
+
+    async def _premake() -> None:
+        async with admin_engine.begin() as conn:
+            await create_month_partitions(conn, schema, months_ahead=partition_months_ahead)
+
+    await _flight.do((schema, "chat_partitions"), _premake)
+    _READY.add((schema, "chat_partitions"))
+
+
+async def ensure_tenant_semantic_cache(admin_engine: AsyncEngine, schema: str, dimensions: int) -> None:
+    """Ensure the tenant's semantic cache table and its HNSW index for `dimensions` exist."""
+    await ensure_tenant_layout(
+        admin_engine, schema, f"semantic_cache_{int(dimensions)}", semantic_cache_layout(dimensions)
+    )
+
+
+async def ensure_tenant_memory(admin_engine: AsyncEngine, schema: str, dimensions: int) -> None:
+    """Ensure the tenant's message embedding table and its HNSW index for `dimensions` exist."""
+    await ensure_tenant_layout(admin_engine, schema, f"chat_memory_{int(dimensions)}", memory_layout(dimensions))
+
+
+async def ensure_tenant_documents(admin_engine: AsyncEngine, schema: str, dimensions: int) -> None:
+    """Ensure the tenant's document store and its HNSW index for `dimensions` exist."""
+    await ensure_tenant_layout(admin_engine, schema, f"documents_{int(dimensions)}", documents_layout(dimensions))
+
+
+# Full-text search (/chat/search) index over chat_messages. An expression index: adding it to
+# an existing tenant is an index build, not a table rewrite, and search_messages queries the
+# same expression. 'simple' = no stemming or stop words, any language.
+SEARCH_INDEX = "ix_chat_messages_content_fts"
+SEARCH_EXPRESSION = f"to_tsvector('{SEARCH_CONFIG}'::regconfig, content)"
+
+
+async def _index_valid(conn: AsyncConnection, schema: str, name: str) -> Optional[bool]:
+    """pg_index.indisvalid of `schema`.`name`, or None if there is no such index."""
+    res = await conn.execute(
+        text(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = :s AND c.relname = :n"
+        ),
+        {"s": schema, "n": name},
+    )
+    return res.scalar_one_or_none()
+
+
+async def _build_concurrently(conn: AsyncConnection, schema: str, table: str, name: str) -> bool:
+    """Build the search index `name` on `table` unless a valid one exists; True if built."""
+    valid = await _index_valid(conn, schema, name)
+    if valid:
+        return False
+    if valid is False:  # left behind by an interrupted concurrent build
+        await conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{schema}"."{name}"'))
+    await conn.execute(
+        text(f'CREATE INDEX CONCURRENTLY "{name}" ON "{schema}"."{table}" USING gin ({SEARCH_EXPRESSION})')
+    )
+    return True
+
+
+async def build_search_index(admin_engine: AsyncEngine, schema: str) -> list[str]:
+    """
+    Build the full-text search index of `schema`.chat_messages without blocking its reads and
+    writes; returns the indexes built. A plain table gets one CREATE INDEX CONCURRENTLY. A
+    partitioned one gets the index ON ONLY the parent, built concurrently on each partition and
+    attached (partitions created later inherit it). Safe to re-run; leftovers of an interrupted
+    build are rebuilt.
+
+    Runs outside any transaction and the layout lock, for as long as the table scans take:
+    call it at tenant creation (empty tables) or from the CLI, never on the request path.
+    """
+    _validate_schema_name(schema)
+    built: list[str] = []
+    engine = admin_engine.execution_options(isolation_level="AUTOCOMMIT")
+    async with engine.connect() as conn:
+        # Concurrent runs for one schema would race on the same index names.
         await conn.execute(
-            text(
-                f'''
-                CREATE INDEX IF NOT EXISTS ix_chat_messages_session_created
-                ON "{schema}".chat_messages (session_id, created_at DESC)
-                '''
-            )
+            text("SELECT pg_advisory_lock(hashtext('noosphera.search_index'), hashtext(:s))"), {"s": schema}
         )
+        try:
+            partitioned = await is_partitioned(conn, schema)
+            if not partitioned:
+                if await _build_concurrently(conn, schema, "chat_messages", SEARCH_INDEX):
+                    built.append(SEARCH_INDEX)
+            else:
+                await conn.execute(
+                    text(
+                        f'CREATE INDEX IF NOT EXISTS "{SEARCH_INDEX}" ON ONLY "{schema}".chat_messages '
+                        f"USING gin ({SEARCH_EXPRESSION})"
+                    )
+                )
+                parent = f'"{schema}"."{SEARCH_INDEX}"'
+                res = await conn.execute(
+                    text(
+                        "SELECT c.relname, EXISTS ("
+                        "  SELECT 1 FROM pg_index x JOIN pg_inherits ii ON ii.inhrelid = x.indexrelid "
+                        "  WHERE x.indrelid = c.oid AND ii.inhparent = CAST(:parent AS regclass)"
+                        ") FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                        "JOIN pg_class p ON p.oid = i.inhparent JOIN pg_namespace n ON n.oid = p.relnamespace "
+                        "WHERE n.nspname = :s AND p.relname = 'chat_messages' ORDER BY c.relname"
+                    ),
+                    {"s": schema, "parent": parent},
+                )
+                for partition, attached in list(res.tuples()):
+                    if attached:
+                        continue
+                    name = f"{partition}_content_fts"
+                    if await _build_concurrently(conn, schema, partition, name):
+                        built.append(name)
+                    await conn.execute(text(f'ALTER INDEX {parent} ATTACH PARTITION "{schema}"."{name}"'))
+        finally:
+            await conn.execute(
+                text("SELECT pg_advisory_unlock(hashtext('noosphera.search_index'), hashtext(:s))"), {"s": schema}
+            )
+    if built:
+        log.info("tenant_search_index_built", extra={"tenant_schema": schema, "indexes": built})
+    return built
+
+
+def forget_tenant_schema(schema: str) -> None:
+    """Drop `schema` from the ready registry (e.g. after it was dropped or restored)."""
+    for key in [k for k in _READY if k[0] == schema]:
+        _READY.discard(key)
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from typing import Optional
 
-from prometheus_client import Counter, Histogram, make_asgi_app
+from prometheus_client import Counter, Gauge, Histogram, make_asgi_app
 
 # Core HTTP metrics (prefixed for clarity)
 HTTP_REQUESTS = Counter(
@@ -25,6 +25,131 @@ LLM_TOKENS = Counter(
     labelnames=["provider", "model", "direction"],  # direction: in|out|total
 )
 
+# LLM: exact-match response cache (see providers/response_cache.py)
+RESPONSE_CACHE_EVENTS = Counter(
+    "noosphera_llm_response_cache_events_total",
+    "LLM response cache events (hit ratio = hit / (hit + miss); coalesced misses made no call)",
+    labelnames=["event"],  # hit|miss|coalesced|bypass|eviction|expired
+)
+
+RESPONSE_CACHE_SAVED_TOKENS = Counter(
+    "noosphera_llm_response_cache_saved_tokens_total",
+    "Upstream tokens avoided by serving replies from the response cache or a shared call",
+    labelnames=["provider", "model"],
+)
+
+SEMANTIC_CACHE_EVENTS = Counter(
+    "noosphera_semantic_cache_events_total",
+    "Semantic (embedding) response cache events",
+    labelnames=["event"],  # hit|miss|store|error
+)
+
+# Auth: verified API-key cache (see security/key_cache.py)
+AUTH_CACHE_EVENTS = Counter(
+    "noosphera_auth_cache_events_total",
+    "API-key verification cache events",
+    labelnames=["event"],  # hit|miss|coalesced|eviction|expired|invalidation
+)
+
+AUTH_REJECTED = Counter(
+    "noosphera_auth_rejected_total",
+    "Auth attempts refused before verification (flood protection)",
+    labelnames=["reason"],  # negative_cache|prefix_throttle|ip_throttle
+)
+
+# Crypto executor (bcrypt hashing/verification, see security/crypto.py)
+CRYPTO_QUEUE_DEPTH = Gauge(
+    "noosphera_crypto_queue_depth",
+    "Crypto jobs admitted and not yet finished (running + queued)",
+)
+
+CRYPTO_LATENCY = Histogram(
+    "noosphera_crypto_latency_seconds",
+    "Crypto job latency including queue wait (seconds)",
+    labelnames=["op"],  # hash|verify
+)
+
+CRYPTO_REJECTED = Counter(
+    "noosphera_crypto_rejected_total",
+    "Crypto jobs rejected because the executor queue was full",
+    labelnames=["op"],
+)
+
+# Chat: per-session history cache (see services/history_cache.py)
+HISTORY_CACHE_EVENTS = Counter(
+    "noosphera_history_cache_events_total",
+    "Chat history cache events",
+    labelnames=["event"],  # hit|miss|refill|eviction
+)
+
+HISTORY_CACHE_BYTES = Gauge(
+    "noosphera_history_cache_bytes",
+    "Approximate bytes held by the chat history cache",
+)
+
+# Chat: rolling session summaries (see services/session_summary.py)
+SUMMARY_EVENTS = Counter(
+    "noosphera_chat_summary_events_total",
+    "Rolling session summary events",
+    labelnames=["event"],  # scheduled|coalesced|stored|conflict|skipped|failed
+)
+
+SUMMARY_LATENCY = Histogram(
+    "noosphera_chat_summary_latency_seconds",
+    "Background summarization latency, read to store (seconds)",
+)
+
+# Chat: long-term memory (see services/conversation_memory.py)
+MEMORY_EVENTS = Counter(
+    "noosphera_chat_memory_events_total",
+    "Long-term memory events",
+    labelnames=["event"],  # recalled|indexed|dropped|error
+)
+
+# Chat: NDJSON history export (see services/chat_export.py)
+CHAT_EXPORT_ROWS = Counter(
+    "noosphera_chat_export_rows_total",
+    "Rows written by chat history exports",
+    labelnames=["kind"],  # session|message
+)
+
+CHAT_EXPORT_BYTES = Counter(
+    "noosphera_chat_export_bytes_total",
+    "Uncompressed NDJSON bytes written by chat history exports",
+)
+
+# Chat: COPY-based transcript import (see services/chat_import.py)
+CHAT_IMPORT_ROWS = Counter(
+    "noosphera_chat_import_rows_total",
+    "Rows loaded by chat transcript imports",
+    labelnames=["kind"],  # session|message
+)
+
+# Chat: monthly chat_messages partitions (see services/chat_partitions.py)
+CHAT_PARTITION_EVENTS = Counter(
+    "noosphera_chat_partition_events_total",
+    "Chat message partition maintenance events",
+    labelnames=["event"],  # created|dropped|error
+)
+
+# Documents: ingestion and retrieval (see services/documents.py)
+DOCUMENT_CHUNKS = Counter(
+    "noosphera_document_chunks_total",
+    "Document chunks ingested",
+    labelnames=["event"],  # embedded|deduplicated
+)
+
+DOCUMENT_INGEST_RATE = Histogram(
+    "noosphera_document_ingest_chunks_per_second",
+    "Throughput of finished document ingestions (chunks per second)",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500),
+)
+
+DOCUMENT_RETRIEVAL_LATENCY = Histogram(
+    "noosphera_document_retrieval_latency_seconds",
+    "Document retrieval latency for a chat turn, embedding + vector search (seconds)",
+)
+
 
 def make_metrics_app():
     """
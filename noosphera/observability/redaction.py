@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from typing import Any, Mapping, MutableMapping, Sequence
 
-_SENSITIVE_KEYS = ("api_key", "apikey", "token", "secret", "password", "authorization")
+_SENSITIVE_KEYS = ("api_key", "apikey", "token", "secret", "password", "authorization", "pepper")
 
 
 def _is_sensitive(key: str) -> bool:
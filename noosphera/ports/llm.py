@@ -14,9 +14,11 @@ class ChatLLMPort(Protocol):
         temperature: float | None = None,
         max_tokens: int | None = None,
         request_id: str | None = None,
+        cache: bool = True,
     ) -> dict:
         """
         Given a list of messages [{"role": "...", "content": "..."}], produce assistant reply.
+        `cache=False` opts this call out of any response cache.
         Returns:
           {
             "role": "assistant",
@@ -29,12 +31,21 @@ class ChatLLMPort(Protocol):
         """
         raise NotImplementedError("ChatLLMPort.chat must be implemented by adapters")
 
+    def resolve_model(self, model: str | None, provider: str | None = None) -> str | None:
+        """
+        Model name `chat` would use for these arguments (for tokenizer/context-window lookup).
+        """
+        return model
+
 
 class MockLLM:
     """
     Deterministic mock: replies with an echo of the last user message (or last message if none).
     """
 
+    def resolve_model(self, model: str | None, provider: str | None = None) -> str | None:
+        return model or "mock-model"
+
     async def chat(
         self,
         *,
@@ -44,6 +55,7 @@ class MockLLM:
         temperature: float | None = None,
         max_tokens: int | None = None,
         request_id: str | None = None,
+        cache: bool = True,
     ) -> dict:
         last_user = None
         for m in reversed(messages):
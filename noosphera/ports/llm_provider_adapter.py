@@ -4,17 +4,37 @@ from __future__ import annotations
 from typing import Optional
 
 from .llm import ChatLLMPort
+from ..observability.metrics import RESPONSE_CACHE_EVENTS
 from ..providers.manager import ProviderManager
+from ..providers.response_cache import ResponseCache, request_key
 
 
 class ProviderBackedLLM(ChatLLMPort):
     """
     Adapter that implements ChatLLMPort by delegating to concrete providers via ProviderManager.
+
+    With a `response_cache`, cacheable requests (temperature 0 when `deterministic_only`) are
+    served from it under `cache_scope` (the tenant schema), and identical concurrent requests
+    share one upstream call.
     """
 
-    def __init__(self, provider_manager: ProviderManager, default_model: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        provider_manager: ProviderManager,
+        default_model: Optional[str] = None,
+        *,
+        response_cache: Optional[ResponseCache] = None,
+        cache_scope: str = "",
+        deterministic_only: bool = True,
+    ) -> None:
         self._pm = provider_manager
         self._fallback_model = default_model
+        self._cache = response_cache
+        self._scope = cache_scope
+        self._deterministic_only = deterministic_only
+
+    def resolve_model(self, model: str | None, provider: str | None = None) -> str | None:
+        return model or self._pm.default_model(provider) or self._fallback_model
 
     async def chat(
         self,
@@ -25,24 +45,45 @@ class ProviderBackedLLM(ChatLLMPort):
         temperature: float | None = None,
         max_tokens: int | None = None,
         request_id: str | None = None,
+        cache: bool = True,
     ) -> dict:
         prov = self._pm.get(provider)
-        effective_model = model or self._pm.default_model(provider) or self._fallback_model
+        effective_model = self.resolve_model(model, provider)
         if not effective_model:
             raise RuntimeError("No model specified and no default model configured")
 
-        res = await prov.chat(
-            messages=messages,
+        async def _call() -> dict:
+            res = await prov.chat(
+                messages=messages,
+                model=effective_model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                request_id=request_id,
+            )
+            return {
+                "role": "assistant",
+                "content": res.text,
+                "model": res.model,
+                "provider": res.provider,
+                "usage": res.usage,
+                "meta": {"provider": res.provider, "model": res.model, "usage": res.usage},
+            }
+
+        if self._cache is None:
+            return await _call()
+        if not cache or (self._deterministic_only and temperature != 0):
+            RESPONSE_CACHE_EVENTS.labels(event="bypass").inc()
+            return await _call()
+
+        provider_name = self._pm.resolve_name(provider)
+        key = request_key(
+            self._scope,
+            provider=provider_name,
             model=effective_model,
+            messages=messages,
             temperature=temperature,
             max_tokens=max_tokens,
-            request_id=request_id,
         )
-        return {
-            "role": "assistant",
-            "content": res.text,
-            "model": res.model,
-            "provider": res.provider,
-            "usage": res.usage,
-            "meta": {"provider": res.provider, "model": res.model, "usage": res.usage},
-        }
+        return await self._cache.get_or_call(
+            key, _call, provider=provider_name, model=effective_model, messages=messages
+        )
@@ -4,6 +4,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Protocol, Optional, Sequence
 
+from .tokenizer import count_message_tokens
+
 
 @dataclass(slots=True)
 class ModelInfo:
@@ -54,9 +56,15 @@ class BaseProvider(Protocol):
         """
         raise NotImplementedError("Provider.list_models() must be implemented")
 
-    def count_tokens(self, messages: Sequence[dict], model: str) -> Optional[int]:  # optional
+    async def embed(self, texts: Sequence[str], model: str) -> list[list[float]]:
+        """
+        Return one embedding vector per input text, in order.
+        """
+        raise NotImplementedError("Provider.embed() must be implemented")
+
+    def count_tokens(self, messages: Sequence[dict], model: str) -> Optional[int]:
         """
-        (Optional) Estimate tokens for the given messages/model.
-        Step 1.5: may return None.
+        Estimate prompt tokens for the given messages/model with the local tokenizer
+        (tiktoken when installed, heuristic otherwise). Providers may override.
         """
-        return None
+        return count_message_tokens(messages, model)
@@ -49,19 +49,23 @@ class ProviderManager:
             return self._cfg.ollama.enabled
         return False
 
+    def resolve_name(self, name: Optional[str]) -> str:
+        """Provider name a call with `name` is routed to (the configured default if None)."""
+        return (name or self._cfg.default_provider).lower()
+
     def get(self, name: Optional[str]) -> BaseProvider:
         """
         Resolve a provider by name; falls back to configured default provider.
         """
         if not self._cfg.enabled:
             raise RuntimeError("Providers are disabled (providers.enabled=false)")
-        prov = (name or self._cfg.default_provider).lower()
+        prov = self.resolve_name(name)
         if not self.is_enabled(prov):
             raise RuntimeError(f"Provider '{prov}' is not enabled")
         return self._ensure(prov)
 
     def default_model(self, name: Optional[str]) -> Optional[str]:
-        prov = (name or self._cfg.default_provider).lower()
+        prov = self.resolve_name(name)
         if prov == "openai":
             return self._cfg.openai.default_model or self._cfg.default_model or None
         if prov == "ollama":
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Optional
+from typing import Any, Optional, Sequence
 
 import httpx
 
@@ -126,6 +126,24 @@ class OllamaProvider(BaseProvider):
             messages=messages, model=model, temperature=temperature, max_tokens=max_tokens
         )
 
+    async def embed(self, texts: Sequence[str], model: str) -> list[list[float]]:
+        if not self._cfg.enabled:
+            raise RuntimeError("Ollama provider is disabled by configuration")
+
+        url = f"{self._host}/api/embed"
+        payload: dict[str, Any] = {"model": model, "input": list(texts)}
+        log.debug("ollama.embed request model=%s n=%d", model, len(payload["input"]))
+
+        async with httpx.AsyncClient(timeout=self._timeout) as client:
+            resp = await client.post(url, json=payload)
+            resp.raise_for_status()
+            data = resp.json()
+
+        vectors = (data or {}).get("embeddings") or []
+        if len(vectors) != len(payload["input"]):
+            raise RuntimeError("Ollama embed: unexpected number of vectors")
+        return [list(map(float, v)) for v in vectors]
+
     async def list_models(self) -> list[ModelInfo]:
         if not self._cfg.enabled:
             return []
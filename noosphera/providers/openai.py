@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Optional
+from typing import Any, Optional, Sequence
 
 import httpx
 
@@ -84,6 +84,26 @@ class OpenAIProvider(BaseProvider):
             raw=data,
         )
 
+    async def embed(self, texts: Sequence[str], model: str) -> list[list[float]]:
+        if not self._cfg.enabled:
+            raise RuntimeError("OpenAI provider is disabled by configuration")
+        if not self._cfg.api_key:
+            raise RuntimeError("OpenAI API key is not configured")
+
+        url = f"{self._base}/embeddings"
+        payload: dict[str, Any] = {"model": model, "input": list(texts)}
+        log.debug("openai.embed request model=%s n=%d", model, len(payload["input"]))
+
+        async with httpx.AsyncClient(timeout=self._timeout) as client:
+            resp = await client.post(url, headers=self._headers(), json=payload)
+            resp.raise_for_status()
+            data = resp.json()
+
+        items = sorted(data.get("data", []), key=lambda it: it.get("index", 0))
+        if len(items) != len(payload["input"]):
+            raise RuntimeError("OpenAI embeddings: unexpected number of vectors")
+        return [list(map(float, it["embedding"])) for it in items]
+
     async def list_models(self) -> list[ModelInfo]:
         if not self._cfg.enabled:
             return []
@@ -0,0 +1,162 @@
+# RATIONALE:
+# Many workloads send the same deterministic prompt over and over (temperature 0, same model and
+# messages: classification, templated lookups). Completions are cached per tenant under a hash of
+# the canonical request, and concurrent identical requests share one upstream call.
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from ..core.singleflight import SingleFlight
+from ..observability.metrics import RESPONSE_CACHE_EVENTS, RESPONSE_CACHE_SAVED_TOKENS
+from .tokenizer import count_message_tokens, get_tokenizer
+
+_ENTRY_OVERHEAD = 256  # rough per-entry bytes beyond the content (key, dicts, usage)
+
+
+def request_key(
+    scope: str,
+    *,
+    provider: str,
+    model: str,
+    messages: list[dict],
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+) -> bytes:
+    """SHA-256 over the canonical JSON of a chat request (key order and spacing normalized)."""
+    canonical = json.dumps(
+        {
+            "scope": scope,
+            "provider": provider,
+            "model": model,
+            "messages": [{"role": m.get("role"), "content": m.get("content")} for m in messages],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).digest()
+
+
+def _saved_tokens(reply: dict, messages: list[dict], model: str) -> int:
+    """Tokens an upstream call would have used: reported usage, else a local count."""
+    usage = reply.get("usage") or {}
+    total = usage.get("total_tokens")
+    if total is None and usage.get("prompt_tokens") is not None:
+        total = usage["prompt_tokens"] + (usage.get("completion_tokens") or 0)
+    if total is None:
+        total = count_message_tokens(messages, model) + get_tokenizer(model).count(reply.get("content") or "")
+    return int(total)
+
+
+@dataclass(slots=True)
+class _Entry:
+    reply: dict
+    nbytes: int
+    saved_tokens: int
+    deadline: float  # time.monotonic() after which the entry is stale
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache of chat completions keyed by `request_key`, bounded by entry count and
+    an approximate byte budget. Concurrent misses for the same key are coalesced into one
+    upstream call (single-flight); only successful replies are stored.
+
+    Callers decide what is cacheable; by default only deterministic requests
+    (temperature 0) should be routed here.
+    """
+
+    def __init__(self, *, ttl_s: float = 300.0, max_entries: int = 10_000, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self._ttl = float(ttl_s)
+        self._max_entries = int(max_entries)
+        self._max_bytes = int(max_bytes)
+        self._entries: OrderedDict[bytes, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._flight: SingleFlight[dict] = SingleFlight()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def _drop(self, key: bytes) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+
+    def _lookup(self, key: bytes) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.deadline < time.monotonic():
+            self._drop(key)
+            RESPONSE_CACHE_EVENTS.labels(event="expired").inc()
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: bytes, reply: dict, saved_tokens: int) -> None:
+        self._drop(key)
+        entry = _Entry(
+            reply=reply,
+            nbytes=_ENTRY_OVERHEAD + len(reply.get("content") or ""),
+            saved_tokens=saved_tokens,
+            deadline=time.monotonic() + self._ttl,
+        )
+        if entry.nbytes > self._max_bytes:
+            return
+        self._entries[key] = entry
+        self._bytes += entry.nbytes
+        while self._entries and (len(self._entries) > self._max_entries or self._bytes > self._max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            RESPONSE_CACHE_EVENTS.labels(event="eviction").inc()
+
+    @staticmethod
+    def _served(reply: dict, saved_tokens: int, *, provider: str, model: str) -> dict[str, Any]:
+        RESPONSE_CACHE_SAVED_TOKENS.labels(provider=provider, model=model).inc(saved_tokens)
+        out = copy.deepcopy(reply)
+        out["meta"] = {**(out.get("meta") or {}), "cached": True}
+        return out
+
+    async def get_or_call(
+        self,
+        key: bytes,
+        call: Callable[[], Awaitable[dict]],
+        *,
+        provider: str,
+        model: str,
+        messages: list[dict],
+    ) -> dict:
+        """
+        Return the cached reply for `key`, or run `call()` (single-flight) and cache it.
+        Replies served from the cache or from another caller's call carry meta["cached"].
+        Exceptions from `call` propagate unchanged and are not cached.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            RESPONSE_CACHE_EVENTS.labels(event="hit").inc()
+            return self._served(entry.reply, entry.saved_tokens, provider=provider, model=model)
+
+        RESPONSE_CACHE_EVENTS.labels(event="miss").inc()
+        reply, shared = await self._flight.do(key, call)
+        saved = _saved_tokens(reply, messages, model)
+        if shared:
+            RESPONSE_CACHE_EVENTS.labels(event="coalesced").inc()
+            return self._served(reply, saved, provider=provider, model=model)
+        self._store(key, copy.deepcopy(reply), saved)
+        return reply
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
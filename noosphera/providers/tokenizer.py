@@ -0,0 +1,96 @@
+# FILE: noosphera/providers/tokenizer.py
+# RATIONALE:
+# Context assembly budgets tokens, not messages. Counting uses tiktoken when installed
+# (`pip install noosphera[tokens]`) and a conservative byte heuristic otherwise, so the
+# budget logic never depends on an optional package. Tokenizers are built once per model.
+# Stored counts are only reused when the same tokenizer (`name`) produced them.
+from __future__ import annotations
+
+import logging
+import math
+from functools import lru_cache
+from typing import Mapping, Optional, Protocol, Sequence
+
+log = logging.getLogger(__name__)
+
+# Chat-format framing per message (role + separators) and for priming the reply,
+# as documented for OpenAI chat models; a fair approximation for other providers.
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_PRIMING_TOKENS = 3
+
+_FALLBACK_ENCODING = "cl100k_base"
+
+
+class Tokenizer(Protocol):
+    name: str
+
+    def count(self, text: str) -> int:
+        ...
+
+
+class _TiktokenTokenizer:
+    def __init__(self, encoding) -> None:
+        self._enc = encoding
+        self.name = f"tiktoken:{encoding.name}"
+
+    def count(self, text: str) -> int:
+        # Special-token text in user content is counted as plain text, never rejected.
+        return len(self._enc.encode(text, disallowed_special=()))
+
+
+class _HeuristicTokenizer:
+    """
+    Upper-bound estimate: one token per 3 ASCII characters (BPE averages ~4 for English prose,
+    less for code), and for other characters one token each or one per 2 UTF-8 bytes,
+    whichever is more (CJK runs ~1-1.5 tokens per character).
+    """
+
+    name = "heuristic:v2"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        ascii_chars = len(text.encode("ascii", "ignore"))
+        other_chars = len(text) - ascii_chars
+        other_bytes = len(text.encode("utf-8", "surrogatepass")) - ascii_chars
+        return math.ceil(ascii_chars / 3) + max(other_chars, math.ceil(other_bytes / 2))
+
+
+@lru_cache(maxsize=64)
+def get_tokenizer(model: Optional[str]) -> Tokenizer:
+    """Tokenizer for `model` (cached). Unknown models use a general-purpose encoding."""
+    try:
+        import tiktoken  # type: ignore
+    except ModuleNotFoundError:
+        return _HeuristicTokenizer()
+
+    try:
+        enc = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding(_FALLBACK_ENCODING)
+    except KeyError:
+        enc = tiktoken.get_encoding(_FALLBACK_ENCODING)
+    except Exception as exc:  # encoding files unavailable (offline) etc.
+        log.warning("tiktoken unavailable for model=%s, using heuristic: %s", model, exc)
+        return _HeuristicTokenizer()
+    return _TiktokenTokenizer(enc)
+
+
+def count_message_tokens(messages: Sequence[Mapping], model: Optional[str]) -> int:
+    """Prompt tokens for a chat request: content + per-message framing + reply priming."""
+    tok = get_tokenizer(model)
+    total = REPLY_PRIMING_TOKENS
+    for m in messages:
+        total += MESSAGE_OVERHEAD_TOKENS + tok.count(str(m.get("content") or ""))
+    return total
+
+
+def context_window_for(model: Optional[str], windows: Mapping[str, int], default: int) -> int:
+    """
+    Context window of `model` from a name -> tokens mapping: exact match first, then the
+    longest matching prefix (so dated snapshots inherit their family's window).
+    """
+    if not model:
+        return default
+    if model in windows:
+        return windows[model]
+    best = max((k for k in windows if model.startswith(k)), key=len, default=None)
+    return windows[best] if best is not None else default
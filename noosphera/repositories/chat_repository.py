@@ -1,111 +1,702 @@
 # FILE: noosphera/repositories/chat_repository.py
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional, List
+from typing import AsyncIterator, NamedTuple, Optional, List, Sequence
 from uuid import UUID, uuid4
 
-from sqlalchemy import select, and_, or_
+from psycopg import AsyncConnection, sql
+from psycopg.pq import TransactionStatus
+from psycopg.types.json import Jsonb
+from sqlalchemy import select, and_, or_, func, literal, literal_column, tuple_
+from sqlalchemy.engine import Result
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Executable, Select
 
+from ..core.cursor import Position, SearchPosition
 from ..db.session import AsyncSession as _AsyncSession  # type hint clarity
-from ..db.tenancy import set_search_path
-from ..db.models.tenant_chat import get_chat_models
+from ..db.session import get_session
+from ..db.models.tenant_chat import SEARCH_CONFIG, ChatMessage, ChatSession, tenant_execution_options
 
+# (id, role, content, created_at, token_count) — compact, immutable, cheap to copy into a
+# prompt. token_count is None when it was not counted by the reader's tokenizer.
+MessageRow = tuple[UUID, str, str, datetime, Optional[int]]
 
-class ChatRepository:
+# Listing projections, in API field order (see MESSAGE_OUT_FIELDS / SESSION_OUT_FIELDS).
+MessageOutRow = tuple[UUID, str, str, datetime]  # id, role, content, created_at
+SessionOutRow = tuple[UUID, datetime, Optional[str]]  # id, created_at, name
+MESSAGE_OUT_FIELDS = ("id", "role", "content", "created_at")
+SESSION_OUT_FIELDS = ("id", "created_at", "name")
+# id, session_id, role, created_at, rank, snippet
+SearchHitRow = tuple[UUID, UUID, str, datetime, float, str]
+SEARCH_OUT_FIELDS = ("id", "session_id", "role", "created_at", "rank", "snippet")
+
+# Bulk import rows, in COPY column order (see ChatRepository.copy_transcript)
+SessionCopyRow = tuple[UUID, datetime, Optional[str]]  # id, created_at, name
+# id, session_id, role, content, meta, created_at, token_count
+MessageCopyRow = tuple[UUID, UUID, str, str, Optional[dict], datetime, Optional[int]]
+_SESSION_COPY_COLUMNS = ("id", "created_at", "name")
+_SESSION_COPY_TYPES = ("uuid", "timestamptz", "text")
+_MESSAGE_COPY_COLUMNS = ("id", "session_id", "role", "content", "meta", "created_at", "token_count")
+_MESSAGE_COPY_TYPES = ("uuid", "uuid", "text", "text", "jsonb", "timestamptz", "int4")
+
+# Export rows: session columns, then message columns (all None for a session without messages)
+# (s.id, s.created_at, s.name, m.id, m.role, m.content, m.meta, m.created_at, m.token_count)
+TranscriptRow = tuple[
+    UUID, datetime, Optional[str],
+    Optional[UUID], Optional[str], Optional[str], Optional[dict], Optional[datetime], Optional[int],
+]
+
+
+class SessionSummary(NamedTuple):
+    text: str
+    through: datetime  # created_at of the newest message folded into `text`
+    token_count: Optional[int]
+
+
+class SemanticHit(NamedTuple):
+    id: UUID
+    answer: str
+    similarity: float  # cosine similarity of the stored prompt to the probe
+
+
+def session_messages_query(
+    session_id: UUID, limit: int, before: Optional[UUID] = None, after: Optional[Position] = None
+) -> Select:
+    """
+    Up to `limit + 1` messages of a session, newest first, older than keyset position `after`
+    or than message `before`. An unknown `before` id yields the newest page, as it did before
+    keyset pagination.
+    """
+    M = ChatMessage
+    q = select(M.id, M.role, M.content, M.created_at).where(M.session_id == session_id)
+    if after is not None:
+        q = q.where(tuple_(M.created_at, M.id) < tuple_(*after))
+    elif before is not None:
+        # Position of the 'before' message, resolved inside the same query
+        ts = select(M.created_at).where(M.id == before).scalar_subquery()
+        q = q.where(or_(ts.is_(None), tuple_(M.created_at, M.id) < tuple_(ts, literal(before, M.id.type))))
+    return q.order_by(M.created_at.desc(), M.id.desc()).limit(limit + 1)
+
+
+def _vector_literal(embedding: Sequence[float]) -> str:
+    return "[" + ",".join(repr(float(x)) for x in embedding) + "]"
+
+
+class Recollection(NamedTuple):
+    message: MessageRow
+    similarity: float  # cosine similarity of the message to the probe
+
+
+class IdempotencyRecord(NamedTuple):
+    status: str  # pending|done
+    request_hash: str
+    response: Optional[dict]
+
+
+class TurnStart(NamedTuple):
+    session_id: UUID
+    history: list[MessageRow]  # oldest first, excluding `message`
+    message: MessageRow  # the incoming message as inserted
+    summary: Optional[SessionSummary] = None  # rolling summary of older messages, if any
+
+
+# Memory recall fetches this many times `limit` nearest vectors before joining chat_messages.
+_RECALL_OVERFETCH = 3
+
+
+class TenantRepository:
     """
-    Data access for chat sessions/messages within a tenant schema.
-    All operations set `search_path` to target the tenant schema.
+    Base of data access within a tenant schema.
+    ORM statements are rendered into the tenant schema via `schema_translate_map`; raw
+    psycopg statements use schema-qualified identifiers.
     """
 
     def __init__(self, session: AsyncSession, schema: str) -> None:
         self._s = session
         self._schema = schema
-        self._Base, self._ChatSession, self._ChatMessage = get_chat_models(schema)
+        self._opts = tenant_execution_options(schema)
+
+    async def _execute(self, stmt: Executable) -> Result:
+        return await self._s.execute(stmt, execution_options=self._opts)
+
+    def _table(self, name: str) -> sql.Identifier:
+        return sql.Identifier(self._schema, name)
 
-    async def _scope(self) -> None:
-        await set_search_path(self._s, self._schema)
+    async def _driver_connection(self) -> AsyncConnection:
+        conn = await self._s.connection()
+        raw = await conn.get_raw_connection()
+        return raw.driver_connection  # psycopg AsyncConnection under the pooled wrapper
 
-    async def create_session(self, *, name: Optional[str] = None) -> UUID:
-        await self._scope()
-        sid = uuid4()
-        obj = self._ChatSession(id=sid, name=name)
-        self._s.add(obj)
+    # --- Pipelined exchange -------------------------------------------------------------
+    # Each DB phase (e.g. half of a chat turn) is one pipelined exchange on the session's
+    # connection: BEGIN, the statements and COMMIT go out together and are read back after
+    # one Sync.
+
+    @asynccontextmanager
+    async def _exchange(self) -> AsyncIterator[AsyncConnection]:
+        pg = await self._driver_connection()
+        # Explicit BEGIN/COMMIT under autocommit: psycopg's implicit BEGIN and commit()
+        # would each force a Sync (an extra round trip) inside the pipeline.
+        await pg.set_autocommit(True)
+        try:
+            async with pg.pipeline():
+                await pg.execute("BEGIN")
+                yield pg
+                await pg.execute("COMMIT")
+        except BaseException:
+            if not pg.closed and pg.info.transaction_status != TransactionStatus.IDLE:
+                await pg.execute("ROLLBACK")
+            raise
+        finally:
+            if not pg.closed:
+                await pg.set_autocommit(False)
+        # Already committed on the wire; this only closes the Session's transaction state.
         await self._s.commit()
-        return sid
 
-    async def get_session_exists(self, session_id: UUID) -> bool:
-        await self._scope()
-        res = await self._s.execute(
-            select(self._ChatSession.id).where(self._ChatSession.id == session_id)
-        )
-        return res.scalar_one_or_none() is not None
 
-    async def append_message(
-        self, session_id: UUID, role: str, content: str, meta: Optional[dict] = None
-    ) -> UUID:
-        await self._scope()
+class ChatRepository(TenantRepository):
+    """Data access for chat sessions/messages within a tenant schema."""
+
+    async def begin_turn(
+        self,
+        session_id: Optional[UUID],
+        *,
+        role: str,
+        content: str,
+        history_limit: int,
+        since: Optional[datetime] = None,
+        token_count: Optional[int] = None,
+        token_counter: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> TurnStart:
+        """
+        Create the session (if `session_id` is None) or check it exists (reading its rolling
+        summary), load the last `history_limit` messages (only those created after `since`,
+        if given) and insert the incoming message, then commit. Stored token counts are
+        returned only where `token_counter` (the caller's tokenizer) produced them.
+
+        Raises LookupError, with nothing written, if the given session does not exist.
+        """
+        sessions, messages = self._table("chat_sessions"), self._table("chat_messages")
+        created = session_id is None
+        sid = session_id if session_id is not None else uuid4()
+        state_cur = history_cur = None
         mid = uuid4()
-        msg = self._ChatMessage(id=mid, session_id=session_id, role=role, content=content, meta=meta)
-        self._s.add(msg)
-        await self._s.commit()
-        return mid
-
-    async def fetch_recent_messages(self, session_id: UUID, limit: int) -> list[dict]:
-        await self._scope()
-        res = await self._s.execute(
-            select(self._ChatMessage)
-            .where(self._ChatMessage.session_id == session_id)
-            .order_by(self._ChatMessage.created_at.desc())
-            .limit(limit)
+
+        async with self._exchange() as pg:
+            if created:
+                await pg.execute(
+                    sql.SQL("INSERT INTO {} (id, name) VALUES (%s, %s)").format(sessions), (sid, name)
+                )
+                insert_cur = await pg.execute(
+                    sql.SQL(
+                        "INSERT INTO {} (id, session_id, role, content, token_count, token_counter) "
+                        "VALUES (%s, %s, %s, %s, %s, %s) RETURNING created_at"
+                    ).format(messages),
+                    (mid, sid, role, content, token_count, token_counter),
+                )
+            else:
+                state_cur = await pg.execute(
+                    sql.SQL(
+                        "SELECT summary, summary_through, "
+                        "CASE WHEN summary_token_counter = %s THEN summary_token_count END FROM {} WHERE id = %s"
+                    ).format(sessions),
+                    (token_counter, sid),
+                )
+                history_cur = await pg.execute(
+                    sql.SQL(
+                        "SELECT id, role, content, created_at, "
+                        "CASE WHEN token_counter = %s THEN token_count END FROM {} "
+                        "WHERE session_id = %s AND created_at > COALESCE(%s, '-infinity'::timestamptz) "
+                        "ORDER BY created_at DESC LIMIT %s"
+                    ).format(messages),
+                    (token_counter, sid, since, history_limit),
+                )
+                # Guarded so an unknown session inserts nothing instead of failing the FK.
+                insert_cur = await pg.execute(
+                    sql.SQL(
+                        "INSERT INTO {} (id, session_id, role, content, token_count, token_counter) "
+                        "SELECT %s, %s, %s, %s, %s, %s WHERE EXISTS (SELECT 1 FROM {} WHERE id = %s) "
+                        "RETURNING created_at"
+                    ).format(messages, sessions),
+                    (mid, sid, role, content, token_count, token_counter, sid),
+                )
+
+        summary: Optional[SessionSummary] = None
+        if state_cur is not None:
+            state = await state_cur.fetchone()
+            if state is None:
+                raise LookupError(f"Session not found: {sid}")
+            if state[0] is not None:
+                summary = SessionSummary(*state)
+        history: list[MessageRow] = []
+        if history_cur is not None:
+            history = [tuple(r) for r in await history_cur.fetchall()]
+            history.reverse()  # oldest→newest for context
+        created_at = (await insert_cur.fetchone())[0]
+        return TurnStart(sid, history, (mid, role, content, created_at, token_count), summary)
+
+    async def finish_turn(
+        self,
+        session_id: UUID,
+        content: str,
+        meta: Optional[dict] = None,
+        *,
+        token_count: Optional[int] = None,
+        token_counter: Optional[str] = None,
+    ) -> MessageRow:
+        """Insert the assistant reply and commit in one exchange; returns the stored row."""
+        mid = uuid4()
+        async with self._exchange() as pg:
+            cur = await pg.execute(
+                sql.SQL(
+                    "INSERT INTO {} (id, session_id, role, content, meta, token_count, token_counter) "
+                    "VALUES (%s, %s, 'assistant', %s, %s, %s, %s) RETURNING created_at"
+                ).format(self._table("chat_messages")),
+                (mid, session_id, content, Jsonb(meta) if meta is not None else None, token_count, token_counter),
+            )
+        return (mid, "assistant", content, (await cur.fetchone())[0], token_count)
+
+    # --- Rolling summary ---------------------------------------------------------------
+
+    async def fetch_summary_input(
+        self, session_id: UUID, *, keep: int, limit: int
+    ) -> tuple[bool, Optional[SessionSummary], list[MessageRow]]:
+        """
+        Read a session's summary and up to `limit` messages not yet folded into it (oldest
+        first), leaving out the newest `keep` messages. Returns (exists, summary, rows).
+        """
+        sessions, messages = self._table("chat_sessions"), self._table("chat_messages")
+        async with self._exchange() as pg:
+            state_cur = await pg.execute(
+                sql.SQL("SELECT summary, summary_through, summary_token_count FROM {} WHERE id = %s").format(
+                    sessions
+                ),
+                (session_id,),
+            )
+            rows_cur = await pg.execute(
+                sql.SQL(
+                    "SELECT id, role, content, created_at, token_count FROM {m} "
+                    "WHERE session_id = %s "
+                    "AND created_at > COALESCE((SELECT summary_through FROM {s} WHERE id = %s), '-infinity') "
+                    "AND id NOT IN (SELECT id FROM {m} WHERE session_id = %s ORDER BY created_at DESC LIMIT %s) "
+                    "ORDER BY created_at ASC LIMIT %s"
+                ).format(m=messages, s=sessions),
+                (session_id, session_id, session_id, keep, limit),
+            )
+        state = await state_cur.fetchone()
+        if state is None:
+            return False, None, []
+        summary = SessionSummary(*state) if state[0] is not None else None
+        return True, summary, [tuple(r) for r in await rows_cur.fetchall()]
+
+    async def store_summary(
+        self,
+        session_id: UUID,
+        summary: SessionSummary,
+        *,
+        expected_through: Optional[datetime],
+        token_counter: Optional[str] = None,
+    ) -> bool:
+        """
+        Replace the session's summary unless another writer advanced it since it was read
+        (`expected_through`). Returns False when nothing was written. `token_counter` names
+        the tokenizer of `summary.token_count`.
+        """
+        async with self._exchange() as pg:
+            cur = await pg.execute(
+                sql.SQL(
+                    "UPDATE {} SET summary = %s, summary_through = %s, summary_token_count = %s, "
+                    "summary_token_counter = %s, summary_updated_at = now() "
+                    "WHERE id = %s AND summary_through IS NOT DISTINCT FROM %s"
+                ).format(self._table("chat_sessions")),
+                (summary.text, summary.through, summary.token_count, token_counter, session_id, expected_through),
+            )
+        return cur.rowcount == 1
+
+    # --- Idempotency keys -------------------------------------------------------------
+
+    async def claim_idempotency_key(
+        self, key: str, request_hash: str, *, ttl_s: float, lease_s: float, sweep: int = 100
+    ) -> Optional[IdempotencyRecord]:
+        """
+        Record `key` as pending for this caller. Returns None when claimed, else the existing
+        record. Expired records (older than `ttl_s`) and pending ones not finished within
+        `lease_s` (their worker died) are taken over. Also deletes up to `sweep` expired keys.
+        """
+        table = self._table("chat_idempotency")
+        async with self._exchange() as pg:
+            await pg.execute(
+                sql.SQL(
+                    "DELETE FROM {t} WHERE key IN (SELECT key FROM {t} "
+                    "WHERE created_at < now() - make_interval(secs => %s) AND key <> %s LIMIT %s)"
+                ).format(t=table),
+                (ttl_s, key, sweep),
+            )
+            claim_cur = await pg.execute(
+                sql.SQL(
+                    "INSERT INTO {t} AS i (key, request_hash, status) VALUES (%s, %s, 'pending') "
+                    "ON CONFLICT (key) DO UPDATE SET request_hash = EXCLUDED.request_hash, status = 'pending', "
+                    "response = NULL, created_at = now(), updated_at = now() "
+                    "WHERE i.created_at < now() - make_interval(secs => %s) "
+                    "OR (i.status = 'pending' AND i.updated_at < now() - make_interval(secs => %s)) "
+                    "RETURNING 1"
+                ).format(t=table),
+                (key, request_hash, ttl_s, lease_s),
+            )
+            existing_cur = await pg.execute(
+                sql.SQL("SELECT status, request_hash, response FROM {} WHERE key = %s").format(table), (key,)
+            )
+        if await claim_cur.fetchone() is not None:
+            return None
+        row = await existing_cur.fetchone()
+        if row is None:  # deleted in between; the caller simply claims again
+            return IdempotencyRecord("pending", request_hash, None)
+        return IdempotencyRecord(*row)
+
+    async def complete_idempotency_key(self, key: str, response: dict) -> None:
+        async with self._exchange() as pg:
+            await pg.execute(
+                sql.SQL(
+                    "UPDATE {} SET status = 'done', response = %s, updated_at = now() WHERE key = %s"
+                ).format(self._table("chat_idempotency")),
+                (Jsonb(response), key),
+            )
+
+    async def release_idempotency_key(self, key: str) -> None:
+        """Forget a pending key whose request failed, so a retry runs it again."""
+        async with self._exchange() as pg:
+            await pg.execute(
+                sql.SQL("DELETE FROM {} WHERE key = %s AND status = 'pending'").format(
+                    self._table("chat_idempotency")
+                ),
+                (key,),
+            )
+
+    # --- Long-term memory ---------------------------------------------------------------
+
+    async def recall_messages(
+        self,
+        embedding: Sequence[float],
+        *,
+        model: str,
+        limit: int,
+        min_similarity: float,
+        session_id: Optional[UUID] = None,
+        token_counter: Optional[str] = None,
+    ) -> list[Recollection]:
+        """
+        Messages whose stored embedding (by `model`) is nearest to `embedding`, most similar
+        first, down to `min_similarity`. With `session_id` the session's vectors are scanned
+        exactly (a filtered HNSW scan could return too few); otherwise the tenant-wide HNSW
+        index is used. Candidates are over-fetched before the join with chat_messages, so
+        vectors whose message is gone (e.g. deleted with its session) do not shrink the result.
+        """
+        d = sql.Literal(len(embedding))
+        fetch = int(limit) * _RECALL_OVERFETCH
+        params = {
+            "q": _vector_literal(embedding),
+            "model": model,
+            "k": int(limit),
+            "fetch": fetch,
+            "max_dist": 1.0 - float(min_similarity),
+            "sid": session_id,
+            "counter": token_counter,
+        }
+        if session_id is not None:
+            # MATERIALIZED keeps the planner from pushing the session filter below an HNSW scan
+            candidates = sql.SQL(
+                "WITH cand AS MATERIALIZED (SELECT message_id, created_at, embedding FROM {e} "
+                "WHERE session_id = %(sid)s AND model = %(model)s AND vector_dims(embedding) = {d}) "
+                "SELECT message_id, created_at, embedding::vector({d}) <=> %(q)s::vector({d}) AS dist "
+                "FROM cand ORDER BY dist LIMIT %(fetch)s"
+            )
+        else:
+            candidates = sql.SQL(
+                "SELECT message_id, created_at, embedding::vector({d}) <=> %(q)s::vector({d}) AS dist "
+                "FROM {e} WHERE model = %(model)s AND vector_dims(embedding) = {d} "
+                "ORDER BY embedding::vector({d}) <=> %(q)s::vector({d}) LIMIT %(fetch)s"
+            )
+        query = sql.SQL(
+            "SELECT m.id, m.role, m.content, m.created_at, "
+            "CASE WHEN m.token_counter = %(counter)s THEN m.token_count END, 1 - c.dist "
+            "FROM ({candidates}) AS c JOIN {m} AS m ON m.id = c.message_id AND m.created_at = c.created_at "
+            "WHERE c.dist <= %(max_dist)s ORDER BY c.dist LIMIT %(k)s"
+        ).format(
+            candidates=candidates.format(e=self._table("message_embeddings"), d=d),
+            m=self._table("chat_messages"),
         )
-        rows = list(res.scalars())
-        rows.reverse()  # oldest→newest for context
-        return [
-            {
-                "id": r.id,
-                "role": r.role,
-                "content": r.content,
-                "created_at": r.created_at,
-            }
-            for r in rows
-        ]
-
-    async def list_sessions(self, limit: int = 50, before: Optional[datetime] = None) -> list[dict]:
-        await self._scope()
-        q = select(self._ChatSession).order_by(self._ChatSession.created_at.desc()).limit(limit)
-        if before is not None:
-            q = q.where(self._ChatSession.created_at < before)
-        res = await self._s.execute(q)
-        rows = list(res.scalars())
-        return [{"id": r.id, "created_at": r.created_at, "name": r.name} for r in rows]
+        async with self._exchange() as pg:
+            if session_id is None:
+                # An HNSW scan returns at most ef_search rows (default 40).
+                ef_search = sql.Literal(min(1000, max(40, fetch)))
+                await pg.execute(sql.SQL("SET LOCAL hnsw.ef_search = {}").format(ef_search))
+            cur = await pg.execute(query, params)
+        return [Recollection(tuple(r[:5]), float(r[5])) for r in await cur.fetchall()]
 
-    async def fetch_session_messages(
-        self, session_id: UUID, limit: int = 100, before: Optional[UUID] = None
-    ) -> list[dict]:
-        await self._scope()
-        q = select(self._ChatMessage).where(self._ChatMessage.session_id == session_id)
-
-        if before is not None:
-            # Find the timestamp of the 'before' message for pagination
-            res0 = await self._s.execute(
-                select(self._ChatMessage.created_at).where(self._ChatMessage.id == before)
+    async def store_message_embeddings(
+        self, rows: Sequence[tuple[UUID, UUID, datetime, Sequence[float]]], *, model: str
+    ) -> None:
+        """Store (message_id, session_id, created_at, embedding) rows; already indexed ids are kept."""
+        async with self._exchange() as pg:
+            async with pg.cursor() as cur:
+                await cur.executemany(
+                    sql.SQL(
+                        "INSERT INTO {} (message_id, session_id, model, embedding, created_at) "
+                        "VALUES (%s, %s, %s, %s::vector, %s) ON CONFLICT (message_id) DO NOTHING"
+                    ).format(self._table("message_embeddings")),
+                    [(mid, sid, model, _vector_literal(vec), ts) for mid, sid, ts, vec in rows],
+                )
+
+    # --- Bulk export --------------------------------------------------------------------
+
+    async def iter_transcript(
+        self,
+        *,
+        session_id: Optional[UUID] = None,
+        since: Optional[datetime] = None,
+        batch_size: int = 2000,
+    ) -> AsyncIterator[TranscriptRow]:
+        """
+        Every session (oldest first) with its messages (ascending), read through a server-side
+        cursor `batch_size` rows per fetch, on one read-only REPEATABLE READ snapshot; memory
+        stays constant however large the tenant. With `since`, only messages created at or
+        after it (and their sessions) are returned. Holds the connection until exhausted.
+        """
+        pg = await self._driver_connection()
+        where: list[sql.Composable] = []
+        params: list[object] = []
+        if session_id is not None:
+            where.append(sql.SQL("s.id = %s"))
+            params.append(session_id)
+        join = sql.SQL("LEFT JOIN")
+        if since is not None:
+            join = sql.SQL("JOIN")
+            where.append(sql.SQL("m.created_at >= %s"))
+            params.append(since)
+        query = sql.SQL(
+            "SELECT s.id, s.created_at, s.name, m.id, m.role, m.content, m.meta, m.created_at, m.token_count "
+            "FROM {s} AS s {join} {m} AS m ON m.session_id = s.id {where} "
+            "ORDER BY s.created_at, s.id, m.created_at, m.id"
+        ).format(
+            s=self._table("chat_sessions"),
+            m=self._table("chat_messages"),
+            join=join,
+            where=sql.SQL("WHERE ") + sql.SQL(" AND ").join(where) if where else sql.SQL(""),
+        )
+        try:
+            await pg.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+            async with pg.cursor(name=f"noosphera_export_{uuid4().hex}") as cur:
+                cur.itersize = int(batch_size)
+                await cur.execute(query, params)
+                async for row in cur:
+                    yield row
+        finally:
+            await self._s.rollback()
+
+    # --- Bulk import --------------------------------------------------------------------
+
+    async def copy_transcript(
+        self,
+        sessions: Sequence[SessionCopyRow],
+        messages: Sequence[MessageCopyRow],
+        *,
+        skip_existing: bool = False,
+    ) -> None:
+        """
+        Load a batch of sessions, then messages, with binary COPY in one transaction. A duplicate
+        id fails the batch; with `skip_existing` rows are staged in temporary tables and rows
+        already present are skipped (re-running an interrupted import), at some extra cost.
+        """
+        pg = await self._driver_connection()
+        s_table, m_table = self._table("chat_sessions"), self._table("chat_messages")
+        try:
+            async with pg.cursor() as cur:
+                if skip_existing:
+                    await cur.execute(
+                        "CREATE TEMP TABLE IF NOT EXISTS noosphera_import_sessions "
+                        "(id uuid, created_at timestamptz, name text) ON COMMIT DELETE ROWS"
+                    )
+                    await cur.execute(
+                        "CREATE TEMP TABLE IF NOT EXISTS noosphera_import_messages "
+                        "(id uuid, session_id uuid, role text, content text, meta jsonb, "
+                        "created_at timestamptz, token_count integer) ON COMMIT DELETE ROWS"
+                    )
+                    s_into = sql.Identifier("noosphera_import_sessions")
+                    m_into = sql.Identifier("noosphera_import_messages")
+                else:
+                    s_into, m_into = s_table, m_table
+                if sessions:
+                    await self._copy_rows(cur, s_into, _SESSION_COPY_COLUMNS, _SESSION_COPY_TYPES, sessions)
+                if messages:
+                    await self._copy_rows(cur, m_into, _MESSAGE_COPY_COLUMNS, _MESSAGE_COPY_TYPES, messages)
+                if skip_existing:
+                    for target, staged, columns in (
+                        (s_table, s_into, _SESSION_COPY_COLUMNS),
+                        (m_table, m_into, _MESSAGE_COPY_COLUMNS),
+                    ):
+                        cols = sql.SQL(", ").join(map(sql.Identifier, columns))
+                        await cur.execute(
+                            sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {} ON CONFLICT DO NOTHING").format(
+                                target, cols, cols, staged
+                            )
+                        )
+            await self._s.commit()
+        except BaseException:
+            await self._s.rollback()
+            raise
+
+    @staticmethod
+    async def _copy_rows(
+        cur, table: sql.Composable, columns: Sequence[str], types: Sequence[str], rows: Sequence[tuple]
+    ) -> None:
+        stmt = sql.SQL("COPY {} ({}) FROM STDIN (FORMAT BINARY)").format(
+            table, sql.SQL(", ").join(map(sql.Identifier, columns))
+        )
+        async with cur.copy(stmt) as copy:
+            copy.set_types(list(types))
+            for row in rows:
+                await copy.write_row(row)
+
+    # --- Semantic response cache --------------------------------------------------------
+
+    async def find_semantic_answer(
+        self,
+        embedding: Sequence[float],
+        *,
+        model: str,
+        min_similarity: float,
+        max_age_s: float,
+    ) -> Optional[SemanticHit]:
+        """
+        Nearest stored prompt for `model` (HNSW, cosine) newer than `max_age_s`; None unless
+        its similarity reaches `min_similarity`.
+        """
+        dims = sql.Literal(len(embedding))
+        async with self._exchange() as pg:
+            cur = await pg.execute(
+                sql.SQL(
+                    "SELECT id, answer, 1 - (embedding::vector({d}) <=> %(q)s::vector({d})) FROM {t} "
+                    "WHERE vector_dims(embedding) = {d} AND model = %(model)s "
+                    "AND created_at > now() - make_interval(secs => %(age)s) "
+                    "ORDER BY embedding::vector({d}) <=> %(q)s::vector({d}) LIMIT 1"
+                ).format(d=dims, t=self._table("semantic_cache")),
+                {"q": _vector_literal(embedding), "model": model, "age": float(max_age_s)},
+            )
+        row = await cur.fetchone()
+        if row is None or row[2] is None or row[2] < min_similarity:
+            return None
+        return SemanticHit(row[0], row[1], float(row[2]))
+
+    async def store_semantic_answer(
+        self,
+        embedding: Sequence[float],
+        *,
+        model: str,
+        prompt: str,
+        answer: str,
+        meta: Optional[dict] = None,
+        max_age_s: float,
+        sweep: int = 100,
+    ) -> UUID:
+        """
+        Record a (prompt embedding -> answer) pair for later near-duplicate lookups. Also
+        deletes up to `sweep` entries older than `max_age_s` (never matched again).
+        """
+        cid = uuid4()
+        table = self._table("semantic_cache")
+        async with self._exchange() as pg:
+            await pg.execute(
+                sql.SQL(
+                    "DELETE FROM {t} WHERE id IN (SELECT id FROM {t} "
+                    "WHERE created_at < now() - make_interval(secs => %s) LIMIT %s)"
+                ).format(t=table),
+                (float(max_age_s), sweep),
+            )
+            await pg.execute(
+                sql.SQL(
+                    "INSERT INTO {} (id, model, prompt, answer, embedding, meta) VALUES (%s, %s, %s, %s, %s::vector, %s)"
+                ).format(table),
+                (cid, model, prompt, answer, _vector_literal(embedding), Jsonb(meta) if meta is not None else None),
             )
-            ts = res0.scalar_one_or_none()
-            if ts is not None:
-                q = q.where(self._ChatMessage.created_at < ts)
+        return cid
+
+    async def list_sessions(
+        self, limit: int = 50, after: Optional[Position] = None
+    ) -> tuple[list[SessionOutRow], Optional[Position]]:
+        """
+        Sessions newest first, starting after keyset position `after`. Returns the page and
+        the position to continue from (None on the last page). One indexed query per page.
+        """
+        S = ChatSession
+        q = select(S.id, S.created_at, S.name).order_by(S.created_at.desc(), S.id.desc()).limit(limit + 1)
+        if after is not None:
+            q = q.where(tuple_(S.created_at, S.id) < tuple_(*after))
+        rows = list((await self._execute(q)).tuples())
+        more = len(rows) > limit
+        del rows[limit:]
+        return rows, ((rows[-1][1], rows[-1][0]) if more else None)
 
-        q = q.order_by(self._ChatMessage.created_at.desc()).limit(limit)
-        res = await self._s.execute(q)
-        rows = list(res.scalars())
+    async def fetch_session_messages(
+        self,
+        session_id: UUID,
+        limit: int = 100,
+        before: Optional[UUID] = None,
+        *,
+        after: Optional[Position] = None,
+    ) -> tuple[list[MessageOutRow], Optional[Position]]:
+        """
+        One page of a session's messages, walking back from the newest: rows older than keyset
+        position `after` (or than message `before`; the newest page if there is no such
+        message), returned ascending. Also returns the position to continue from (None when no
+        older messages remain).
+        """
+        rows = list((await self._execute(session_messages_query(session_id, limit, before, after))).tuples())
+        more = len(rows) > limit
+        del rows[limit:]
+        nxt = (rows[-1][3], rows[-1][0]) if more else None
         rows.reverse()
-        return [
-            {
-                "id": r.id,
-                "role": r.role,
-                "content": r.content,
-                "created_at": r.created_at,
-            }
-            for r in rows
-        ]
+        return rows, nxt
+
+    async def search_messages(
+        self,
+        query: str,
+        *,
+        session_id: Optional[UUID] = None,
+        limit: int = 20,
+        after: Optional[SearchPosition] = None,
+    ) -> tuple[list[SearchHitRow], Optional[SearchPosition]]:
+        """
+        Messages matching web-search syntax `query` ("quoted phrase", or, -not) through the GIN
+        expression index on to_tsvector(SEARCH_CONFIG, content), best first (ts_rank_cd, then newest), after keyset position
+        `after`. Snippets are highlighted for the returned page only.
+        """
+        M = ChatMessage
+        config = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+        tsq = func.websearch_to_tsquery(config, query)
+        # Must be the indexed expression (tenant_chat_bootstrap.SEARCH_EXPRESSION) to use the index.
+        tsv = func.to_tsvector(config, M.content)
+        rank = func.ts_rank_cd(tsv, tsq)
+        snippet = func.ts_headline(config, M.content, tsq, "MaxFragments=2, MaxWords=20, MinWords=5")
+        q = select(M.id, M.session_id, M.role, M.created_at, rank, snippet).where(tsv.op("@@")(tsq))
+        if session_id is not None:
+            q = q.where(M.session_id == session_id)
+        if after is not None:
+            q = q.where(tuple_(rank, M.created_at, M.id) < tuple_(*after))
+        q = q.order_by(rank.desc(), M.created_at.desc(), M.id.desc()).limit(limit + 1)
+        rows = list((await self._execute(q)).tuples())
+        more = len(rows) > limit
+        del rows[limit:]
+        return rows, ((rows[-1][4], rows[-1][3], rows[-1][0]) if more else None)
+
+
+@asynccontextmanager
+async def open_chat_repository(schema: str) -> AsyncIterator[ChatRepository]:
+    """
+    Short-lived repository over its own session. The pooled connection is returned on exit,
+    so callers should keep the block to DB work only (never span an LLM call).
+    """
+    async with get_session() as s:
+        yield ChatRepository(s, schema)
@@ -0,0 +1,135 @@
+# FILE: noosphera/repositories/document_repository.py
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, NamedTuple, Optional, Sequence
+from uuid import UUID, uuid4
+
+from psycopg import sql
+
+from ..db.session import get_session
+from .chat_repository import TenantRepository, _vector_literal
+
+# (id, document_id, collection, ord, content, content_hash, token_count, model, embedding literal)
+ChunkCopyRow = tuple[UUID, UUID, str, int, str, str, Optional[int], str, str]
+_CHUNK_COPY_COLUMNS = (
+    "id", "document_id", "collection", "ord", "content", "content_hash", "token_count", "model", "embedding",
+)
+
+# Retrieval scans at least this many times `limit` index candidates (see search_chunks).
+_SEARCH_OVERFETCH = 10
+
+
+class ChunkHit(NamedTuple):
+    id: UUID
+    document_id: UUID
+    document_name: Optional[str]
+    ord: int
+    content: str
+    token_count: Optional[int]
+    similarity: float  # cosine similarity of the chunk to the probe
+
+
+class DocumentRepository(TenantRepository):
+    """Data access for the tenant's document store (documents and embedded chunks)."""
+
+    async def create_document(self, collection: str, *, name: Optional[str] = None) -> UUID:
+        did = uuid4()
+        async with self._exchange() as pg:
+            await pg.execute(
+                sql.SQL("INSERT INTO {} (id, collection, name) VALUES (%s, %s, %s)").format(
+                    self._table("documents")
+                ),
+                (did, collection, name),
+            )
+        return did
+
+    async def complete_document(self, document_id: UUID, *, content_hash: str, chunk_count: int) -> None:
+        async with self._exchange() as pg:
+            await pg.execute(
+                sql.SQL(
+                    "UPDATE {} SET content_hash = %s, chunk_count = %s, completed_at = now() WHERE id = %s"
+                ).format(self._table("documents")),
+                (content_hash, chunk_count, document_id),
+            )
+
+    async def known_embeddings(self, hashes: Sequence[str], *, model: str) -> dict[str, str]:
+        """Stored embeddings (as vector literals) of chunks with these content hashes, by `model`."""
+        if not hashes:
+            return {}
+        async with self._exchange() as pg:
+            cur = await pg.execute(
+                sql.SQL(
+                    "SELECT DISTINCT ON (content_hash) content_hash, embedding::text FROM {} "
+                    "WHERE model = %s AND content_hash = ANY(%s)"
+                ).format(self._table("document_chunks")),
+                (model, list(hashes)),
+            )
+        return dict(await cur.fetchall())
+
+    async def copy_chunks(self, rows: Sequence[ChunkCopyRow]) -> None:
+        """Load embedded chunks with COPY in one transaction (text format: vectors are literals)."""
+        pg = await self._driver_connection()
+        stmt = sql.SQL("COPY {} ({}) FROM STDIN").format(
+            self._table("document_chunks"), sql.SQL(", ").join(map(sql.Identifier, _CHUNK_COPY_COLUMNS))
+        )
+        try:
+            async with pg.cursor() as cur:
+                async with cur.copy(stmt) as copy:
+                    for row in rows:
+                        await copy.write_row(row)
+            await self._s.commit()
+        except BaseException:
+            await self._s.rollback()
+            raise
+
+    async def search_chunks(
+        self,
+        embedding: Sequence[float],
+        *,
+        collection: str,
+        model: str,
+        limit: int,
+        min_similarity: float,
+        ef_search: int = 100,
+    ) -> list[ChunkHit]:
+        """
+        Chunks of `collection` nearest to `embedding` (HNSW, cosine), most similar first, down
+        to `min_similarity`.
+
+        The index covers every collection: the scan yields the `ef_search` nearest chunks of
+        the tenant and the collection filter applies to those. The candidate set is widened
+        to `_SEARCH_OVERFETCH * limit` (at least `ef_search`, at most 1000), but a collection
+        that is a small share of a large tenant can still come back with fewer than `limit`
+        chunks, or none.
+        """
+        d = sql.Literal(len(embedding))
+        candidates = min(1000, max(int(ef_search), int(limit) * _SEARCH_OVERFETCH))
+        async with self._exchange() as pg:
+            await pg.execute(sql.SQL("SET LOCAL hnsw.ef_search = {}").format(sql.Literal(candidates)))
+            cur = await pg.execute(
+                sql.SQL(
+                    "SELECT c.id, c.document_id, doc.name, c.ord, c.content, c.token_count, 1 - c.dist FROM ("
+                    "SELECT id, document_id, ord, content, token_count, "
+                    "embedding::vector({d}) <=> %(q)s::vector({d}) AS dist FROM {chunks} "
+                    "WHERE collection = %(collection)s AND model = %(model)s AND vector_dims(embedding) = {d} "
+                    "ORDER BY embedding::vector({d}) <=> %(q)s::vector({d}) LIMIT %(k)s"
+                    ") AS c JOIN {docs} AS doc ON doc.id = c.document_id "
+                    "WHERE c.dist <= %(max_dist)s ORDER BY c.dist"
+                ).format(d=d, chunks=self._table("document_chunks"), docs=self._table("documents")),
+                {
+                    "q": _vector_literal(embedding),
+                    "collection": collection,
+                    "model": model,
+                    "k": int(limit),
+                    "max_dist": 1.0 - float(min_similarity),
+                },
+            )
+        return [ChunkHit(*r[:6], float(r[6])) for r in await cur.fetchall()]
+
+
+@asynccontextmanager
+async def open_document_repository(schema: str) -> AsyncIterator[DocumentRepository]:
+    """Short-lived repository over its own session (see open_chat_repository)."""
+    async with get_session() as s:
+        yield DocumentRepository(s, schema)
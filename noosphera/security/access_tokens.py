@@ -0,0 +1,147 @@
+# RATIONALE:
+# High-RPS clients exchange a long-lived `ns_` API key for a short-lived signed access token
+# that can be verified statelessly (no DB, no bcrypt). Revocation = short TTL + denylist.
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from dataclasses import dataclass
+from uuid import UUID
+
+from ..db.models.core import ApiKey, KeyStatus, Tenant, TenantStatus
+
+ACCESS_TOKEN_PREFIX = "nsat_"
+_VERSION = 2  # v2: issued_at in milliseconds (v1: seconds)
+
+
+def _b64e(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64d(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+@dataclass(slots=True)
+class AccessClaims:
+    tenant_id: UUID
+    tenant_name: str
+    db_schema_name: str
+    key_id: UUID
+    key_prefix: str
+    issued_at: int  # epoch milliseconds
+    expires_at: int  # epoch seconds
+
+    def to_models(self) -> tuple[Tenant, ApiKey]:
+        """Detached ORM instances for request.state consumers (same shape as API-key auth)."""
+        tenant = Tenant(
+            id=self.tenant_id,
+            name=self.tenant_name,
+            db_schema_name=self.db_schema_name,
+            status=TenantStatus.active,
+        )
+        key = ApiKey(id=self.key_id, tenant_id=self.tenant_id, key_prefix=self.key_prefix, status=KeyStatus.active)
+        return tenant, key
+
+
+class AccessTokenIssuer:
+    """
+    Issues and verifies `nsat_<payload>.<signature>` tokens (HMAC-SHA256 over the payload).
+
+    Denylist entries are "not before" timestamps per key prefix / tenant: tokens issued at
+    or before that millisecond are rejected, so a token minted right after the key is
+    re-enabled is accepted. Entries are dropped once every token they could match has
+    expired (one TTL later). The denylist is per process: other workers learn of a
+    revocation through the key directory (`security.directory_enabled`), otherwise their
+    outstanding tokens stay valid until they expire.
+    """
+
+    def __init__(self, secret: str, *, ttl_s: int = 300) -> None:
+        self._secret = secret.encode("utf-8")
+        self.ttl_s = int(ttl_s)
+        self._denied_keys: dict[str, int] = {}  # epoch milliseconds
+        self._denied_tenants: dict[UUID, int] = {}
+
+    def _sign(self, payload_b64: str) -> str:
+        mac = hmac.new(self._secret, (ACCESS_TOKEN_PREFIX + payload_b64).encode("ascii"), hashlib.sha256)
+        return _b64e(mac.digest())
+
+    def issue(self, tenant: Tenant, key: ApiKey) -> tuple[str, int]:
+        """Return (token, expires_at epoch seconds)."""
+        now_ms = _now_ms()
+        exp = now_ms // 1000 + self.ttl_s
+        if key.expires_at is not None:
+            exp = min(exp, int(key.expires_at.timestamp()))
+        payload = {
+            "v": _VERSION,
+            "t": str(tenant.id),
+            "n": tenant.name,
+            "s": tenant.db_schema_name,
+            "k": str(key.id),
+            "p": key.key_prefix,
+            "i": now_ms,
+            "e": exp,
+        }
+        payload_b64 = _b64e(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        return f"{ACCESS_TOKEN_PREFIX}{payload_b64}.{self._sign(payload_b64)}", exp
+
+    def verify(self, token: str) -> AccessClaims:
+        """Validate signature, expiry and denylist. Raises PermissionError."""
+        if not token.startswith(ACCESS_TOKEN_PREFIX):
+            raise PermissionError("Invalid access token")
+        payload_b64, sep, sig = token[len(ACCESS_TOKEN_PREFIX) :].partition(".")
+        if not sep or not hmac.compare_digest(sig, self._sign(payload_b64)):
+            raise PermissionError("Invalid access token")
+        try:
+            data = json.loads(_b64d(payload_b64))
+            claims = AccessClaims(
+                tenant_id=UUID(data["t"]),
+                tenant_name=data["n"],
+                db_schema_name=data["s"],
+                key_id=UUID(data["k"]),
+                key_prefix=data["p"],
+                issued_at=int(data["i"]) * (1000 if data.get("v") == 1 else 1),
+                expires_at=int(data["e"]),
+            )
+        except (ValueError, KeyError, TypeError) as exc:
+            raise PermissionError("Invalid access token") from exc
+
+        if claims.expires_at <= time.time():
+            raise PermissionError("Access token expired")
+        if self._is_denied(claims):
+            raise PermissionError("Access token revoked")
+        return claims
+
+    def _is_denied(self, claims: AccessClaims) -> bool:
+        nbf = self._denied_keys.get(claims.key_prefix)
+        if nbf is not None and claims.issued_at <= nbf:
+            return True
+        nbf = self._denied_tenants.get(claims.tenant_id)
+        return nbf is not None and claims.issued_at <= nbf
+
+    def _prune(self) -> None:
+        horizon = _now_ms() - self.ttl_s * 1000
+        for d in (self._denied_keys, self._denied_tenants):
+            for k in [k for k, ts in d.items() if ts < horizon]:
+                del d[k]
+
+    def deny_key(self, key_prefix: str) -> None:
+        """Reject outstanding tokens minted from this key."""
+        self._prune()
+        self._denied_keys[key_prefix] = _now_ms()
+
+    def deny_tenant(self, tenant_id: UUID) -> None:
+        """Reject outstanding tokens of this tenant."""
+        self._prune()
+        self._denied_tenants[tenant_id] = _now_ms()
+
+    def denylist_size(self) -> int:
+        return len(self._denied_keys) + len(self._denied_tenants)
+
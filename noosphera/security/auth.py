@@ -1,18 +1,21 @@
 # RATIONALE:
 # Step 1.3 auth dependency: parse header -> verify token (prefix+bcrypt via TenantManager)
 # -> bind tenant context -> 401/403 mapping. Keep header name configurable via settings.
+# With the key directory live, both the success and the 403 path need no DB round trip.
+# `nsat_` access tokens (exchanged at POST /auth/token) are verified statelessly instead.
 from __future__ import annotations
 
-from typing import Optional
+from typing import Literal, Optional
 from uuid import UUID
 
 from fastapi import HTTPException, Request, status
 from pydantic import BaseModel
-from sqlalchemy import select
 
+from ..core.errors import AuthThrottledError, CryptoSaturatedError
 from ..db.models.core import ApiKey, Tenant, TenantStatus
-from ..db.session import get_session
-from ..services.tenant_manager import TenantManager
+from ..services.tenant_manager import TenantManager, TenantSuspendedError
+from .access_tokens import ACCESS_TOKEN_PREFIX
+from .flood import AuthFloodGuard
 
 
 class AuthContext(BaseModel):
@@ -24,6 +27,7 @@ class AuthContext(BaseModel):
     tenant_name: str
     key_prefix: str
     api_key_id: Optional[UUID] = None
+    auth_method: Literal["api_key", "access_token"] = "api_key"
 
 
 def _parse_token(token: str) -> tuple[str, str]:
@@ -39,13 +43,56 @@ def _parse_token(token: str) -> tuple[str, str]:
     return parts[1], parts[2]
 
 
+def _bearer_token(request: Request) -> Optional[str]:
+    auth = request.headers.get("Authorization")
+    if not auth:
+        return None
+    scheme, _, value = auth.partition(" ")
+    if scheme.lower() != "bearer":
+        return None
+    return value.strip() or None
+
+
+def _bind(request: Request, tenant: Tenant, key: ApiKey, method: str) -> AuthContext:
+    request.state.tenant = tenant
+    request.state.api_key = key
+    return AuthContext(
+        tenant_id=tenant.id,
+        tenant_name=tenant.name,
+        key_prefix=key.key_prefix,
+        api_key_id=key.id,
+        auth_method=method,
+    )
+
+
+def _verify_access_token(request: Request, tm: TenantManager, token: str) -> AuthContext:
+    """Stateless check of an `nsat_` token: signature, expiry, denylist. No DB, no bcrypt."""
+    issuer = tm.access_tokens
+    if issuer is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Access tokens not enabled")
+    try:
+        claims = issuer.verify(token)
+    except PermissionError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(exc),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    tenant, key = claims.to_models()
+    return _bind(request, tenant, key, "access_token")
+
+
 async def require_api_key(request: Request) -> AuthContext:
     """
     Enforce API-key auth:
-      1) Read header from settings.security.api_key_header.
+      1) Read header from settings.security.api_key_header (or `Authorization: Bearer`).
+         `nsat_` access tokens are verified statelessly and skip steps 2-4.
       2) Verify via TenantManager.verify_api_key(token).
       3) On success: attach tenant/key to request.state, return AuthContext.
-      4) On failure: 401; if tenant is suspended for that key prefix: 403.
+      4) On failure: 401; if tenant is suspended for that key prefix: 403;
+         503 if the crypto executor is saturated.
+      Repeat failures are refused up front by the flood guard (401 from the negative
+      cache, 429 when the (prefix, client) or client failure bucket is empty).
 
     Note: Do NOT log plaintext tokens.
     """
@@ -55,41 +102,63 @@ async def require_api_key(request: Request) -> AuthContext:
     except Exception:
         header_name = "X-Noosphera-API-Key"
 
-    token = request.headers.get(header_name)
+    token = request.headers.get(header_name) or _bearer_token(request)
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing API key")
 
     tm: TenantManager = request.app.state.tenant_manager  # type: ignore[attr-defined]
+    if token.startswith(ACCESS_TOKEN_PREFIX):
+        return _verify_access_token(request, tm, token)
+
+    guard: AuthFloodGuard | None = getattr(request.app.state, "auth_guard", None)
+    try:
+        prefix: Optional[str] = _parse_token(token)[0]
+    except ValueError:
+        prefix = None
+    client_ip = request.client.host if request.client else None
+    if guard is not None and guard.client_ip_header:
+        client_ip = guard.client_ip(client_ip, request.headers.get(guard.client_ip_header))
+
+    # Tokens verified moments ago skip the guard so failures under their prefix can't lock them out.
+    if guard is not None and not tm.is_recently_verified(token):
+        try:
+            guard.precheck(token, prefix, client_ip)
+        except PermissionError:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+        except AuthThrottledError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many failed authentication attempts",
+                headers={"Retry-After": str(max(1, int(exc.retry_after_s + 0.999)))},
+            )
+
     try:
         tenant, key = await tm.verify_api_key(token)
+    except TenantSuspendedError:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Tenant suspended")
     except PermissionError:
         # Map suspended tenants (by prefix) to 403; otherwise 401.
-        try:
-            prefix, _ = _parse_token(token)
-            async with get_session() as s:
-                res = await s.execute(
-                    select(Tenant.status)
-                    .select_from(ApiKey)
-                    .join(Tenant, Tenant.id == ApiKey.tenant_id)
-                    .where(ApiKey.key_prefix == prefix)
-                )
-                row = res.first()
-                if row and row[0] != TenantStatus.active:
-                    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Tenant suspended")
-        except HTTPException:
-            raise
-        except Exception:
-            pass
+        tenant_status = None
+        if prefix is not None:
+            try:
+                tenant_status = await tm.tenant_status_for_prefix(prefix)
+            except Exception:
+                tenant_status = None
+        if tenant_status is not None and tenant_status != TenantStatus.active:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Tenant suspended")
+        if guard is not None:
+            guard.record_failure(token, prefix, client_ip)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
     except ValueError:
+        if guard is not None:
+            guard.record_failure(token, None, client_ip)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+    except CryptoSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication temporarily overloaded",
+            headers={"Retry-After": "1"},
+        )
 
     # Success: bind to request context
-    request.state.tenant = tenant
-    request.state.api_key = key
-    return AuthContext(
-        tenant_id=tenant.id,
-        tenant_name=tenant.name,
-        key_prefix=key.key_prefix,
-        api_key_id=key.id,
-    )
+    return _bind(request, tenant, key, "api_key")
@@ -1,22 +1,145 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import hmac
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Literal, Optional
+
 import bcrypt
 
+from ..core.errors import CryptoSaturatedError
+from ..observability.metrics import CRYPTO_LATENCY, CRYPTO_QUEUE_DEPTH, CRYPTO_REJECTED
 
-async def hash_secret(secret: str) -> str:
+log = logging.getLogger(__name__)
+
+# Versioned key-hash format for high-entropy API secrets: "hmac-sha256$v1$<hex digest>".
+# Secrets are 192-bit random tokens, so a keyed fast hash is as strong as bcrypt here while
+# verifying in microseconds. Anything else is treated as a legacy bcrypt hash.
+HMAC_SCHEME = "hmac-sha256"
+_HMAC_PREFIX = f"{HMAC_SCHEME}$v1$"
+_pepper: Optional[bytes] = None
+
+# Dedicated executor for bcrypt so it never competes with the default thread pool.
+# Admission is bounded: at most max_workers running + max_queue waiting; beyond that
+# callers fail fast with CryptoSaturatedError (mapped to 503 by the auth dependency).
+_executor: Optional[Executor] = None
+_capacity: int = 0
+_pending: int = 0
+
+_DEFAULT_WORKERS = 4
+_DEFAULT_QUEUE = 64
+
+
+def configure_crypto_executor(
+    kind: Literal["thread", "process"] = "thread",
+    *,
+    max_workers: int = _DEFAULT_WORKERS,
+    max_queue: int = _DEFAULT_QUEUE,
+) -> None:
+    """
+    (Re)create the crypto executor.
+
+    kind="process" runs bcrypt on separate cores (spawned workers, higher memory);
+    kind="thread" stays in-process (bcrypt releases the GIL while hashing).
+    """
+    global _executor, _capacity
+    shutdown_crypto_executor()
+    if kind == "process":
+        _executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    else:
+        _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="noosphera-crypto")
+    _capacity = max_workers + max_queue
+
+
+def shutdown_crypto_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _ensure_executor() -> Executor:
+    if _executor is None:
+        configure_crypto_executor()
+    assert _executor is not None
+    return _executor
+
+
+async def _submit(op: str, fn: Callable[..., Any], *args: Any) -> Any:
+    global _pending
+    executor = _ensure_executor()
+    if _pending >= _capacity:
+        CRYPTO_REJECTED.labels(op=op).inc()
+        raise CryptoSaturatedError("Crypto executor saturated")
+
+    _pending += 1
+    CRYPTO_QUEUE_DEPTH.set(_pending)
+    start = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+    finally:
+        _pending -= 1
+        CRYPTO_QUEUE_DEPTH.set(_pending)
+        CRYPTO_LATENCY.labels(op=op).observe(time.perf_counter() - start)
+
+
+# Module-level so they pickle by reference into process-pool workers.
+def _bcrypt_hash(secret: bytes) -> bytes:
+    return bcrypt.hashpw(secret, bcrypt.gensalt())
+
+
+def _bcrypt_check(secret: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(secret, hashed)
+
+
+def configure_key_hashing(pepper: Optional[str]) -> None:
     """
-    Bcrypt-hash a secret string. CPU-bound, so offload to a thread.
+    Set the server-side pepper for HMAC key hashes. Without one, new keys keep using bcrypt.
+    The pepper must be identical on every worker and stable across restarts.
     """
-    def _do() -> bytes:
-        return bcrypt.hashpw(secret.encode("utf-8"), bcrypt.gensalt())
+    global _pepper
+    _pepper = pepper.encode("utf-8") if pepper else None
+
+
+def hash_scheme(hashed: str) -> str:
+    if hashed.startswith(_HMAC_PREFIX):
+        return HMAC_SCHEME
+    if hashed.startswith("$2"):
+        return "bcrypt"
+    return "unknown"
+
 
-    hashed = await asyncio.to_thread(_do)
+def needs_rehash(hashed: str) -> bool:
+    """True if `hashed` is a legacy format and a pepper is configured to upgrade it."""
+    return _pepper is not None and not hashed.startswith(_HMAC_PREFIX)
+
+
+def _hmac_hash(secret: str) -> str:
+    assert _pepper is not None
+    return _HMAC_PREFIX + hmac.new(_pepper, secret.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+async def hash_secret(secret: str) -> str:
+    """
+    Hash an API secret: HMAC-SHA256 with the configured pepper, or bcrypt
+    (on the dedicated crypto executor) when no pepper is set.
+    """
+    if _pepper is not None:
+        return _hmac_hash(secret)
+    hashed: bytes = await _submit("hash", _bcrypt_hash, secret.encode("utf-8"))
     return hashed.decode("utf-8")
 
 
 async def verify_secret(secret: str, hashed: str) -> bool:
-    def _do() -> bool:
-        return bcrypt.checkpw(secret.encode("utf-8"), hashed.encode("utf-8"))
-
-    return await asyncio.to_thread(_do)
+    if hashed.startswith(_HMAC_PREFIX):
+        if _pepper is None:
+            log.error("HMAC key hash found but security.key_pepper is not configured")
+            return False
+        return hmac.compare_digest(_hmac_hash(secret), hashed)
+    return await _submit("verify", _bcrypt_check, secret.encode("utf-8"), hashed.encode("utf-8"))
@@ -0,0 +1,204 @@
+# RATIONALE:
+# Steady-state auth should not need the control plane. Each worker keeps a replica of the
+# active key directory (prefix -> key + tenant state), loaded at startup and refreshed from
+# Postgres NOTIFY events emitted by triggers on core.api_keys / core.tenants (0002_auth_notify).
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+from uuid import UUID
+
+import psycopg
+from sqlalchemy import select
+from sqlalchemy.engine.url import make_url
+
+from ..db.models.core import ApiKey, KeyStatus, Tenant, TenantStatus
+from ..db.session import get_session
+
+log = logging.getLogger(__name__)
+
+AUTH_CHANNEL = "noosphera_auth"
+
+# (key_prefix, tenant_id) of the changed rows; either may be None.
+ChangeListener = Callable[[Optional[str], Optional[UUID]], None]
+
+
+@dataclass(slots=True)
+class DirectoryEntry:
+    key_id: UUID
+    key_prefix: str
+    key_hash: str
+    expires_at: Optional[datetime]
+    tenant_id: UUID
+    tenant_name: str
+    db_schema_name: str
+    tenant_status: TenantStatus
+
+    def to_models(self) -> tuple[Tenant, ApiKey]:
+        """Build detached (transient) ORM instances for request.state consumers."""
+        tenant = Tenant(
+            id=self.tenant_id,
+            name=self.tenant_name,
+            db_schema_name=self.db_schema_name,
+            status=self.tenant_status,
+        )
+        key = ApiKey(
+            id=self.key_id,
+            tenant_id=self.tenant_id,
+            key_prefix=self.key_prefix,
+            key_hash=self.key_hash,
+            status=KeyStatus.active,
+            expires_at=self.expires_at,
+        )
+        return tenant, key
+
+
+def _directory_query():
+    # Active keys only: revoked keys are simply absent (-> 401). Suspended tenants are
+    # kept so the 403 path can be answered from memory.
+    return (
+        select(
+            ApiKey.id,
+            ApiKey.key_prefix,
+            ApiKey.key_hash,
+            ApiKey.expires_at,
+            Tenant.id,
+            Tenant.name,
+            Tenant.db_schema_name,
+            Tenant.status,
+        )
+        .join(Tenant, Tenant.id == ApiKey.tenant_id)
+        .where(ApiKey.status == KeyStatus.active)
+    )
+
+
+def _entry(row) -> DirectoryEntry:
+    return DirectoryEntry(
+        key_id=row[0],
+        key_prefix=row[1],
+        key_hash=row[2],
+        expires_at=row[3],
+        tenant_id=row[4],
+        tenant_name=row[5],
+        db_schema_name=row[6],
+        tenant_status=row[7],
+    )
+
+
+def libpq_dsn(sqlalchemy_url: str) -> str:
+    """Turn a `postgresql+psycopg://` SQLAlchemy URL into a plain libpq URI."""
+    return make_url(sqlalchemy_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class KeyDirectory:
+    """
+    In-memory replica of key-prefix -> (tenant, key status, expiry, hash).
+
+    `ready` is True only while the LISTEN connection is up and the replica has been
+    (re)loaded after connecting; callers must fall back to the database otherwise.
+    """
+
+    def __init__(self, dsn: str, *, reconnect_delay_s: float = 1.0) -> None:
+        self._dsn = dsn
+        self._reconnect_delay = reconnect_delay_s
+        self._by_prefix: dict[str, DirectoryEntry] = {}
+        self._listeners: list[ChangeListener] = []
+        self._task: Optional[asyncio.Task[None]] = None
+        self._connected = asyncio.Event()
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._by_prefix)
+
+    def get(self, key_prefix: str) -> Optional[DirectoryEntry]:
+        return self._by_prefix.get(key_prefix)
+
+    def entries(self) -> list[DirectoryEntry]:
+        return list(self._by_prefix.values())
+
+    def add_listener(self, fn: ChangeListener) -> None:
+        """Register a callback invoked after each applied change notification."""
+        self._listeners.append(fn)
+
+    async def load(self) -> None:
+        async with get_session() as s:
+            res = await s.execute(_directory_query())
+            self._by_prefix = {e.key_prefix: e for e in map(_entry, res.all())}
+
+    async def _refresh(self, key_prefix: Optional[str], tenant_id: Optional[UUID]) -> None:
+        q = _directory_query()
+        if key_prefix is not None:
+            q = q.where(ApiKey.key_prefix == key_prefix)
+        else:
+            q = q.where(Tenant.id == tenant_id)
+        async with get_session() as s:
+            rows = (await s.execute(q)).all()
+
+        if key_prefix is not None:
+            self._by_prefix.pop(key_prefix, None)
+        else:
+            for p in [p for p, e in self._by_prefix.items() if e.tenant_id == tenant_id]:
+                del self._by_prefix[p]
+        for e in map(_entry, rows):
+            self._by_prefix[e.key_prefix] = e
+
+        for fn in self._listeners:
+            try:
+                fn(key_prefix, tenant_id)
+            except Exception:
+                log.exception("key directory listener failed")
+
+    async def _apply(self, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            log.warning("ignoring malformed auth notification")
+            return
+        tenant_id = UUID(data["tenant_id"]) if data.get("tenant_id") else None
+        if data.get("table") == "api_keys":
+            await self._refresh(data.get("key_prefix"), tenant_id)
+        elif tenant_id is not None:
+            await self._refresh(None, tenant_id)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self._dsn, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {AUTH_CHANNEL}")
+                    # Reload after LISTEN so nothing published while disconnected is missed.
+                    await self.load()
+                    self.ready = True
+                    self._connected.set()
+                    log.info("key directory live (%d keys)", len(self._by_prefix))
+                    async for notify in conn.notifies():
+                        await self._apply(notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                log.warning("key directory listener error, reconnecting: %s", exc)
+            finally:
+                self.ready = False
+                self._connected.clear()
+            await asyncio.sleep(self._reconnect_delay)
+
+    async def start(self, *, timeout_s: float = 5.0) -> None:
+        """Start the listener and wait (bounded) for the initial load."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="noosphera-key-directory")
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout=timeout_s)
+        except asyncio.TimeoutError:
+            log.warning("key directory not ready after %.1fs; auth falls back to the database", timeout_s)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
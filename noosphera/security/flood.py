@@ -0,0 +1,157 @@
+# RATIONALE:
+# Invalid tokens with a plausible shape would otherwise each cost a lookup and a bcrypt check.
+# The guard runs before verification and answers repeat offenders from memory.
+# Key prefixes are public (part of every token), so prefix buckets are per (prefix, client):
+# failures sent from elsewhere cannot lock a legitimate client out of its own key.
+from __future__ import annotations
+
+import hashlib
+import hmac
+import ipaddress
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from ..core.errors import AuthThrottledError
+from ..observability.metrics import AUTH_REJECTED
+
+
+@dataclass(slots=True)
+class _Bucket:
+    tokens: float
+    updated: float
+
+
+class _FailureBuckets:
+    """
+    Token buckets keyed by an identifier (key prefix, client IP). Each failed attempt takes
+    a token; an empty bucket refuses attempts until it refills. LRU-bounded.
+    """
+
+    def __init__(self, *, burst: int, refill_per_s: float, max_tracked: int) -> None:
+        self._burst = float(burst)
+        self._rate = float(refill_per_s)
+        self._max = int(max_tracked)
+        self._buckets: OrderedDict[str, _Bucket] = OrderedDict()
+
+    def _current(self, ident: str, now: float) -> Optional[_Bucket]:
+        b = self._buckets.get(ident)
+        if b is None:
+            return None
+        b.tokens = min(self._burst, b.tokens + (now - b.updated) * self._rate)
+        b.updated = now
+        if b.tokens >= self._burst:
+            del self._buckets[ident]  # fully refilled: stop tracking
+            return None
+        return b
+
+    def retry_after(self, ident: str) -> Optional[float]:
+        """Seconds until an attempt is allowed again, or None if allowed now."""
+        b = self._current(ident, time.monotonic())
+        if b is None or b.tokens >= 1.0:
+            return None
+        return (1.0 - b.tokens) / self._rate if self._rate > 0 else 60.0
+
+    def take(self, ident: str) -> None:
+        now = time.monotonic()
+        b = self._current(ident, now) or _Bucket(tokens=self._burst, updated=now)
+        b.tokens = max(0.0, b.tokens - 1.0)
+        self._buckets[ident] = b
+        self._buckets.move_to_end(ident)
+        while len(self._buckets) > self._max:
+            self._buckets.popitem(last=False)
+
+
+class AuthFloodGuard:
+    """
+    Pre-verification gate for API-key auth:
+      - negative cache of recently failed tokens (keyed digests, TTL + LRU) -> 401
+      - failure token buckets per (key prefix, client IP) and per client IP -> 429
+    Neither path touches the database or bcrypt.
+
+    The client IP is the peer address unless the peer is one of `trusted_proxies` (CIDRs) and
+    `client_ip_header` is set: then the rightmost untrusted address of that header
+    (X-Forwarded-For style) is used, so clients behind a load balancer get their own buckets.
+    """
+
+    def __init__(
+        self,
+        *,
+        negative_ttl_s: float = 300.0,
+        prefix_burst: int = 10,
+        prefix_refill_per_s: float = 0.2,
+        ip_burst: int = 30,
+        ip_refill_per_s: float = 0.5,
+        max_tracked: int = 100_000,
+        client_ip_header: Optional[str] = None,
+        trusted_proxies: Iterable[str] = (),
+    ) -> None:
+        self._neg_ttl = float(negative_ttl_s)
+        self.client_ip_header = client_ip_header or None
+        self._trusted = tuple(ipaddress.ip_network(n, strict=False) for n in trusted_proxies)
+        self._max = int(max_tracked)
+        self._hmac_key = secrets.token_bytes(32)
+        self._negative: OrderedDict[bytes, float] = OrderedDict()
+        self._by_prefix = _FailureBuckets(burst=prefix_burst, refill_per_s=prefix_refill_per_s, max_tracked=max_tracked)
+        self._by_ip = _FailureBuckets(burst=ip_burst, refill_per_s=ip_refill_per_s, max_tracked=max_tracked)
+
+    def _digest(self, token: str) -> bytes:
+        return hmac.new(self._hmac_key, token.encode("utf-8"), hashlib.sha256).digest()
+
+    def _is_trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address.strip())
+        except ValueError:
+            return False
+        return any(ip in net for net in self._trusted)
+
+    def client_ip(self, peer: Optional[str], forwarded: Optional[str]) -> Optional[str]:
+        """Address the buckets are keyed on, given the peer and the `client_ip_header` value."""
+        if not forwarded or peer is None or not self._is_trusted(peer):
+            return peer
+        hops = [h.strip() for h in forwarded.split(",") if h.strip()]
+        for hop in reversed(hops):
+            if not self._is_trusted(hop):
+                return hop
+        return hops[0] if hops else peer
+
+    @staticmethod
+    def _prefix_ident(prefix: str, client_ip: Optional[str]) -> str:
+        return f"{prefix}|{client_ip or ''}"
+
+    def precheck(self, token: str, prefix: Optional[str], client_ip: Optional[str]) -> None:
+        """
+        Raise before verification if the attempt should be refused:
+        PermissionError for a recently failed token, AuthThrottledError when a bucket is empty.
+        """
+        digest = self._digest(token)
+        deadline = self._negative.get(digest)
+        if deadline is not None:
+            if deadline > time.monotonic():
+                AUTH_REJECTED.labels(reason="negative_cache").inc()
+                raise PermissionError("Recently rejected API key")
+            del self._negative[digest]
+
+        if prefix:
+            wait = self._by_prefix.retry_after(self._prefix_ident(prefix, client_ip))
+            if wait is not None:
+                AUTH_REJECTED.labels(reason="prefix_throttle").inc()
+                raise AuthThrottledError("Too many failed attempts for this key", retry_after_s=wait)
+        if client_ip:
+            wait = self._by_ip.retry_after(client_ip)
+            if wait is not None:
+                AUTH_REJECTED.labels(reason="ip_throttle").inc()
+                raise AuthThrottledError("Too many failed attempts from this client", retry_after_s=wait)
+
+    def record_failure(self, token: str, prefix: Optional[str], client_ip: Optional[str]) -> None:
+        digest = self._digest(token)
+        self._negative[digest] = time.monotonic() + self._neg_ttl
+        self._negative.move_to_end(digest)
+        while len(self._negative) > self._max:
+            self._negative.popitem(last=False)
+        if prefix:
+            self._by_prefix.take(self._prefix_ident(prefix, client_ip))
+        if client_ip:
+            self._by_ip.take(client_ip)
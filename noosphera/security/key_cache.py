@@ -0,0 +1,123 @@
+# RATIONALE:
+# Successful API-key verifications are cached in-process so steady-state auth skips the
+# control-plane query and bcrypt. Tokens are only ever held as keyed digests.
+from __future__ import annotations
+
+import hashlib
+import hmac
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+
+from ..core.singleflight import SingleFlight
+from ..db.models.core import ApiKey, Tenant
+from ..observability.metrics import AUTH_CACHE_EVENTS
+
+Verified = tuple[Tenant, ApiKey]
+
+
+@dataclass(slots=True)
+class _Entry:
+    tenant: Tenant
+    key: ApiKey
+    deadline: float  # time.monotonic() after which the entry is stale
+
+
+class VerifiedKeyCache:
+    """
+    TTL + LRU cache of verified API tokens, keyed by HMAC-SHA256(token) under a
+    per-process random key (plaintext tokens are never retained).
+
+    Concurrent misses for the same token are coalesced into one verification.
+    Only successes are cached; failures always fall through to the verifier.
+    """
+
+    def __init__(self, *, ttl_s: float = 60.0, max_entries: int = 10_000) -> None:
+        self._ttl = float(ttl_s)
+        self._max = int(max_entries)
+        self._hmac_key = secrets.token_bytes(32)
+        self._entries: OrderedDict[bytes, _Entry] = OrderedDict()
+        self._flight: SingleFlight[Verified] = SingleFlight()
+        # Bumped on every invalidation so verifications racing with it are not cached.
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _digest(self, token: str) -> bytes:
+        return hmac.new(self._hmac_key, token.encode("utf-8"), hashlib.sha256).digest()
+
+    @staticmethod
+    def _live(entry: _Entry) -> bool:
+        """Within the cache TTL and the key's own expiry."""
+        expires_at = entry.key.expires_at
+        return entry.deadline >= time.monotonic() and (
+            expires_at is None or expires_at >= datetime.now(timezone.utc)
+        )
+
+    def _lookup(self, digest: bytes) -> Optional[Verified]:
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        if not self._live(entry):
+            del self._entries[digest]
+            AUTH_CACHE_EVENTS.labels(event="expired").inc()
+            return None
+        self._entries.move_to_end(digest)
+        return entry.tenant, entry.key
+
+    def _store(self, digest: bytes, tenant: Tenant, key: ApiKey) -> None:
+        self._entries[digest] = _Entry(tenant=tenant, key=key, deadline=time.monotonic() + self._ttl)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self._max:
+            self._entries.popitem(last=False)
+            AUTH_CACHE_EVENTS.labels(event="eviction").inc()
+
+    def contains(self, token: str) -> bool:
+        """True if `token` has a live verified entry (no metrics, no LRU bump)."""
+        entry = self._entries.get(self._digest(token))
+        return entry is not None and self._live(entry)
+
+    async def get_or_verify(self, token: str, verify: Callable[[], Awaitable[Verified]]) -> Verified:
+        """
+        Return the cached (Tenant, ApiKey) for `token`, or run `verify()` (single-flight)
+        and cache its result. Exceptions from `verify` propagate unchanged.
+        """
+        digest = self._digest(token)
+        hit = self._lookup(digest)
+        if hit is not None:
+            AUTH_CACHE_EVENTS.labels(event="hit").inc()
+            return hit
+
+        AUTH_CACHE_EVENTS.labels(event="miss").inc()
+        generation = self._generation
+        (tenant, key), shared = await self._flight.do(digest, verify)
+        if shared:
+            AUTH_CACHE_EVENTS.labels(event="coalesced").inc()
+        elif generation == self._generation:
+            self._store(digest, tenant, key)
+        return tenant, key
+
+    def _invalidate(self, predicate: Callable[[_Entry], bool]) -> int:
+        self._generation += 1
+        stale = [d for d, e in self._entries.items() if predicate(e)]
+        for d in stale:
+            del self._entries[d]
+        if stale:
+            AUTH_CACHE_EVENTS.labels(event="invalidation").inc(len(stale))
+        return len(stale)
+
+    def invalidate_prefix(self, key_prefix: str) -> int:
+        """Drop cached entries for an API key prefix (e.g. after revocation)."""
+        return self._invalidate(lambda e: e.key.key_prefix == key_prefix)
+
+    def invalidate_tenant(self, tenant_id: UUID) -> int:
+        """Drop cached entries for every key of a tenant (e.g. after suspension)."""
+        return self._invalidate(lambda e: e.tenant.id == tenant_id)
+
+    def clear(self) -> None:
+        self._invalidate(lambda e: True)
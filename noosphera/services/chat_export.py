@@ -0,0 +1,152 @@
+# RATIONALE:
+# Full-history exports (audits, analytics, moving a tenant) walk the tenant schema once through
+# a server-side cursor (ChatRepository.iter_transcript) and stream NDJSON, compressed on the fly,
+# in bounded chunks: memory stays flat whether a tenant has a thousand messages or a billion,
+# and no rows are materialized as ORM objects. The same format is read back by chat import.
+#
+# Format: one JSON object per line; a session line precedes that session's messages.
+#   {"type":"session","id":...,"created_at":...,"name":...}
+#   {"type":"message","id":...,"session_id":...,"role":...,"content":...,"meta":...,
+#    "created_at":...,"token_count":...}
+from __future__ import annotations
+
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import AsyncIterable, AsyncIterator, Literal, Optional
+
+from pydantic_core import to_json
+
+from ..observability.metrics import CHAT_EXPORT_BYTES, CHAT_EXPORT_ROWS
+from ..repositories.chat_repository import TranscriptRow
+
+Compression = Literal["none", "gzip", "zstd"]
+
+# Content-Encoding per compression (HTTP); the body itself is always NDJSON
+CONTENT_ENCODINGS: dict[str, Optional[str]] = {"none": None, "gzip": "gzip", "zstd": "zstd"}
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+_CHUNK_BYTES = 256 * 1024
+
+
+@dataclass(slots=True)
+class ExportStats:
+    sessions: int = 0
+    messages: int = 0
+    raw_bytes: int = 0  # NDJSON before compression
+    out_bytes: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+
+    @property
+    def elapsed_s(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_s(self) -> float:
+        return (self.sessions + self.messages) / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.raw_bytes / 1_000_000 / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def describe(self) -> str:
+        return (
+            f"{self.sessions} sessions, {self.messages} messages in {self.elapsed_s:.1f}s "
+            f"({self.rows_per_s:,.0f} rows/s, {self.mb_per_s:.1f} MB/s NDJSON, "
+            f"{self.raw_bytes / 1_000_000:.1f} MB -> {self.out_bytes / 1_000_000:.1f} MB)"
+        )
+
+
+class _Compressor:
+    def __init__(self, compression: Compression, level: Optional[int]) -> None:
+        if compression == "gzip":
+            self._c = zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 31)
+        elif compression == "zstd":
+            try:
+                import zstandard  # type: ignore
+            except ModuleNotFoundError as exc:
+                raise RuntimeError('zstd export needs the zstandard package (pip install "noosphera[export]")') from exc
+            self._c = zstandard.ZstdCompressor(level=3 if level is None else level).compressobj()
+        else:
+            self._c = None
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data) if self._c is not None else data
+
+    def flush(self) -> bytes:
+        return self._c.flush() if self._c is not None else b""
+
+
+def check_compression(compression: str) -> Compression:
+    """Validate `compression` (raises ValueError), including that zstd is installed."""
+    if compression not in CONTENT_ENCODINGS:
+        raise ValueError(f"Unknown compression: {compression}")
+    _Compressor(compression, None)  # type: ignore[arg-type]
+    return compression  # type: ignore[return-value]
+
+
+async def ndjson_export(
+    rows: AsyncIterable[TranscriptRow],
+    *,
+    compression: Compression = "none",
+    level: Optional[int] = None,
+    stats: Optional[ExportStats] = None,
+) -> AsyncIterator[bytes]:
+    """Encode transcript rows as (compressed) NDJSON chunks of roughly 256 KiB."""
+    stats = stats if stats is not None else ExportStats()
+    comp = _Compressor(compression, level)
+    buf: list[bytes] = []
+    size = 0
+    current: Optional[object] = None
+
+    def _emit(record: dict) -> None:
+        nonlocal size
+        line = to_json(record) + b"\n"
+        buf.append(line)
+        size += len(line)
+
+    def _drain() -> bytes:
+        nonlocal size
+        data = b"".join(buf)
+        buf.clear()
+        stats.raw_bytes += size
+        CHAT_EXPORT_BYTES.inc(size)
+        size = 0
+        out = comp.compress(data)
+        stats.out_bytes += len(out)
+        return out
+
+    try:
+        async for sid, s_created, s_name, mid, role, content, meta, m_created, tokens in rows:
+            if sid != current:
+                current = sid
+                stats.sessions += 1
+                _emit({"type": "session", "id": sid, "created_at": s_created, "name": s_name})
+            if mid is not None:
+                stats.messages += 1
+                _emit(
+                    {
+                        "type": "message",
+                        "id": mid,
+                        "session_id": sid,
+                        "role": role,
+                        "content": content,
+                        "meta": meta,
+                        "created_at": m_created,
+                        "token_count": tokens,
+                    }
+                )
+            if size >= _CHUNK_BYTES:
+                out = _drain()
+                if out:
+                    yield out
+        tail = comp.flush()
+        stats.out_bytes += len(tail)
+        out = _drain() + tail
+        if out:
+            yield out
+    finally:
+        stats.finished = time.perf_counter()
+        CHAT_EXPORT_ROWS.labels(kind="session").inc(stats.sessions)
+        CHAT_EXPORT_ROWS.labels(kind="message").inc(stats.messages)
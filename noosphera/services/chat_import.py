@@ -0,0 +1,194 @@
+# RATIONALE:
+# Onboarding a tenant with existing history means millions of messages; per-row INSERT +
+# commit spends nearly all its time on round trips and WAL flushes. Import
+# parses NDJSON transcripts (the chat export format) into batches and loads each batch with
+# binary COPY in one transaction (ChatRepository.copy_transcript). For large loads into a
+# fresh tenant the secondary indexes can be dropped first and rebuilt once at the end, which
+# is far cheaper than maintaining them row by row.
+from __future__ import annotations
+
+import gzip
+import io
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import IO, Iterable, Optional, Union
+from uuid import UUID, uuid4
+
+from pydantic_core import from_json
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..db.chat_partitions import create_partitions_for, month_start
+from ..db.tenancy import _validate_schema_name
+from ..observability.metrics import CHAT_IMPORT_ROWS
+from ..repositories.chat_repository import MessageCopyRow, SessionCopyRow, open_chat_repository
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ImportStats:
+    sessions: int = 0
+    messages: int = 0
+    batches: int = 0
+    index_rebuild_s: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+
+    @property
+    def elapsed_s(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_s(self) -> float:
+        return (self.sessions + self.messages) / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def describe(self) -> str:
+        return (
+            f"{self.sessions} sessions, {self.messages} messages in {self.batches} batches, "
+            f"{self.elapsed_s:.1f}s ({self.rows_per_s:,.0f} rows/s; index rebuild {self.index_rebuild_s:.1f}s)"
+        )
+
+
+def open_ndjson(path: str) -> IO[bytes]:
+    """Binary line reader for `path` ("-" = stdin); .gz and .zst files are decompressed."""
+    if path == "-":
+        return sys.stdin.buffer
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        try:
+            import zstandard  # type: ignore
+        except ModuleNotFoundError as exc:
+            raise RuntimeError('reading .zst needs the zstandard package (pip install "noosphera[export]")') from exc
+        raw = open(path, "rb")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True))
+    return open(path, "rb")
+
+
+def _ts(value: Optional[str], default: datetime) -> datetime:
+    if value is None:
+        return default
+    ts = datetime.fromisoformat(value)
+    return ts if ts.tzinfo is not None else ts.replace(tzinfo=timezone.utc)
+
+
+async def _defer_indexes(admin_engine: AsyncEngine, schema: str) -> list[str]:
+    """Drop the secondary (non-unique) indexes of the chat tables; returns their definitions."""
+    async with admin_engine.begin() as conn:
+        res = await conn.execute(
+            text(
+                "SELECT c.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+                "JOIN pg_class c ON c.oid = i.indexrelid "
+                "JOIN pg_class t ON t.oid = i.indrelid "
+                "JOIN pg_namespace n ON n.oid = t.relnamespace "
+                "WHERE n.nspname = :s AND t.relname IN ('chat_sessions', 'chat_messages') "
+                "AND NOT i.indisprimary AND NOT i.indisunique"
+            ),
+            {"s": schema},
+        )
+        indexes = list(res.tuples())
+        for name, definition in indexes:
+            # Logged so an interrupted import can be repaired by hand.
+            log.warning("chat import dropping index %s.%s: %s", schema, name, definition)
+            await conn.execute(text(f'DROP INDEX "{schema}"."{name}"'))
+    # A partitioned parent's definition reads "ON ONLY"; rebuild it on every partition.
+    return [definition.replace(" ON ONLY ", " ON ", 1) for _, definition in indexes]
+
+
+async def _rebuild_indexes(admin_engine: AsyncEngine, schema: str, definitions: list[str]) -> None:
+    async with admin_engine.begin() as conn:
+        for definition in definitions:
+            await conn.execute(text(definition))
+        await conn.execute(text(f'ANALYZE "{schema}".chat_sessions'))
+        await conn.execute(text(f'ANALYZE "{schema}".chat_messages'))
+
+
+async def import_transcript(
+    admin_engine: AsyncEngine,
+    schema: str,
+    lines: Iterable[Union[bytes, str]],
+    *,
+    batch_rows: int = 50_000,
+    defer_indexes: bool = False,
+    skip_existing: bool = False,
+    stats: Optional[ImportStats] = None,
+) -> ImportStats:
+    """
+    Load NDJSON transcript lines into `schema` (whose chat tables must exist).
+
+    Lines are "session" and "message" records as written by chat export; ids and created_at
+    default to new values, and a message without session_id belongs to the session line
+    before it. Every `batch_rows` rows are committed as one COPY batch, so a failure loses at
+    most the current batch (re-run with `skip_existing`). Months of a partitioned
+    chat_messages are created as the batches need them. With `defer_indexes` the secondary
+    indexes are dropped for the load and rebuilt at the end; meant for tenants not yet
+    serving traffic.
+    """
+    _validate_schema_name(schema)
+    stats = stats if stats is not None else ImportStats()
+    sessions: list[SessionCopyRow] = []
+    messages: list[MessageCopyRow] = []
+    current: Optional[UUID] = None
+    deferred = await _defer_indexes(admin_engine, schema) if defer_indexes else []
+
+    async def _flush() -> None:
+        if not sessions and not messages:
+            return
+        months = {month_start(m[5]) for m in messages}
+        if months:
+            async with admin_engine.begin() as conn:
+                await create_partitions_for(conn, schema, months)
+        async with open_chat_repository(schema) as repo:
+            await repo.copy_transcript(sessions, messages, skip_existing=skip_existing)
+        stats.batches += 1
+        stats.sessions += len(sessions)
+        stats.messages += len(messages)
+        CHAT_IMPORT_ROWS.labels(kind="session").inc(len(sessions))
+        CHAT_IMPORT_ROWS.labels(kind="message").inc(len(messages))
+        sessions.clear()
+        messages.clear()
+
+    try:
+        for lineno, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                rec = from_json(line)
+                now = datetime.now(timezone.utc)
+                kind = rec.get("type")
+                if kind == "session":
+                    current = UUID(rec["id"]) if rec.get("id") else uuid4()
+                    sessions.append((current, _ts(rec.get("created_at"), now), rec.get("name")))
+                elif kind == "message":
+                    sid = UUID(rec["session_id"]) if rec.get("session_id") else current
+                    if sid is None:
+                        raise ValueError("message before any session")
+                    messages.append(
+                        (
+                            UUID(rec["id"]) if rec.get("id") else uuid4(),
+                            sid,
+                            rec["role"],
+                            rec["content"],
+                            rec.get("meta"),
+                            _ts(rec.get("created_at"), now),
+                            rec.get("token_count"),
+                        )
+                    )
+                else:
+                    raise ValueError(f"unknown record type: {kind!r}")
+            except (ValueError, KeyError, TypeError, AttributeError) as exc:
+                raise ValueError(f"line {lineno}: {exc}") from exc
+            if len(sessions) + len(messages) >= batch_rows:
+                await _flush()
+        await _flush()
+    finally:
+        if deferred:
+            t0 = time.perf_counter()
+            await _rebuild_indexes(admin_engine, schema, deferred)
+            stats.index_rebuild_s = time.perf_counter() - t0
+        stats.finished = time.perf_counter()
+    return stats
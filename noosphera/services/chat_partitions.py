@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..db.chat_partitions import create_month_partitions, drop_expired_partitions
+from ..db.models.core import Tenant
+from ..db.session import get_session
+from ..observability.metrics import CHAT_PARTITION_EVENTS
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class PartitionReport:
+    created: list[str] = field(default_factory=list)
+    dropped: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)  # tenant schemas
+
+
+class ChatPartitionMaintainer:
+    """
+    Keeps every tenant's partitioned chat_messages ready for the coming months and drops
+    the months past the tenant's retention (core.tenants.chat_retention_months, else the
+    default). Runs every `interval_s`; every worker may run it, the per-schema advisory
+    lock makes concurrent runs wait and then find nothing left to do.
+    """
+
+    def __init__(
+        self,
+        admin_engine: AsyncEngine,
+        *,
+        months_ahead: int = 3,
+        retention_months: int = 0,
+        interval_s: float = 3600.0,
+        lock_timeout_s: float = 5.0,
+    ) -> None:
+        self._engine = admin_engine
+        self._months_ahead = int(months_ahead)
+        self._retention = int(retention_months)
+        self._interval = float(interval_s)
+        self._lock_timeout = float(lock_timeout_s)
+        self._task: Optional[asyncio.Task[None]] = None
+
+    async def run_once(self) -> PartitionReport:
+        async with get_session() as s:
+            res = await s.execute(select(Tenant.db_schema_name, Tenant.chat_retention_months))
+            tenants = list(res.tuples())
+        report = PartitionReport()
+        for schema, retention in tenants:
+            keep = self._retention if retention is None else retention
+            try:
+                async with self._engine.begin() as conn:
+                    created = await create_month_partitions(conn, schema, months_ahead=self._months_ahead)
+                async with self._engine.begin() as conn:
+                    dropped = await drop_expired_partitions(
+                        conn, schema, retention_months=keep, lock_timeout_s=self._lock_timeout
+                    )
+            except Exception as exc:
+                CHAT_PARTITION_EVENTS.labels(event="error").inc()
+                log.warning("chat partition maintenance failed for %s: %s", schema, exc)
+                report.failed.append(schema)
+                continue
+            CHAT_PARTITION_EVENTS.labels(event="created").inc(len(created))
+            CHAT_PARTITION_EVENTS.labels(event="dropped").inc(len(dropped))
+            report.created += [f"{schema}.{n}" for n in created]
+            report.dropped += [f"{schema}.{n}" for n in dropped]
+            if created or dropped:
+                log.info(
+                    "chat_partitions_maintained",
+                    extra={"tenant_schema": schema, "created": created, "dropped": dropped},
+                )
+        return report
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as exc:
+                CHAT_PARTITION_EVENTS.labels(event="error").inc()
+                log.warning("chat partition maintenance failed: %s", exc)
+            await asyncio.sleep(self._interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="noosphera-chat-partitions")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
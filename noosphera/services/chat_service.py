@@ -1,18 +1,67 @@
 # FILE: noosphera/services/chat_service.py
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from datetime import datetime
+from typing import AsyncContextManager, AsyncIterator, Awaitable, Callable, Optional
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncEngine
 
 from ..config.schema import Settings
-from ..repositories.chat_repository import ChatRepository
-from ..db.tenant_chat_bootstrap import ensure_tenant_chat_tables
+from ..core.cursor import Position, SearchPosition
+from ..core.errors import IdempotencyInProgressError, IdempotencyKeyReusedError
+from ..core.singleflight import SingleFlight
+from ..repositories.chat_repository import (
+    ChatRepository,
+    MessageOutRow,
+    MessageRow,
+    Recollection,
+    SearchHitRow,
+    SemanticHit,
+    SessionOutRow,
+    TranscriptRow,
+    TurnStart,
+)
+from ..repositories.document_repository import ChunkHit
+from .conversation_memory import MEMORY_PREFIX, ConversationMemory
+from .documents import DOCUMENTS_PREFIX, DocumentStore
+from .history_cache import SessionHistoryCache
+from .semantic_cache import SemanticCache
+from .session_summary import SUMMARY_PREFIX, SessionSummarizer
+from ..db.tenant_chat_bootstrap import (
+    ensure_tenant_chat_tables,
+    ensure_tenant_memory,
+    ensure_tenant_semantic_cache,
+)
+from ..observability.metrics import MEMORY_EVENTS
 from ..ports.llm import ChatLLMPort
+from ..providers.tokenizer import (
+    MESSAGE_OVERHEAD_TOKENS,
+    REPLY_PRIMING_TOKENS,
+    Tokenizer,
+    context_window_for,
+    get_tokenizer,
+)
 
 log = logging.getLogger(__name__)
 
+# Opens a short-lived ChatRepository (own session/connection) for one DB phase.
+RepoFactory = Callable[[], AsyncContextManager[ChatRepository]]
+
+# Idempotent requests in flight in this process, keyed by (schema, key, request hash).
+_idempotent_flight: SingleFlight[tuple[dict, bool]] = SingleFlight()
+
+
+async def _skip() -> tuple[None, None]:
+    return None, None
+
+
+async def _no_documents() -> list[ChunkHit]:
+    return []
+
 
 class ChatService:
     """
@@ -20,64 +69,389 @@ class ChatService:
       - bootstrap per-tenant tables
       - ensure/resolve session
       - handle turn: save user -> call LLM -> save assistant -> return
+
+    DB work happens in short phases, each on its own pooled connection; no connection
+    is held while the LLM call is in flight.
     """
 
-    def __init__(self, repo: ChatRepository, llm: ChatLLMPort, settings: Settings, *, schema: str) -> None:
-        self._repo = repo
+    def __init__(
+        self,
+        repo_factory: RepoFactory,
+        llm: ChatLLMPort,
+        settings: Settings,
+        *,
+        schema: str,
+        history_cache: Optional[SessionHistoryCache] = None,
+        summarizer: Optional[SessionSummarizer] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        memory: Optional[ConversationMemory] = None,
+        documents: Optional[DocumentStore] = None,
+    ) -> None:
+        self._repo = repo_factory
         self._llm = llm
         self._settings = settings
         self._schema = schema
+        self._history = history_cache
+        self._summarizer = summarizer
+        self._semantic = semantic_cache
+        self._memory = memory
+        self._documents = documents
 
     async def ensure_bootstrap(self, admin_engine: AsyncEngine) -> None:
-        await ensure_tenant_chat_tables(admin_engine, self._schema)
+        partitioning = self._settings.chat.partitioning
+        await ensure_tenant_chat_tables(
+            admin_engine,
+            self._schema,
+            partition_months_ahead=partitioning.months_ahead if partitioning.enabled else None,
+        )
+        if self._semantic is not None:
+            await ensure_tenant_semantic_cache(admin_engine, self._schema, self._semantic.dimensions)
+        if self._memory is not None:
+            await ensure_tenant_memory(admin_engine, self._schema, self._memory.dimensions)
+        if self._documents is not None:
+            await self._documents.ensure_bootstrap(admin_engine)
 
-    async def ensure_session(self, session_id: UUID | None, *, name: str | None = None) -> UUID:
-        if session_id is None:
-            return await self._repo.create_session(name=name)
-        exists = await self._repo.get_session_exists(session_id)
-        if not exists:
-            raise LookupError(f"Session not found: {session_id}")
-        return session_id
+    async def list_sessions(
+        self, *, limit: int = 50, after: Optional[Position] = None
+    ) -> tuple[list[SessionOutRow], Optional[Position]]:
+        """A page of sessions (newest first) and the keyset position of the next page."""
+        async with self._repo() as repo:
+            return await repo.list_sessions(limit=limit, after=after)
 
-    async def run_turn(
+    async def list_messages(
         self,
         session_id: UUID,
         *,
+        limit: int = 100,
+        before: Optional[UUID] = None,
+        after: Optional[Position] = None,
+    ) -> tuple[list[MessageOutRow], Optional[Position]]:
+        """
+        A page of a session's messages (ascending) walking back from the newest, and the
+        keyset position of the next (older) page; empty if the session does not exist.
+        """
+        async with self._repo() as repo:
+            return await repo.fetch_session_messages(session_id, limit=limit, before=before, after=after)
+
+    async def search_messages(
+        self,
+        query: str,
+        *,
+        session_id: Optional[UUID] = None,
+        limit: int = 20,
+        after: Optional[SearchPosition] = None,
+    ) -> tuple[list[SearchHitRow], Optional[SearchPosition]]:
+        """Ranked full-text matches across the tenant's messages, and the next page's position."""
+        async with self._repo() as repo:
+            return await repo.search_messages(query, session_id=session_id, limit=limit, after=after)
+
+    async def iter_transcript(
+        self, *, session_id: Optional[UUID] = None, since: Optional[datetime] = None
+    ) -> AsyncIterator[TranscriptRow]:
+        """The tenant's sessions and messages for export, streamed from a server-side cursor."""
+        async with self._repo() as repo:
+            async for row in repo.iter_transcript(
+                session_id=session_id, since=since, batch_size=self._settings.chat.export_batch_size
+            ):
+                yield row
+
+    def _prompt_budget(self, model_name: str | None, max_tokens: int | None) -> int:
+        """Tokens available to the prompt: the model's context window minus the reply reserve."""
+        chat = self._settings.chat
+        window = context_window_for(model_name, chat.context_windows, chat.context_window_default)
+        return window - int(max_tokens or chat.reply_reserve_tokens) - REPLY_PRIMING_TOKENS
+
+    @staticmethod
+    def _fit_history(history: list[MessageRow], tok: Tokenizer, budget: int) -> list[MessageRow]:
+        """Newest-first, keep messages while they fit `budget`; returns them oldest first."""
+        kept: list[MessageRow] = []
+        for row in reversed(history):
+            cost = MESSAGE_OVERHEAD_TOKENS + (row[4] if row[4] is not None else tok.count(row[2]))
+            if cost > budget:
+                break
+            budget -= cost
+            kept.append(row)
+        kept.reverse()
+        return kept
+
+    async def run_idempotent(
+        self, key: str, request_hash: str, fn: Callable[[], Awaitable[dict]]
+    ) -> tuple[dict, bool]:
+        """
+        Run `fn` (producing a JSON-able response) at most once per Idempotency-Key.
+        Returns (response, replayed). Duplicates in this process share the in-flight call;
+        duplicates elsewhere poll the tenant's record until the original finishes, for at
+        most `chat.idempotency_wait_s`. Failed runs are forgotten so a retry runs again.
+
+        Raises IdempotencyKeyReusedError if the key was used for a different request, and
+        IdempotencyInProgressError if the original is still running after the wait.
+        """
+
+        async def _run() -> tuple[dict, bool]:
+            return await self._run_idempotent(key, request_hash, fn)
+
+        (response, replayed), shared = await _idempotent_flight.do((self._schema, key, request_hash), _run)
+        return response, replayed or shared
+
+    async def _run_idempotent(
+        self, key: str, request_hash: str, fn: Callable[[], Awaitable[dict]]
+    ) -> tuple[dict, bool]:
+        chat = self._settings.chat
+        deadline = time.monotonic() + chat.idempotency_wait_s
+        delay = 0.05
+        while True:
+            async with self._repo() as repo:
+                record = await repo.claim_idempotency_key(
+                    key, request_hash, ttl_s=chat.idempotency_ttl_s, lease_s=chat.idempotency_lease_s
+                )
+            if record is None:
+                break
+            if record.request_hash != request_hash:
+                raise IdempotencyKeyReusedError(f"Idempotency-Key {key!r} was used for a different request")
+            if record.status == "done" and record.response is not None:
+                return record.response, True
+            if time.monotonic() >= deadline:
+                raise IdempotencyInProgressError(
+                    f"Request with Idempotency-Key {key!r} is still in progress", retry_after_s=1.0
+                )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+        try:
+            response = await fn()
+        except BaseException:
+            try:
+                async with self._repo() as repo:
+                    await repo.release_idempotency_key(key)
+            except Exception as exc:  # the lease expires it anyway
+                log.warning("idempotency key release failed: %s", exc)
+            raise
+        async with self._repo() as repo:
+            await repo.complete_idempotency_key(key, response)
+        return response, False
+
+    async def _semantic_probe(
+        self, semantic: SemanticCache, text: str, model_name: str
+    ) -> tuple[Optional[list[float]], Optional[SemanticHit]]:
+        """Embed `text` and look up a stored answer; (None, None) if it cannot be embedded."""
+        embedding = await semantic.embed(text)
+        if embedding is None:
+            return None, None
+        async with self._repo() as repo:
+            return embedding, await semantic.lookup(repo, embedding, model=model_name)
+
+    async def _recall(
+        self, memory: ConversationMemory, text: str, session_id: Optional[UUID], overfetch: int, counter: str
+    ) -> tuple[Optional[list[float]], Optional[list[Recollection]]]:
+        """Embed `text` and find similar older messages; (None, None) if it cannot be embedded."""
+        embedding = await memory.embed(text)
+        if embedding is None:
+            return None, None
+        async with self._repo() as repo:
+            return embedding, await memory.recall(
+                repo, embedding, session_id=session_id, overfetch=overfetch, token_counter=counter
+            )
+
+    @staticmethod
+    def _fit_recalled(
+        found: list[Recollection], exclude: set[UUID], tok: Tokenizer, budget: int, top_k: int
+    ) -> str:
+        """Most similar first, up to `top_k` messages outside `exclude` that fit `budget`, as text."""
+        kept: list[MessageRow] = []
+        used = MESSAGE_OVERHEAD_TOKENS + tok.count(MEMORY_PREFIX)
+        for rec in found:
+            row = rec.message
+            if row[0] in exclude:
+                continue
+            cost = (row[4] if row[4] is not None else tok.count(row[2])) + 8  # role/date framing
+            if used + cost > budget:
+                continue
+            used += cost
+            kept.append(row)
+            if len(kept) >= top_k:
+                break
+        if not kept:
+            return ""
+        kept.sort(key=lambda r: r[3])  # chronological reads better than by similarity
+        return MEMORY_PREFIX + "\n".join(f"[{r[3]:%Y-%m-%d}] {r[1]}: {r[2]}" for r in kept)
+
+    @staticmethod
+    def _fit_documents(hits: list[ChunkHit], tok: Tokenizer, budget: int) -> tuple[str, int]:
+        """Most similar first, the retrieved chunks that fit `budget`, as numbered text (and how many)."""
+        parts: list[str] = []
+        used = MESSAGE_OVERHEAD_TOKENS + tok.count(DOCUMENTS_PREFIX)
+        for hit in hits:
+            part = f"[{len(parts) + 1}] {hit.document_name or 'untitled'}:\n{hit.content}"
+            # Stored chunk counts come from the embedding model's tokenizer: recount for this model.
+            cost = tok.count(part) + 8
+            if used + cost > budget:
+                continue
+            used += cost
+            parts.append(part)
+        return (DOCUMENTS_PREFIX + "\n\n".join(parts) if parts else ""), len(parts)
+
+    async def run_turn(
+        self,
+        session_id: UUID | None,
+        *,
         incoming_role: str,
         incoming_text: str,
         model: str | None,
         provider: str | None,
         temperature: float | None = None,
         max_tokens: int | None = None,
+        cache_enabled: bool = True,
+        collection: str | None = None,
     ) -> dict:
-        # 1) Load history
+        """
+        Run one turn. `session_id=None` starts a new session; an unknown id raises
+        LookupError before anything is written. The result carries the `session_id`.
+
+        History is the last `history_max_messages` messages, trimmed (oldest first) to fit
+        the model's context window minus `max_tokens` (or `chat.reply_reserve_tokens`).
+        With a summarizer, messages already folded into the session summary are replaced by
+        the summary, and a background fold is scheduled every `summary_every_turns` turns.
+        `cache_enabled=False` bypasses the response caches for this turn. With a semantic
+        cache, the opening message of a new session close enough to an earlier one for the same
+        model is answered from it without calling the LLM. With long-term memory, older messages similar to a
+        user message are added after the summary (within `memory.max_tokens`, and at most half
+        the prompt budget), and the turn's messages are queued for indexing. With a document
+        store, `collection` retrieves the chunks closest to the incoming message and adds them
+        before the history (within `documents.max_tokens`, at most half the remaining budget).
+        """
+        model_name = self._llm.resolve_model(model, provider)
+        tok = get_tokenizer(model_name)
+        incoming_tokens = tok.count(incoming_text)
+
+        # 1+2) Resolve session, load history, append incoming: one pipelined exchange.
+        # With a cached tail only rows newer than it (minus overlap) are read.
         n = int(self._settings.chat.history_max_messages)
-        history = await self._repo.fetch_recent_messages(session_id, limit=n)
+        cache = self._history
+        cached = cache.get(self._schema, session_id, tok.name) if cache is not None and session_id is not None else None
 
-        # 2) Append incoming
-        await self._repo.append_message(session_id, incoming_role, incoming_text)
+        async def _begin() -> TurnStart:
+            async with self._repo() as repo:
+                return await repo.begin_turn(
+                    session_id,
+                    role=incoming_role,
+                    content=incoming_text,
+                    history_limit=n,
+                    since=cache.since(cached) if cached else None,
+                    token_count=incoming_tokens,
+                    token_counter=tok.name,
+                )
 
-        # 3) Build context
-        msgs = [{"role": m["role"], "content": m["content"]} for m in history]
+        # A semantic match ignores the context: only opening turns (a new session, so no history
+        # the answer could depend on) use it, and never document-grounded ones.
+        semantic = (
+            self._semantic
+            if cache_enabled and incoming_role == "user" and session_id is None and not collection
+            else None
+        )
+        memory = self._memory if incoming_role == "user" else None
+        probe: Optional[list[float]]
+        hit: Optional[SemanticHit]
+        memory_vec: Optional[list[float]]
+        recalled: Optional[list[Recollection]]
+        documents = self._documents if collection else None
+        # Embedding + similarity lookups run alongside the first exchange (own connections).
+        # Recall over-fetches by the window size: messages already in the window are dropped.
+        turn, (probe, hit), (memory_vec, recalled), chunks = await asyncio.gather(
+            _begin(),
+            self._semantic_probe(semantic, incoming_text, model_name or "") if semantic is not None else _skip(),
+            self._recall(memory, incoming_text, session_id, n + 1, tok.name) if memory is not None else _skip(),
+            documents.retrieve(incoming_text, collection=collection) if documents is not None else _no_documents(),
+        )
+        session_id = turn.session_id
+        if cache is None:
+            history = turn.history
+        elif cached and len(turn.history) < n:
+            history = cache.merge(self._schema, session_id, cached, turn.history, tok.name)
+        else:
+            history = cache.replace(self._schema, session_id, turn.history, tok.name)
+        if cache is not None:
+            cache.append(self._schema, session_id, turn.message)
+
+        # 3) Build context within the token budget (summary first, then the newest messages)
+        budget = self._prompt_budget(model_name, max_tokens) - MESSAGE_OVERHEAD_TOKENS - incoming_tokens
+        if budget < 0:
+            log.warning("chat_prompt_over_budget", extra={"tenant_schema": self._schema, "model": model_name})
+        msgs: list[dict] = []
+        summary = turn.summary if self._summarizer is not None else None
+        if summary is not None:
+            history = [m for m in history if m[3] > summary.through]
+            summary_text = SUMMARY_PREFIX + summary.text
+            cost = MESSAGE_OVERHEAD_TOKENS + (
+                summary.token_count if summary.token_count is not None else tok.count(summary_text)
+            )
+            if cost <= budget:
+                budget -= cost
+                msgs.append({"role": "system", "content": summary_text})
+        has_summary = bool(msgs)
+        memory_text = ""
+        if memory is not None and recalled:
+            exclude = {m[0] for m in history} | {turn.message[0]}
+            memory_text = self._fit_recalled(
+                recalled, exclude, tok, min(memory.max_tokens, budget // 2), memory.top_k
+            )
+            if memory_text:
+                budget -= MESSAGE_OVERHEAD_TOKENS + tok.count(memory_text)
+                msgs.append({"role": "system", "content": memory_text})
+                MEMORY_EVENTS.labels(event="recalled").inc()
+        documents_text, documents_used = "", 0
+        if documents is not None and chunks:
+            documents_text, documents_used = self._fit_documents(chunks, tok, min(documents.max_tokens, budget // 2))
+            if documents_text:
+                budget -= MESSAGE_OVERHEAD_TOKENS + tok.count(documents_text)
+                msgs.append({"role": "system", "content": documents_text})
+        context = self._fit_history(history, tok, budget)
+        msgs.extend({"role": m[1], "content": m[2]} for m in context)
         msgs.append({"role": incoming_role, "content": incoming_text})
 
-        # 4) LLM call
-        reply = await self._llm.chat(
-            messages=msgs,
-            model=model,
-            provider=provider,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
+        # 4) LLM call (no DB connection held), unless answered by the semantic cache
+        if hit is not None:
+            reply = {"content": hit.answer, "model": model_name, "provider": provider, "usage": None}
+        else:
+            reply = await self._llm.chat(
+                messages=msgs,
+                model=model,
+                provider=provider,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                cache=cache_enabled,
+            )
         content = reply.get("content", "")
         meta = {
             "provider": reply.get("provider"),
             "model": reply.get("model"),
             "usage": reply.get("usage"),
         }
+        if hit is not None:
+            meta["semantic_cache"] = {"id": str(hit.id), "similarity": hit.similarity}
 
-        # 5) Persist assistant
-        await self._repo.append_message(session_id, "assistant", content, meta=meta)
+        # 5) Persist assistant (second exchange)
+        async with self._repo() as repo:
+            stored = await repo.finish_turn(
+                session_id, content, meta=meta, token_count=tok.count(content), token_counter=tok.name
+            )
+            if semantic is not None and probe is not None and hit is None and content:
+                await semantic.store(
+                    repo, probe, model=model_name or "", prompt=incoming_text, answer=content, meta=meta
+                )
+        if cache is not None:
+            cache.append(self._schema, session_id, stored)
+        if self._memory is not None:
+            self._memory.record(
+                self._schema,
+                session_id,
+                [turn.message, stored],
+                embeddings={turn.message[0]: memory_vec} if memory_vec is not None else None,
+            )
+        # Messages after the summary: history + this turn's two (history is capped at n).
+        if self._summarizer is not None and self._summarizer.due(len(history) + 2, cap=n):
+            self._summarizer.schedule(
+                self._repo, self._llm, schema=self._schema, session_id=session_id, model=model, provider=provider
+            )
 
         # 6) Observability (Phase-1 minimal)
         log.info(
@@ -85,13 +459,19 @@ class ChatService:
             extra={
                 "tenant_schema": self._schema,
                 "session_id": str(session_id),
-                "len_history": len(history),
+                "len_history": len(context),
+                "has_summary": has_summary,
+                "has_memory": bool(memory_text),
+                "documents_chunks": documents_used,
+                "semantic_hit": hit is not None,
+                "history_budget": budget,
                 "model": model,
                 "provider": provider,
             },
         )
 
         return {
+            "session_id": session_id,
             "role": "assistant",
             "content": content,
             "model": reply.get("model"),
@@ -0,0 +1,95 @@
+# FILE: noosphera/services/chunking.py
+from __future__ import annotations
+
+import codecs
+from typing import AsyncIterable, AsyncIterator
+
+from ..providers.tokenizer import Tokenizer
+
+
+class Chunker:
+    """
+    Push-based text chunker: `feed` lines as they are read (any source, sync or async),
+    collect finished chunks, and `finish` at the end.
+
+    Paragraphs (blank-line separated) are packed into chunks of at most `max_tokens`;
+    longer paragraphs are split between words. Consecutive chunks repeat up to
+    `overlap_tokens` tokens of trailing text so a sentence cut at a boundary keeps context.
+    Token counts are summed per paragraph/word, an approximation of counting the joined text.
+    """
+
+    def __init__(self, tokenizer: Tokenizer, *, max_tokens: int = 400, overlap_tokens: int = 40) -> None:
+        self._tok = tokenizer
+        self._max = max(1, int(max_tokens))
+        self._overlap = max(0, min(int(overlap_tokens), self._max // 2))
+        self._para: list[str] = []
+        self._units: list[tuple[str, int, str]] = []  # (text, tokens, separator before it)
+        self._tokens = 0
+        self._fresh = False  # units added since the last emitted chunk
+
+    def feed(self, line: str) -> list[str]:
+        line = line.rstrip("\r\n")
+        if line.strip():
+            self._para.append(line)
+            return []
+        return self._end_paragraph()
+
+    def finish(self) -> list[str]:
+        out = self._end_paragraph()
+        if self._fresh:
+            out.append(self._emit(keep_overlap=False))
+        return out
+
+    def _end_paragraph(self) -> list[str]:
+        if not self._para:
+            return []
+        text = "\n".join(self._para)
+        self._para = []
+        n = self._tok.count(text)
+        if n <= self._max:
+            return self._add(text, n, "\n\n")
+        out: list[str] = []
+        sep = "\n\n"
+        for word in text.split():
+            out += self._add(word, self._tok.count(word) or 1, sep)
+            sep = " "
+        return out
+
+    def _add(self, text: str, tokens: int, sep: str) -> list[str]:
+        out: list[str] = []
+        if self._fresh and self._tokens + tokens > self._max:
+            out.append(self._emit(keep_overlap=True))
+        self._units.append((text, tokens, sep))
+        self._tokens += tokens
+        self._fresh = True
+        return out
+
+    def _emit(self, *, keep_overlap: bool) -> str:
+        chunk = "".join((sep if i else "") + text for i, (text, _, sep) in enumerate(self._units))
+        kept: list[tuple[str, int, str]] = []
+        if keep_overlap and self._overlap:
+            budget = self._overlap
+            for unit in reversed(self._units):
+                if unit[1] > budget:
+                    break
+                budget -= unit[1]
+                kept.append(unit)
+            kept.reverse()
+        self._units = kept
+        self._tokens = sum(u[1] for u in kept)
+        self._fresh = False
+        return chunk
+
+
+async def decode_lines(stream: AsyncIterable[bytes], encoding: str = "utf-8") -> AsyncIterator[str]:
+    """Text lines of a byte stream, decoded incrementally (undecodable bytes are replaced)."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    rest = ""
+    async for data in stream:
+        lines = (rest + decoder.decode(data)).split("\n")
+        rest = lines.pop()
+        for line in lines:
+            yield line
+    rest += decoder.decode(b"", final=True)
+    if rest:
+        yield rest
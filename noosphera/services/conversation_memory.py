@@ -0,0 +1,193 @@
+# RATIONALE:
+# The prompt only carries the last history_max_messages messages (and, with summaries, a lossy
+# digest of the rest). Long-term memory embeds every user/assistant message after it is stored,
+# off the request path and in batches, into a per-tenant pgvector table; each turn embeds the
+# incoming message and adds the few most similar older messages to the context under a small
+# token budget. The model can then use details from far back in a session, and prompts do not
+# grow with session length.
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Literal, Optional, Sequence
+from uuid import UUID
+
+from ..observability.metrics import MEMORY_EVENTS
+from ..providers.manager import ProviderManager
+from ..repositories.chat_repository import ChatRepository, MessageRow, Recollection, open_chat_repository
+
+log = logging.getLogger(__name__)
+
+MEMORY_PREFIX = "Possibly relevant earlier messages:\n"
+
+# (message_id, session_id, created_at, text, embedding or None)
+_Pending = tuple[UUID, UUID, datetime, str, Optional[list[float]]]
+
+
+class ConversationMemory:
+    """
+    Embedding-based recall of older chat messages, one per worker.
+
+    `record` queues stored messages; a background task embeds them in batches of
+    `batch_size` and writes them to `<schema>.message_embeddings` every `flush_interval_s`.
+    The queue holds at most `max_pending` messages (newer ones are dropped and counted);
+    memory is best-effort, and a failed flush is retried once at the next interval.
+    """
+
+    def __init__(
+        self,
+        provider_manager: ProviderManager,
+        *,
+        embedding_model: str,
+        dimensions: int,
+        embedding_provider: Optional[str] = None,
+        top_k: int = 4,
+        min_similarity: float = 0.5,
+        max_tokens: int = 1024,
+        scope: Literal["session", "tenant"] = "session",
+        batch_size: int = 64,
+        flush_interval_s: float = 1.0,
+        max_pending: int = 10_000,
+    ) -> None:
+        self._pm = provider_manager
+        self._model = embedding_model
+        self._provider = embedding_provider or None
+        self.dimensions = int(dimensions)
+        self.top_k = int(top_k)
+        self._min_similarity = float(min_similarity)
+        self.max_tokens = int(max_tokens)
+        self.scope = scope
+        self._batch = int(batch_size)
+        self._interval = float(flush_interval_s)
+        self._max_pending = int(max_pending)
+        self._pending: dict[str, list[_Pending]] = {}
+        self._size = 0
+        self._retried: set[UUID] = set()
+        self._task: Optional[asyncio.Task[None]] = None
+
+    async def _embed_many(self, texts: Sequence[str]) -> list[list[float]]:
+        vectors = await self._pm.get(self._provider).embed(list(texts), self._model)
+        if any(len(v) != self.dimensions for v in vectors):
+            raise ValueError(f"embedding dimensions differ from the configured {self.dimensions}")
+        return vectors
+
+    async def embed(self, text: str) -> Optional[list[float]]:
+        """Embedding of `text`, or None if it could not be computed."""
+        try:
+            (vec,) = await self._embed_many([text])
+        except Exception as exc:
+            MEMORY_EVENTS.labels(event="error").inc()
+            log.warning("memory embedding failed: %s", exc)
+            return None
+        return vec
+
+    async def recall(
+        self,
+        repo: ChatRepository,
+        embedding: Sequence[float],
+        *,
+        session_id: Optional[UUID],
+        overfetch: int = 0,
+        token_counter: Optional[str] = None,
+    ) -> list[Recollection]:
+        """
+        Up to `top_k + overfetch` similar messages (the caller drops those already in its
+        window); session scope needs `session_id`. Failures return nothing.
+        """
+        if self.scope == "session" and session_id is None:
+            return []
+        try:
+            found = await repo.recall_messages(
+                embedding,
+                model=self._model,
+                limit=self.top_k + overfetch,
+                min_similarity=self._min_similarity,
+                session_id=session_id if self.scope == "session" else None,
+                token_counter=token_counter,
+            )
+        except Exception as exc:
+            MEMORY_EVENTS.labels(event="error").inc()
+            log.warning("memory recall failed: %s", exc)
+            return []
+        return found
+
+    def record(
+        self,
+        schema: str,
+        session_id: UUID,
+        rows: Sequence[MessageRow],
+        embeddings: Optional[dict[UUID, list[float]]] = None,
+    ) -> None:
+        """Queue stored messages for indexing; `embeddings` already computed are reused."""
+        embeddings = embeddings or {}
+        queue = self._pending.setdefault(schema, [])
+        for mid, role, content, created_at, _ in rows:
+            if role not in ("user", "assistant") or not content:
+                continue
+            if self._size >= self._max_pending:
+                MEMORY_EVENTS.labels(event="dropped").inc()
+                continue
+            queue.append((mid, session_id, created_at, content, embeddings.get(mid)))
+            self._size += 1
+
+    async def flush(self) -> int:
+        """Embed and store everything queued. Returns the number of messages indexed."""
+        pending, self._pending, self._size = self._pending, {}, 0
+        written = 0
+        for schema, items in pending.items():
+            for i in range(0, len(items), self._batch):
+                chunk = items[i : i + self._batch]
+                try:
+                    todo = [n for n, it in enumerate(chunk) if it[4] is None]
+                    if todo:
+                        vectors = await self._embed_many([chunk[n][3] for n in todo])
+                        for n, vec in zip(todo, vectors):
+                            chunk[n] = chunk[n][:4] + (vec,)
+                    async with open_chat_repository(schema) as repo:
+                        await repo.store_message_embeddings(
+                            [(mid, sid, ts, vec) for mid, sid, ts, _, vec in chunk], model=self._model
+                        )
+                except Exception as exc:
+                    MEMORY_EVENTS.labels(event="error").inc()
+                    log.warning("memory indexing failed for %s (%d messages): %s", schema, len(chunk), exc)
+                    self._requeue(schema, chunk)
+                    continue
+                written += len(chunk)
+                self._retried.difference_update(it[0] for it in chunk)
+                MEMORY_EVENTS.labels(event="indexed").inc(len(chunk))
+        return written
+
+    def _requeue(self, schema: str, chunk: list[_Pending]) -> None:
+        queue = self._pending.setdefault(schema, [])
+        for item in chunk:
+            if item[0] in self._retried or self._size >= self._max_pending:
+                self._retried.discard(item[0])
+                MEMORY_EVENTS.labels(event="dropped").inc()
+                continue
+            self._retried.add(item[0])
+            queue.append(item)
+            self._size += 1
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.flush()
+            except Exception as exc:
+                log.warning("memory flush failed: %s", exc)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="noosphera-chat-memory")
+
+    async def stop(self) -> None:
+        """Stop the background indexer and index whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
@@ -0,0 +1,213 @@
+# RATIONALE:
+# Retrieval-augmented chat needs a tenant's documents as embedded chunks. Ingestion streams
+# the text through a chunker (no whole-file buffering) and handles chunks in batches: one
+# embedding request per batch instead of one per chunk, and one COPY per batch instead of
+# row-by-row INSERTs. Chunks are keyed by a hash of their normalized text; a chunk whose hash
+# was already embedded with the same model (re-uploads, boilerplate shared across documents)
+# reuses the stored vector instead of paying for another embedding call. Retrieval embeds
+# the user message and runs one HNSW search over the requested collection before the LLM call.
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterable, Optional, Sequence
+from uuid import UUID, uuid4
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..config.schema import Settings
+from ..db.tenant_chat_bootstrap import ensure_tenant_documents
+from ..observability.metrics import DOCUMENT_CHUNKS, DOCUMENT_INGEST_RATE, DOCUMENT_RETRIEVAL_LATENCY
+from ..providers.manager import ProviderManager
+from ..providers.tokenizer import get_tokenizer
+from ..repositories.chat_repository import _vector_literal
+from ..repositories.document_repository import ChunkCopyRow, ChunkHit, open_document_repository
+from .chunking import Chunker
+
+log = logging.getLogger(__name__)
+
+DOCUMENTS_PREFIX = "Context from the knowledge base (cite it where relevant):\n"
+
+
+def chunk_hash(text: str) -> str:
+    """Content hash of a chunk; whitespace differences do not change it."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+@dataclass(slots=True)
+class IngestStats:
+    document_id: Optional[UUID] = None
+    chunks: int = 0
+    embedded: int = 0
+    deduplicated: int = 0
+    batches: int = 0
+    embed_s: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+
+    @property
+    def elapsed_s(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def chunks_per_s(self) -> float:
+        return self.chunks / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def describe(self) -> str:
+        return (
+            f"{self.chunks} chunks ({self.embedded} embedded, {self.deduplicated} deduplicated) "
+            f"in {self.batches} batches, {self.elapsed_s:.1f}s ({self.chunks_per_s:,.1f} chunks/s; "
+            f"embedding {self.embed_s:.1f}s)"
+        )
+
+
+class DocumentStore:
+    """
+    The tenant's document store (`<schema>.documents` / `document_chunks`).
+
+    Ingestion errors propagate: a document whose ingestion failed keeps `completed_at`
+    NULL and the chunks of the batches already written; uploading it again is cheap since
+    those chunks are deduplicated. Retrieval failures never fail a turn (logged, no context).
+    """
+
+    def __init__(
+        self,
+        provider_manager: ProviderManager,
+        *,
+        schema: str,
+        embedding_model: str,
+        dimensions: int,
+        embedding_provider: Optional[str] = None,
+        chunk_tokens: int = 400,
+        chunk_overlap_tokens: int = 40,
+        embed_batch_size: int = 128,
+        top_k: int = 5,
+        min_similarity: float = 0.3,
+        max_tokens: int = 2048,
+        ef_search: int = 100,
+    ) -> None:
+        self._pm = provider_manager
+        self._schema = schema
+        self._model = embedding_model
+        self._provider = embedding_provider or None
+        self.dimensions = int(dimensions)
+        self._chunk_tokens = int(chunk_tokens)
+        self._overlap = int(chunk_overlap_tokens)
+        self._batch = int(embed_batch_size)
+        self.top_k = int(top_k)
+        self._min_similarity = float(min_similarity)
+        self.max_tokens = int(max_tokens)
+        self._ef_search = int(ef_search)
+
+    @classmethod
+    def from_settings(cls, provider_manager: ProviderManager, settings: Settings, *, schema: str) -> DocumentStore:
+        """A store configured from `chat.documents` (which must name an embedding model)."""
+        docs = settings.chat.documents
+        if not docs.embedding_model:
+            raise ValueError("chat.documents.embedding_model is not set")
+        return cls(
+            provider_manager,
+            schema=schema,
+            embedding_model=docs.embedding_model,
+            dimensions=docs.dimensions,
+            embedding_provider=docs.embedding_provider,
+            chunk_tokens=docs.chunk_tokens,
+            chunk_overlap_tokens=docs.chunk_overlap_tokens,
+            embed_batch_size=docs.embed_batch_size,
+            top_k=docs.top_k,
+            min_similarity=docs.min_similarity,
+            max_tokens=docs.max_tokens,
+            ef_search=docs.ef_search,
+        )
+
+    async def ensure_bootstrap(self, admin_engine: AsyncEngine) -> None:
+        await ensure_tenant_documents(admin_engine, self._schema, self.dimensions)
+
+    async def _embed_many(self, texts: Sequence[str]) -> list[list[float]]:
+        vectors = await self._pm.get(self._provider).embed(list(texts), self._model)
+        if any(len(v) != self.dimensions for v in vectors):
+            raise ValueError(f"embedding dimensions differ from the configured {self.dimensions}")
+        return vectors
+
+    async def ingest(
+        self,
+        lines: AsyncIterable[str],
+        *,
+        collection: str,
+        name: Optional[str] = None,
+        stats: Optional[IngestStats] = None,
+    ) -> IngestStats:
+        """Chunk, embed and store a document read line by line into `collection`."""
+        stats = stats if stats is not None else IngestStats()
+        tok = get_tokenizer(self._model)
+        chunker = Chunker(tok, max_tokens=self._chunk_tokens, overlap_tokens=self._overlap)
+        whole = hashlib.sha256()
+        pending: list[str] = []
+
+        async with open_document_repository(self._schema) as repo:
+            did = await repo.create_document(collection, name=name)
+        stats.document_id = did
+
+        async def _flush() -> None:
+            if not pending:
+                return
+            hashes = [chunk_hash(c) for c in pending]
+            async with open_document_repository(self._schema) as repo:
+                vectors = await repo.known_embeddings(sorted(set(hashes)), model=self._model)
+            # Embed each new text once, even if it repeats within the batch.
+            new = {h: c for h, c in zip(hashes, pending) if h not in vectors}
+            if new:
+                t0 = time.perf_counter()
+                embedded = await self._embed_many(list(new.values()))
+                stats.embed_s += time.perf_counter() - t0
+                vectors.update((h, _vector_literal(v)) for h, v in zip(new, embedded))
+            rows: list[ChunkCopyRow] = [
+                (uuid4(), did, collection, stats.chunks + i, text, h, tok.count(text), self._model, vectors[h])
+                for i, (text, h) in enumerate(zip(pending, hashes))
+            ]
+            async with open_document_repository(self._schema) as repo:
+                await repo.copy_chunks(rows)
+            stats.chunks += len(rows)
+            stats.embedded += len(new)
+            stats.deduplicated += len(rows) - len(new)
+            stats.batches += 1
+            DOCUMENT_CHUNKS.labels(event="embedded").inc(len(new))
+            DOCUMENT_CHUNKS.labels(event="deduplicated").inc(len(rows) - len(new))
+            pending.clear()
+
+        async for line in lines:
+            whole.update(line.encode("utf-8"))
+            whole.update(b"\n")
+            pending.extend(chunker.feed(line))
+            if len(pending) >= self._batch:
+                await _flush()
+        pending.extend(chunker.finish())
+        await _flush()
+
+        async with open_document_repository(self._schema) as repo:
+            await repo.complete_document(did, content_hash=whole.hexdigest(), chunk_count=stats.chunks)
+        stats.finished = time.perf_counter()
+        DOCUMENT_INGEST_RATE.observe(stats.chunks_per_s)
+        return stats
+
+    async def retrieve(self, text: str, *, collection: str) -> list[ChunkHit]:
+        """Up to `top_k` chunks of `collection` similar to `text`, most similar first."""
+        t0 = time.perf_counter()
+        try:
+            (embedding,) = await self._embed_many([text])
+            async with open_document_repository(self._schema) as repo:
+                return await repo.search_chunks(
+                    embedding,
+                    collection=collection,
+                    model=self._model,
+                    limit=self.top_k,
+                    min_similarity=self._min_similarity,
+                    ef_search=self._ef_search,
+                )
+        except Exception as exc:
+            log.warning("document retrieval failed for %s/%s: %s", self._schema, collection, exc)
+            return []
+        finally:
+            DOCUMENT_RETRIEVAL_LATENCY.observe(time.perf_counter() - t0)
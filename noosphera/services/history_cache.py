@@ -0,0 +1,127 @@
+# RATIONALE:
+# Continuing a conversation re-read the same recent messages every turn. Workers keep the tail
+# of hot sessions in memory (write-through) and only ask the DB for rows newer than what they
+# hold, inside the turn's existing round trip, so writes made by other workers are merged in.
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from uuid import UUID
+
+from ..observability.metrics import HISTORY_CACHE_BYTES, HISTORY_CACHE_EVENTS
+from ..repositories.chat_repository import MessageRow
+
+_ROW_OVERHEAD = 120  # rough per-row bytes beyond the content (tuple, uuid, datetime, role)
+
+
+def _row_bytes(row: MessageRow) -> int:
+    return _ROW_OVERHEAD + len(row[2])
+
+
+@dataclass(slots=True)
+class _Entry:
+    rows: list[MessageRow]
+    nbytes: int
+    counter: Optional[str]  # tokenizer name behind the rows' token counts
+
+
+class SessionHistoryCache:
+    """
+    LRU cache of the last `max_messages` messages per (tenant schema, session), bounded by
+    session count and an approximate total byte budget.
+
+    The cache is a hint, not the source of truth: callers refresh an entry with the rows
+    created after `since(...)` (the cached tail minus `overlap_s`, which absorbs transactions
+    that committed out of created_at order) and `merge` them in. Entries are only ever
+    (re)built from a complete read, so a partial tail is never cached. An entry whose token
+    counts came from another tokenizer (`counter`) is a miss.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_messages: int = 20,
+        max_sessions: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        overlap_s: float = 2.0,
+    ) -> None:
+        self._n = int(max_messages)
+        self._max_sessions = int(max_sessions)
+        self._max_bytes = int(max_bytes)
+        self._overlap = timedelta(seconds=overlap_s)
+        self._entries: OrderedDict[tuple[str, UUID], _Entry] = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def get(self, schema: str, session_id: UUID, counter: Optional[str] = None) -> Optional[list[MessageRow]]:
+        """Cached rows (oldest first), or None on a miss."""
+        entry = self._entries.get((schema, session_id))
+        if entry is None or entry.counter != counter:
+            HISTORY_CACHE_EVENTS.labels(event="miss").inc()
+            return None
+        self._entries.move_to_end((schema, session_id))
+        HISTORY_CACHE_EVENTS.labels(event="hit").inc()
+        return list(entry.rows)
+
+    def since(self, rows: list[MessageRow]) -> Optional[datetime]:
+        """Lower bound for the refresh query of an entry holding `rows`."""
+        return rows[-1][3] - self._overlap if rows else None
+
+    def _set(self, key: tuple[str, UUID], rows: list[MessageRow], counter: Optional[str]) -> list[MessageRow]:
+        rows = rows[-self._n :]
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        entry = _Entry(rows=rows, nbytes=sum(map(_row_bytes, rows)), counter=counter)
+        self._entries[key] = entry
+        self._bytes += entry.nbytes
+        while self._entries and (len(self._entries) > self._max_sessions or self._bytes > self._max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            HISTORY_CACHE_EVENTS.labels(event="eviction").inc()
+        HISTORY_CACHE_BYTES.set(self._bytes)
+        return list(rows)
+
+    def replace(
+        self, schema: str, session_id: UUID, rows: Iterable[MessageRow], counter: Optional[str] = None
+    ) -> list[MessageRow]:
+        """Store `rows` (oldest first) as the session's tail; returns the stored rows."""
+        HISTORY_CACHE_EVENTS.labels(event="refill").inc()
+        return self._set((schema, session_id), list(rows), counter)
+
+    def merge(
+        self,
+        schema: str,
+        session_id: UUID,
+        base: Iterable[MessageRow],
+        rows: Iterable[MessageRow],
+        counter: Optional[str] = None,
+    ) -> list[MessageRow]:
+        """
+        Store `base` (the rows returned by `get`) updated with freshly read `rows`, deduplicated
+        by id and ordered by created_at. Taking `base` explicitly keeps the result complete even
+        if the entry was evicted in between.
+        """
+        merged = {r[0]: r for r in base}
+        merged.update((r[0], r) for r in rows)
+        return self._set((schema, session_id), sorted(merged.values(), key=lambda r: r[3]), counter)
+
+    def append(self, schema: str, session_id: UUID, row: MessageRow) -> None:
+        """Write-through of a message this worker just committed (only extends live entries)."""
+        entry = self._entries.get((schema, session_id))
+        if entry is not None:
+            self.merge(schema, session_id, entry.rows, (row,), entry.counter)
+
+    def invalidate(self, schema: str, session_id: UUID) -> None:
+        entry = self._entries.pop((schema, session_id), None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+            HISTORY_CACHE_BYTES.set(self._bytes)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import text
+
+from ..db.session import get_session
+
+log = logging.getLogger(__name__)
+
+
+class KeyUsageRecorder:
+    """
+    Write-behind buffer for core.api_keys.last_used_at.
+
+    Authenticated requests only record (key_id -> latest timestamp) in memory; a background
+    task writes the buffer every `flush_interval_s` with one bulk UPDATE ... FROM (VALUES ...)
+    per batch. The buffer is flushed once more on stop().
+    """
+
+    def __init__(self, *, flush_interval_s: float = 5.0, max_batch: int = 1000) -> None:
+        self._interval = float(flush_interval_s)
+        self._max_batch = int(max_batch)
+        self._pending: dict[UUID, datetime] = {}
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record(self, key_id: UUID, ts: Optional[datetime] = None) -> None:
+        ts = ts or datetime.now(timezone.utc)
+        prev = self._pending.get(key_id)
+        if prev is None or prev < ts:
+            self._pending[key_id] = ts
+
+    async def flush(self) -> int:
+        """
+        Write all buffered timestamps. Returns the number of keys written.
+        On failure the batch is merged back into the buffer for the next attempt.
+        """
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        items = list(batch.items())
+        written = 0
+        try:
+            async with get_session() as s:
+                for i in range(0, len(items), self._max_batch):
+                    chunk = items[i : i + self._max_batch]
+                    values = ", ".join(
+                        f"(CAST(:id_{n} AS uuid), CAST(:ts_{n} AS timestamptz))" for n in range(len(chunk))
+                    )
+                    params: dict[str, object] = {}
+                    for n, (key_id, ts) in enumerate(chunk):
+                        params[f"id_{n}"] = key_id
+                        params[f"ts_{n}"] = ts
+                    await s.execute(
+                        text(
+                            "UPDATE core.api_keys AS k SET last_used_at = v.ts "
+                            f"FROM (VALUES {values}) AS v(id, ts) "
+                            "WHERE k.id = v.id AND (k.last_used_at IS NULL OR k.last_used_at < v.ts)"
+                        ),
+                        params,
+                    )
+                    written += len(chunk)
+                await s.commit()
+        except Exception as exc:
+            for key_id, ts in items:
+                self.record(key_id, ts)
+            log.warning("api key last_used_at flush failed (%d pending): %s", len(self._pending), exc)
+            return 0
+        return written
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="noosphera-key-usage-flusher")
+
+    async def stop(self) -> None:
+        """Stop the background flusher and write whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
@@ -0,0 +1,83 @@
+# RATIONALE:
+# Near-duplicate questions ("how do I reset my password" / "how can I reset my password?") miss an
+# exact-match cache but have the same answer. The incoming user message is embedded and looked up
+# in a per-tenant pgvector table (HNSW, cosine); close enough matches are answered without calling
+# the LLM at all. Opt-in: a semantic match ignores the rest of the conversation, so only the
+# opening turn of a session (no history for the answer to depend on) is looked up or stored.
+from __future__ import annotations
+
+import logging
+from typing import Optional, Sequence
+
+from ..observability.metrics import SEMANTIC_CACHE_EVENTS
+from ..providers.manager import ProviderManager
+from ..repositories.chat_repository import ChatRepository, SemanticHit
+
+log = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    Embedding-keyed answer cache over `<schema>.semantic_cache`.
+
+    Embedding or lookup failures never fail a turn: they are logged, counted and treated
+    as a miss. Answers are only matched against prompts sent to the same model.
+    """
+
+    def __init__(
+        self,
+        provider_manager: ProviderManager,
+        *,
+        embedding_model: str,
+        dimensions: int,
+        embedding_provider: Optional[str] = None,
+        min_similarity: float = 0.95,
+        ttl_s: float = 86_400.0,
+    ) -> None:
+        self._pm = provider_manager
+        self._model = embedding_model
+        self._provider = embedding_provider or None
+        self.dimensions = int(dimensions)
+        self._min_similarity = float(min_similarity)
+        self._ttl = float(ttl_s)
+
+    async def embed(self, text: str) -> Optional[list[float]]:
+        """Embedding of `text`, or None if it could not be computed."""
+        try:
+            (vec,) = await self._pm.get(self._provider).embed([text], self._model)
+        except Exception as exc:
+            SEMANTIC_CACHE_EVENTS.labels(event="error").inc()
+            log.warning("semantic cache embedding failed: %s", exc)
+            return None
+        if len(vec) != self.dimensions:
+            SEMANTIC_CACHE_EVENTS.labels(event="error").inc()
+            log.warning(
+                "semantic cache embedding has %d dimensions, configured %d", len(vec), self.dimensions
+            )
+            return None
+        return vec
+
+    async def lookup(self, repo: ChatRepository, embedding: Sequence[float], *, model: str) -> Optional[SemanticHit]:
+        try:
+            hit = await repo.find_semantic_answer(
+                embedding, model=model, min_similarity=self._min_similarity, max_age_s=self._ttl
+            )
+        except Exception as exc:
+            SEMANTIC_CACHE_EVENTS.labels(event="error").inc()
+            log.warning("semantic cache lookup failed: %s", exc)
+            return None
+        SEMANTIC_CACHE_EVENTS.labels(event="hit" if hit is not None else "miss").inc()
+        return hit
+
+    async def store(
+        self, repo: ChatRepository, embedding: Sequence[float], *, model: str, prompt: str, answer: str, meta: dict
+    ) -> None:
+        try:
+            await repo.store_semantic_answer(
+                embedding, model=model, prompt=prompt, answer=answer, meta=meta, max_age_s=self._ttl
+            )
+        except Exception as exc:
+            SEMANTIC_CACHE_EVENTS.labels(event="error").inc()
+            log.warning("semantic cache store failed: %s", exc)
+            return
+        SEMANTIC_CACHE_EVENTS.labels(event="store").inc()
@@ -0,0 +1,215 @@
+# RATIONALE:
+# Long sessions used to re-send their whole recent window every turn and silently drop anything
+# older than history_max_messages. With summaries enabled, older messages are folded into one
+# rolling summary per session, off the request path, so a turn's prompt is the summary plus a
+# short verbatim tail no matter how long the session has grown.
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Optional
+from uuid import UUID
+
+from ..observability.metrics import SUMMARY_EVENTS, SUMMARY_LATENCY
+from ..ports.llm import ChatLLMPort
+from ..providers.tokenizer import (
+    MESSAGE_OVERHEAD_TOKENS,
+    REPLY_PRIMING_TOKENS,
+    context_window_for,
+    get_tokenizer,
+)
+from ..repositories.chat_repository import MessageRow, SessionSummary
+
+if TYPE_CHECKING:
+    from .chat_service import RepoFactory
+
+log = logging.getLogger(__name__)
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and an assistant. "
+    "Update the summary with the new messages. Keep facts, names, decisions, open questions "
+    "and user preferences; drop pleasantries. Write plain prose in the conversation's language. "
+    "Reply with the updated summary only."
+)
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def _transcript(rows: list[MessageRow]) -> str:
+    return "\n\n".join(f"{r[1]}: {r[2]}" for r in rows)
+
+
+class SessionSummarizer:
+    """
+    Background updater of rolling session summaries, one per worker.
+
+    `schedule` starts a task that reads the messages not yet summarized (except the newest
+    `keep_messages`), asks the LLM to fold them into the previous summary and stores the
+    result. Runs for the same session are coalesced within this worker; across workers the
+    store is conditional on the summary read, so a slower run never overwrites a newer one.
+    Summaries are best-effort: a failed run is retried at the next trigger.
+    """
+
+    def __init__(
+        self,
+        *,
+        every_turns: int = 5,
+        keep_messages: int = 6,
+        max_tokens: int = 512,
+        batch_max_messages: int = 200,
+        model: Optional[str] = None,
+        provider: Optional[str] = None,
+        context_windows: Optional[dict[str, int]] = None,
+        context_window_default: int = 8192,
+    ) -> None:
+        self._every = int(every_turns)
+        self._keep = int(keep_messages)
+        self._max_tokens = int(max_tokens)
+        self._batch = int(batch_max_messages)
+        self._model = model or None
+        self._provider = provider or None
+        self._windows = dict(context_windows or {})
+        self._window_default = int(context_window_default)
+        self._tasks: dict[tuple[str, UUID], asyncio.Task[None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def due(self, unsummarized: int, *, cap: int) -> bool:
+        """
+        Whether a session with `unsummarized` messages after its summary should be folded:
+        every `every_turns` turns (two messages each) beyond the verbatim tail. `cap` is the
+        most messages a turn can see (history_max_messages), so the trigger stays reachable.
+        """
+        return unsummarized >= min(self._keep + 2 * self._every, cap)
+
+    def schedule(
+        self,
+        repo_factory: RepoFactory,
+        llm: ChatLLMPort,
+        *,
+        schema: str,
+        session_id: UUID,
+        model: Optional[str],
+        provider: Optional[str],
+    ) -> bool:
+        """Start a background summarization for the session; False if one is already running."""
+        key = (schema, session_id)
+        if key in self._tasks:
+            SUMMARY_EVENTS.labels(event="coalesced").inc()
+            return False
+        task = asyncio.create_task(
+            self._run(repo_factory, llm, schema=schema, session_id=session_id, model=model, provider=provider),
+            name=f"noosphera-summary-{session_id}",
+        )
+        self._tasks[key] = task
+        task.add_done_callback(lambda _t: self._tasks.pop(key, None))
+        SUMMARY_EVENTS.labels(event="scheduled").inc()
+        return True
+
+    async def _run(self, repo_factory: RepoFactory, llm: ChatLLMPort, **kw) -> None:
+        started = time.perf_counter()
+        try:
+            event = await self.summarize(repo_factory, llm, **kw)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            SUMMARY_EVENTS.labels(event="failed").inc()
+            log.warning(
+                "chat_summary_failed",
+                extra={"tenant_schema": kw["schema"], "session_id": str(kw["session_id"]), "error": str(exc)},
+            )
+            return
+        SUMMARY_EVENTS.labels(event=event).inc()
+        if event == "stored":
+            SUMMARY_LATENCY.observe(time.perf_counter() - started)
+
+    async def summarize(
+        self,
+        repo_factory: RepoFactory,
+        llm: ChatLLMPort,
+        *,
+        schema: str,
+        session_id: UUID,
+        model: Optional[str],
+        provider: Optional[str],
+    ) -> str:
+        """
+        Fold pending messages into the session summary now. Returns the outcome:
+        "stored", "conflict" (another writer got there first) or "skipped" (nothing to fold).
+        """
+        async with repo_factory() as repo:
+            exists, prev, rows = await repo.fetch_summary_input(session_id, keep=self._keep, limit=self._batch)
+        if not exists or not rows:
+            return "skipped"
+
+        # Fold as many pending messages (oldest first) as the summarizing model's window allows.
+        s_model, s_provider = self._model or model, self._provider or provider
+        s_tok = get_tokenizer(llm.resolve_model(s_model, s_provider))
+        prev_text = prev.text if prev is not None else ""
+        budget = (
+            context_window_for(llm.resolve_model(s_model, s_provider), self._windows, self._window_default)
+            - self._max_tokens
+            - REPLY_PRIMING_TOKENS
+            - 2 * MESSAGE_OVERHEAD_TOKENS
+            - s_tok.count(SUMMARY_INSTRUCTIONS)
+            - s_tok.count(prev_text)
+        )
+        fold: list[MessageRow] = []
+        for row in rows:
+            cost = s_tok.count(f"{row[1]}: {row[2]}\n\n")
+            if cost > budget:
+                if not fold:  # a single oversized message: fold a clipped copy so progress is made
+                    fold.append((row[0], row[1], row[2][: max(budget, 0) * 3], row[3], row[4]))
+                break
+            budget -= cost
+            fold.append(row)
+
+        # LLM call (no DB connection held)
+        reply = await llm.chat(
+            messages=[
+                {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+                {
+                    "role": "user",
+                    "content": f"Summary so far:\n{prev_text or '(none)'}\n\nNew messages:\n{_transcript(fold)}",
+                },
+            ],
+            model=s_model,
+            provider=s_provider,
+            temperature=0.0,
+            max_tokens=self._max_tokens,
+        )
+        text = (reply.get("content") or "").strip()
+        if not text:
+            raise RuntimeError("summarization returned no content")
+
+        # Counted with the turn model's tokenizer: that is the budget the summary is spent from.
+        turn_tok = get_tokenizer(llm.resolve_model(model, provider))
+        summary = SessionSummary(text, fold[-1][3], turn_tok.count(SUMMARY_PREFIX + text))
+        async with repo_factory() as repo:
+            stored = await repo.store_summary(
+                session_id,
+                summary,
+                expected_through=prev.through if prev is not None else None,
+                token_counter=turn_tok.name,
+            )
+        if stored:
+            log.info(
+                "chat_summary_stored",
+                extra={
+                    "tenant_schema": schema,
+                    "session_id": str(session_id),
+                    "folded": len(fold),
+                    "summary_tokens": summary.token_count,
+                },
+            )
+        return "stored" if stored else "conflict"
+
+    async def stop(self) -> None:
+        """Cancel runs still in flight (they are redone at the session's next trigger)."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
@@ -1,18 +1,25 @@
 from __future__ import annotations
 
+import logging
 import secrets
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, Tuple
 from uuid import UUID, uuid4
 
-from sqlalchemy import select, update
+from sqlalchemy import case, func, select, update
 from sqlalchemy.ext.asyncio import AsyncEngine
 
 from ..db.models.core import ApiKey, KeyStatus, Tenant, TenantStatus
 from ..db.session import get_session
-from ..db.tenancy import create_tenant_schema
-from ..security.crypto import hash_secret, verify_secret
+from ..db.tenant_chat_bootstrap import build_search_index, ensure_tenant_chat_tables
+from ..security.access_tokens import AccessTokenIssuer
+from ..security.crypto import HMAC_SCHEME, hash_secret, needs_rehash, verify_secret
+from ..security.directory import KeyDirectory
+from ..security.key_cache import VerifiedKeyCache
+from .key_usage import KeyUsageRecorder
+
+log = logging.getLogger(__name__)
 
 
 def _gen_prefix(n: int = 8) -> str:
@@ -44,24 +51,75 @@ def _parse_token(token: str) -> _ParsedToken:
     return _ParsedToken(prefix=prefix, secret=secret)
 
 
+class TenantSuspendedError(PermissionError):
+    """The key is valid in shape and known, but its tenant is not active."""
+
+
 class TenantManager:
     """
     Service for tenant lifecycle and API key issuance/verification.
     """
 
-    def __init__(self, admin_engine: AsyncEngine, app_engine: AsyncEngine) -> None:
+    def __init__(
+        self,
+        admin_engine: AsyncEngine,
+        app_engine: AsyncEngine,
+        *,
+        key_cache: Optional[VerifiedKeyCache] = None,
+        usage_recorder: Optional[KeyUsageRecorder] = None,
+        directory: Optional[KeyDirectory] = None,
+        access_tokens: Optional[AccessTokenIssuer] = None,
+        chat_partition_months_ahead: Optional[int] = None,
+    ) -> None:
         self._admin_engine = admin_engine
+        self._partition_months_ahead = chat_partition_months_ahead
         self._app_engine = app_engine
+        self._key_cache = key_cache
+        self._usage = usage_recorder
+        self._directory = directory
+        self.access_tokens = access_tokens
+        if directory is not None:
+            # Changes made by any process/node reach this worker via NOTIFY.
+            directory.add_listener(self._on_directory_change)
+
+    def _on_directory_change(self, key_prefix: Optional[str], tenant_id: Optional[UUID]) -> None:
+        assert self._directory is not None
+        if key_prefix is not None:
+            if self._key_cache is not None:
+                self._key_cache.invalidate_prefix(key_prefix)
+            # Absent from the refreshed directory => revoked/deleted.
+            if self.access_tokens is not None and self._directory.get(key_prefix) is None:
+                self.access_tokens.deny_key(key_prefix)
+        elif tenant_id is not None:
+            if self._key_cache is not None:
+                self._key_cache.invalidate_tenant(tenant_id)
+            if self.access_tokens is not None:
+                entries = [e for e in self._directory.entries() if e.tenant_id == tenant_id]
+                if not entries or any(e.tenant_status != TenantStatus.active for e in entries):
+                    self.access_tokens.deny_tenant(tenant_id)
+
+    def _live_directory(self) -> Optional[KeyDirectory]:
+        d = self._directory
+        return d if d is not None and d.ready else None
+
+    async def ensure_chat_tables(self, schema: str) -> None:
+        """Bring `schema`'s chat tables to the current layout, partitioned as configured."""
+        await ensure_tenant_chat_tables(
+            self._admin_engine, schema, partition_months_ahead=self._partition_months_ahead
+        )
 
     async def create_tenant(self, name: str) -> Tenant:
         """
-        Create a tenant entry and provision its isolated schema (t_<uuid>).
+        Create a tenant entry and provision its isolated schema (t_<uuid>) with the
+        current chat table layout and search index, so requests never have to run DDL for
+        it. With `chat_partition_months_ahead`, chat_messages is partitioned by month.
         """
         tenant_id = uuid4()
         schema = f"t_{tenant_id.hex}"
 
-        # 1) DDL: ensure tenant schema exists (admin engine)
-        await create_tenant_schema(self._admin_engine, schema)
+        # 1) DDL: tenant schema + chat tables (admin engine)
+        await self.ensure_chat_tables(schema)
+        await build_search_index(self._admin_engine, schema)  # empty tables: instant
 
         # 2) Control-plane row in core.tenants (app engine)
         async with get_session() as s:
@@ -84,13 +142,50 @@ class TenantManager:
                 raise LookupError(f"Tenant not found: {tenant_id}")
             return t
 
+    async def set_tenant_status(self, tenant_id: UUID, status: TenantStatus) -> None:
+        """
+        Activate or suspend a tenant. Suspension drops this process' cached verifications
+        for the tenant's keys immediately.
+        """
+        async with get_session() as s:
+            res = await s.execute(
+                update(Tenant).where(Tenant.id == tenant_id).values(status=status, updated_at=func.now())
+            )
+            if res.rowcount == 0:
+                raise LookupError(f"Tenant not found: {tenant_id}")
+            await s.commit()
+        if status != TenantStatus.active:
+            if self._key_cache is not None:
+                self._key_cache.invalidate_tenant(tenant_id)
+            if self.access_tokens is not None:
+                self.access_tokens.deny_tenant(tenant_id)
+
+    async def set_chat_retention(self, tenant_id: UUID, months: Optional[int]) -> None:
+        """
+        Months of chat history kept for the tenant when its chat_messages is partitioned
+        (0 = keep everything, None = the configured default). Applied by the next
+        partition maintenance run.
+        """
+        if months is not None and months < 0:
+            raise ValueError("Retention must be >= 0 months")
+        async with get_session() as s:
+            res = await s.execute(
+                update(Tenant)
+                .where(Tenant.id == tenant_id)
+                .values(chat_retention_months=months, updated_at=func.now())
+            )
+            if res.rowcount == 0:
+                raise LookupError(f"Tenant not found: {tenant_id}")
+            await s.commit()
+
     async def create_api_key(
         self, tenant_id: UUID, *, name: Optional[str] = None, expires_at: Optional[datetime] = None
     ) -> str:
         """
         Create a new API key for the tenant. Returns the *plaintext* token once.
 
-        Storage: only (key_prefix, bcrypt(key_secret)) are persisted.
+        Storage: only (key_prefix, hash(key_secret)) are persisted; the hash is
+        HMAC-SHA256 with the server pepper, or bcrypt when no pepper is configured.
         """
         prefix = _gen_prefix()
         secret = _gen_secret()
@@ -125,12 +220,74 @@ class TenantManager:
                 .values(status=KeyStatus.revoked)
             )
             await s.commit()
+        if self._key_cache is not None:
+            self._key_cache.invalidate_prefix(key_prefix)
+        if self.access_tokens is not None:
+            self.access_tokens.deny_key(key_prefix)
 
     async def verify_api_key(self, token: str) -> tuple[Tenant, ApiKey]:
         """
         Verify an API token. Returns (Tenant, ApiKey) if valid & active; raises otherwise.
+        Served from the verified-key cache when one is configured.
         """
         parsed = _parse_token(token)
+        if self._key_cache is None:
+            tenant, key = await self._verify_parsed(parsed)
+        else:
+            tenant, key = await self._key_cache.get_or_verify(token, lambda: self._verify_parsed(parsed))
+        await self._touch(key)
+        return tenant, key
+
+    def is_recently_verified(self, token: str) -> bool:
+        """True if `token` is currently held by the verified-key cache."""
+        return self._key_cache is not None and self._key_cache.contains(token)
+
+    async def _touch(self, key: ApiKey) -> None:
+        """
+        Record last use. Buffered (write-behind) when a recorder is configured,
+        otherwise a direct best-effort UPDATE.
+        """
+        if self._usage is not None:
+            self._usage.record(key.id)
+            return
+        async with get_session() as s:
+            await s.execute(update(ApiKey).where(ApiKey.id == key.id).values(last_used_at=func.now()))
+            await s.commit()
+
+    async def tenant_status_for_prefix(self, key_prefix: str) -> Optional[TenantStatus]:
+        """
+        Status of the tenant owning an (active) key prefix, or None if unknown.
+        Answered from the key directory when it is live.
+        """
+        directory = self._live_directory()
+        if directory is not None:
+            entry = directory.get(key_prefix)
+            return entry.tenant_status if entry else None
+        async with get_session() as s:
+            res = await s.execute(
+                select(Tenant.status)
+                .select_from(ApiKey)
+                .join(Tenant, Tenant.id == ApiKey.tenant_id)
+                .where(ApiKey.key_prefix == key_prefix)
+            )
+            row = res.first()
+            return row[0] if row else None
+
+    async def _verify_parsed(self, parsed: _ParsedToken) -> tuple[Tenant, ApiKey]:
+        directory = self._live_directory()
+        if directory is not None:
+            entry = directory.get(parsed.prefix)
+            if entry is None:
+                raise PermissionError("Invalid or revoked API key")
+            if entry.tenant_status != TenantStatus.active:
+                raise TenantSuspendedError("Tenant suspended")
+            if entry.expires_at and entry.expires_at < datetime.now(timezone.utc):
+                raise PermissionError("API key expired")
+            if not await verify_secret(parsed.secret, entry.key_hash):
+                raise PermissionError("Invalid API key")
+            if needs_rehash(entry.key_hash):
+                await self._upgrade_hash(entry.key_id, entry.key_hash, parsed.secret)
+            return entry.to_models()
 
         async with get_session() as s:
             res = await s.execute(
@@ -150,16 +307,48 @@ class TenantManager:
             tenant: Tenant = row[1]
 
             # Check expiry if set
-            if key.expires_at and key.expires_at < datetime.utcnow().astimezone(key.expires_at.tzinfo):
+            if key.expires_at and key.expires_at < datetime.now(timezone.utc):
                 raise PermissionError("API key expired")
 
             ok = await verify_secret(parsed.secret, key.key_hash)
             if not ok:
                 raise PermissionError("Invalid API key")
 
-            # best-effort touch
-            key.last_used_at = datetime.utcnow()
-            s.add(key)
-            await s.commit()
+        if needs_rehash(key.key_hash):
+            await self._upgrade_hash(key.id, key.key_hash, parsed.secret)
+        return tenant, key
+
+    async def _upgrade_hash(self, key_id: UUID, old_hash: str, secret: str) -> None:
+        """
+        Best-effort transparent migration of a legacy (bcrypt) hash to the HMAC scheme,
+        done once on the first successful verification. Guarded on the old value so
+        concurrent upgrades across workers are harmless.
+        """
+        try:
+            new_hash = await hash_secret(secret)
+            async with get_session() as s:
+                await s.execute(
+                    update(ApiKey)
+                    .where(ApiKey.id == key_id, ApiKey.key_hash == old_hash)
+                    .values(key_hash=new_hash)
+                )
+                await s.commit()
+        except Exception as exc:
+            log.warning("api key hash upgrade failed for key %s: %s", key_id, exc)
 
-            return tenant, key
+    async def key_hash_report(self) -> list[tuple[str, KeyStatus, int]]:
+        """
+        Count API keys by hash scheme and status (progress of the bcrypt -> HMAC migration).
+        """
+        scheme = case(
+            (ApiKey.key_hash.like(f"{HMAC_SCHEME}$%"), HMAC_SCHEME),
+            (ApiKey.key_hash.like("$2%"), "bcrypt"),
+            else_="unknown",
+        )
+        async with get_session() as s:
+            res = await s.execute(
+                select(scheme, ApiKey.status, func.count())
+                .group_by(scheme, ApiKey.status)
+                .order_by(scheme, ApiKey.status)
+            )
+            return [(r[0], r[1], int(r[2])) for r in res.all()]
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# RATIONALE:
+# Compare DB round trips and latency of one chat turn's persistence (no LLM) between the
+# per-statement ORM path (defined here as the baseline) and the pipelined unit of work
+# (begin_turn/finish_turn).
+# Round trips are counted from a libpq protocol trace: each switch from client (F) messages to
+# server (B) messages is one wait on the server. Pool pre-ping is included, as in production.
+#
+# usage: python scripts/bench_chat_turn.py [--turns 200] [--history 20]
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from uuid import uuid4
+
+from sqlalchemy import event, insert, select, text
+
+from noosphera.config.loader import load_settings
+from noosphera.db.engine import dispose_engines, get_admin_engine, get_app_engine, init_engines, run_core_migrations
+from noosphera.db.models.tenant_chat import ChatMessage, ChatSession, tenant_execution_options
+from noosphera.db.session import get_session
+from noosphera.db.tenant_chat_bootstrap import ensure_tenant_chat_tables, forget_tenant_schema
+from noosphera.repositories.chat_repository import open_chat_repository
+
+
+class _RoundTrips:
+    """Counts client->server turnarounds in a libpq trace shared by all pooled connections."""
+
+    def __init__(self) -> None:
+        self._fh = tempfile.TemporaryFile(mode="w+")
+        self._pos = 0
+
+    def attach(self, dbapi_conn, _record) -> None:
+        pgconn = dbapi_conn.driver_connection.pgconn
+        pgconn.trace(self._fh.fileno())
+
+    def take(self) -> int:
+        self._fh.flush()
+        self._fh.seek(self._pos)
+        data = self._fh.read()
+        self._pos = self._fh.tell()
+        n, prev = 0, None
+        for line in data.splitlines():
+            parts = line.split("\t")
+            if len(parts) < 2 or parts[1] not in ("F", "B"):
+                continue
+            if prev == "F" and parts[1] == "B":
+                n += 1
+            prev = parts[1]
+        return n
+
+
+async def _legacy_turn(schema: str, sid, history: int) -> None:
+    # The per-statement path the chat service used before begin_turn/finish_turn: ORM
+    # statements on a short-lived session, one round trip (and commit) each.
+    opts = tenant_execution_options(schema)
+    async with get_session() as s:
+        if sid is None:
+            sid = uuid4()
+            await s.execute(insert(ChatSession).values(id=sid), execution_options=opts)
+            await s.commit()
+        else:
+            res = await s.execute(select(ChatSession.id).where(ChatSession.id == sid), execution_options=opts)
+            if res.first() is None:
+                raise LookupError(sid)
+    async with get_session() as s:
+        M = ChatMessage
+        await s.execute(
+            select(M.id, M.role, M.content, M.created_at, M.token_count)
+            .where(M.session_id == sid)
+            .order_by(M.created_at.desc(), M.id.desc())
+            .limit(history),
+            execution_options=opts,
+        )
+        await s.execute(
+            insert(M).values(id=uuid4(), session_id=sid, role="user", content="hello"), execution_options=opts
+        )
+        await s.commit()
+    async with get_session() as s:
+        await s.execute(
+            insert(ChatMessage).values(
+                id=uuid4(), session_id=sid, role="assistant", content="Echo: hello", meta={"provider": "bench"}
+            ),
+            execution_options=opts,
+        )
+        await s.commit()
+
+
+async def _uow_turn(schema: str, sid, history: int) -> None:
+    async with open_chat_repository(schema) as repo:
+        sid = (await repo.begin_turn(sid, role="user", content="hello", history_limit=history)).session_id
+    async with open_chat_repository(schema) as repo:
+        await repo.finish_turn(sid, "Echo: hello", meta={"provider": "bench"})
+
+
+async def _run(label: str, fn, schema: str, turns: int, history: int, rt: _RoundTrips) -> None:
+    # Continue one existing session: the common case (history load + existence check).
+    async with open_chat_repository(schema) as repo:
+        sid = (await repo.begin_turn(None, role="user", content="seed", history_limit=0)).session_id
+    await fn(schema, sid, history)  # warm-up
+    rt.take()
+    lat: list[float] = []
+    for _ in range(turns):
+        t0 = time.perf_counter()
+        await fn(schema, sid, history)
+        lat.append((time.perf_counter() - t0) * 1000)
+    trips = rt.take() / turns
+    lat.sort()
+    print(
+        f"{label:<14} round_trips/turn={trips:5.1f}  mean={statistics.fmean(lat):6.2f}ms  "
+        f"p50={lat[len(lat) // 2]:6.2f}ms  p95={lat[int(len(lat) * 0.95) - 1]:6.2f}ms"
+    )
+
+
+async def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark chat turn persistence")
+    ap.add_argument("--turns", type=int, default=200)
+    ap.add_argument("--history", type=int, default=20)
+    args = ap.parse_args()
+
+    settings = load_settings()
+    await init_engines(settings)
+    await run_core_migrations(settings)
+    rt = _RoundTrips()
+    event.listen(get_app_engine().sync_engine, "connect", rt.attach)
+
+    schema = f"bench_{uuid4().hex[:12]}"
+    await ensure_tenant_chat_tables(get_admin_engine(), schema)
+    try:
+        await _run("per-statement", _legacy_turn, schema, args.turns, args.history, rt)
+        await _run("unit-of-work", _uow_turn, schema, args.turns, args.history, rt)
+    finally:
+        async with get_admin_engine().begin() as conn:
+            await conn.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+        forget_tenant_schema(schema)
+        await dispose_engines()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# RATIONALE:
+# Compare the message-listing read path end to end (query -> JSON body) for one page: full ORM
+# entities copied into dicts and validated into Pydantic models (the former route path) versus
+# the column-projected Core rows serialized straight to JSON (current path). Reports latency and
+# Python allocations (tracemalloc) per page.
+#
+# usage: python scripts/bench_list_messages.py [--pages 200] [--page-size 500]
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from uuid import uuid4
+
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from sqlalchemy import select, text
+
+from noosphera.api_server.models.chat import ChatMessageOut
+from noosphera.config.loader import load_settings
+from noosphera.db.engine import dispose_engines, get_admin_engine, init_engines, run_core_migrations
+from noosphera.db.models.tenant_chat import ChatMessage, tenant_execution_options
+from noosphera.db.session import get_session
+from noosphera.db.tenant_chat_bootstrap import ensure_tenant_chat_tables, forget_tenant_schema
+from noosphera.repositories.chat_repository import MESSAGE_OUT_FIELDS, open_chat_repository
+
+_MESSAGES_OUT = TypeAdapter(list[ChatMessageOut])
+
+
+async def _entities_page(schema: str, sid, limit: int) -> bytes:
+    async with get_session() as s:
+        res = await s.execute(
+            select(ChatMessage)
+            .where(ChatMessage.session_id == sid)
+            .order_by(ChatMessage.created_at.desc())
+            .limit(limit),
+            execution_options=tenant_execution_options(schema),
+        )
+        rows = list(res.scalars())
+    rows.reverse()
+    items = [{"id": r.id, "role": r.role, "content": r.content, "created_at": r.created_at} for r in rows]
+    return _MESSAGES_OUT.dump_json([ChatMessageOut(**it) for it in items])
+
+
+async def _rows_page(schema: str, sid, limit: int) -> bytes:
+    async with open_chat_repository(schema) as repo:
+        rows, _ = await repo.fetch_session_messages(sid, limit=limit)
+    return to_json([dict(zip(MESSAGE_OUT_FIELDS, r)) for r in rows])
+
+
+async def _run(label: str, fn, schema: str, sid, pages: int, limit: int) -> None:
+    body = await fn(schema, sid, limit)  # warm-up (connections, compiled-statement cache)
+    lat: list[float] = []
+    for _ in range(pages):
+        t0 = time.perf_counter()
+        await fn(schema, sid, limit)
+        lat.append((time.perf_counter() - t0) * 1000)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    await fn(schema, sid, limit)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(max(st.count_diff, 0) for st in stats)
+
+    lat.sort()
+    print(
+        f"{label:<14} mean={statistics.fmean(lat):6.2f}ms  p50={lat[len(lat) // 2]:6.2f}ms  "
+        f"p95={lat[int(len(lat) * 0.95) - 1]:6.2f}ms  peak={peak / 1024:8.1f}KiB  "
+        f"new_blocks={blocks:7d}  body={len(body)}B"
+    )
+
+
+async def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark chat message listing")
+    ap.add_argument("--pages", type=int, default=200)
+    ap.add_argument("--page-size", type=int, default=500)
+    args = ap.parse_args()
+
+    settings = load_settings()
+    await init_engines(settings)
+    await run_core_migrations(settings)
+
+    schema = f"bench_{uuid4().hex[:12]}"
+    await ensure_tenant_chat_tables(get_admin_engine(), schema)
+    sid = uuid4()
+    try:
+        async with get_admin_engine().begin() as conn:
+            await conn.execute(text(f'INSERT INTO "{schema}".chat_sessions (id) VALUES (:sid)'), {"sid": sid})
+            await conn.execute(
+                text(
+                    f'INSERT INTO "{schema}".chat_messages (id, session_id, role, content, meta, token_count, created_at) '
+                    "SELECT gen_random_uuid(), :sid, CASE WHEN g % 2 = 0 THEN 'user' ELSE 'assistant' END, "
+                    "repeat('lorem ipsum ', 40), "
+                    "jsonb_build_object('provider', 'bench', 'model', 'bench-model', 'usage', "
+                    "jsonb_build_object('prompt_tokens', g, 'completion_tokens', g)), 120, "
+                    "now() - make_interval(secs => :n - g) FROM generate_series(1, :n) AS g"
+                ),
+                {"sid": sid, "n": args.page_size},
+            )
+        await _run("orm-entities", _entities_page, schema, sid, args.pages, args.page_size)
+        await _run("core-rows", _rows_page, schema, sid, args.pages, args.page_size)
+    finally:
+        async with get_admin_engine().begin() as conn:
+            await conn.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+        forget_tenant_schema(schema)
+        await dispose_engines()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
@@ -0,0 +1,111 @@
+from uuid import uuid4
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from noosphera.db.models.core import ApiKey, Tenant  # noqa: E402
+from noosphera.security import access_tokens  # noqa: E402
+from noosphera.security.access_tokens import ACCESS_TOKEN_PREFIX, AccessTokenIssuer  # noqa: E402
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = _Clock()
+    monkeypatch.setattr(access_tokens.time, "time", c)
+    return c
+
+
+@pytest.fixture
+def principal():
+    tenant = Tenant(id=uuid4(), name="acme", db_schema_name="tenant_acme")
+    key = ApiKey(id=uuid4(), tenant_id=tenant.id, key_prefix="ns_abc123", key_hash="x")
+    return tenant, key
+
+
+def test_issued_token_verifies(clock, principal):
+    issuer = AccessTokenIssuer("secret", ttl_s=300)
+    token, exp = issuer.issue(*principal)
+    claims = issuer.verify(token)
+    assert claims.tenant_id == principal[0].id
+    assert claims.key_prefix == "ns_abc123"
+    assert claims.expires_at == exp == int(clock.now) + 300
+
+
+def _flip_char(s: str, i: int) -> str:
+    return s[:i] + ("A" if s[i] != "A" else "B") + s[i + 1 :]
+
+
+@pytest.mark.parametrize("where", ["payload", "signature"])
+def test_tampered_token_is_rejected(clock, principal, where):
+    issuer = AccessTokenIssuer("secret")
+    token, _ = issuer.issue(*principal)
+    payload, sig = token[len(ACCESS_TOKEN_PREFIX) :].split(".")
+    if where == "payload":
+        payload = _flip_char(payload, len(payload) // 2)
+    else:
+        sig = _flip_char(sig, 0)
+    with pytest.raises(PermissionError):
+        issuer.verify(f"{ACCESS_TOKEN_PREFIX}{payload}.{sig}")
+
+
+def test_token_signed_with_another_secret_is_rejected(clock, principal):
+    token, _ = AccessTokenIssuer("other").issue(*principal)
+    with pytest.raises(PermissionError):
+        AccessTokenIssuer("secret").verify(token)
+
+
+@pytest.mark.parametrize("token", ["", "nsat_", "nsat_abc", "ns_abc123.secret"])
+def test_malformed_token_is_rejected(token):
+    with pytest.raises(PermissionError):
+        AccessTokenIssuer("secret").verify(token)
+
+
+def test_expired_token_is_rejected(clock, principal):
+    issuer = AccessTokenIssuer("secret", ttl_s=300)
+    token, _ = issuer.issue(*principal)
+    clock.now += 299
+    issuer.verify(token)
+    clock.now += 1
+    with pytest.raises(PermissionError, match="expired"):
+        issuer.verify(token)
+
+
+def test_denylisted_key_rejects_tokens_issued_before(clock, principal):
+    issuer = AccessTokenIssuer("secret")
+    token, _ = issuer.issue(*principal)
+    clock.now += 10
+    issuer.deny_key("ns_abc123")
+    with pytest.raises(PermissionError, match="revoked"):
+        issuer.verify(token)
+    clock.now += 0.001
+    fresh, _ = issuer.issue(*principal)
+    issuer.verify(fresh)
+
+
+def test_denylisted_tenant_rejects_its_tokens(clock, principal):
+    issuer = AccessTokenIssuer("secret")
+    token, _ = issuer.issue(*principal)
+    issuer.deny_tenant(principal[0].id)
+    with pytest.raises(PermissionError, match="revoked"):
+        issuer.verify(token)
+
+
+def test_token_issued_after_reenable_in_the_same_second_is_accepted(clock, principal):
+    issuer = AccessTokenIssuer("secret")
+    stale, _ = issuer.issue(*principal)
+    clock.now += 0.2
+    issuer.deny_key("ns_abc123")
+    clock.now += 0.3  # key re-enabled, new token within the same second
+    fresh, _ = issuer.issue(*principal)
+    with pytest.raises(PermissionError, match="revoked"):
+        issuer.verify(stale)
+    issuer.verify(fresh)
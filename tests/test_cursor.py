@@ -0,0 +1,57 @@
+import base64
+import json
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from noosphera.core.cursor import (
+    decode_cursor,
+    decode_search_cursor,
+    encode_cursor,
+    encode_search_cursor,
+)
+
+
+def _token(fields) -> str:
+    return base64.urlsafe_b64encode(json.dumps(fields).encode()).rstrip(b"=").decode()
+
+
+def test_cursor_round_trip():
+    position = (datetime(2024, 1, 1, tzinfo=timezone.utc), uuid4())
+    assert decode_cursor(encode_cursor(position)) == position
+
+
+def test_search_cursor_round_trip_keeps_rank_exact():
+    position = (0.1 + 0.2, datetime(2024, 1, 1, tzinfo=timezone.utc), uuid4())
+    assert decode_search_cursor(encode_search_cursor(position)) == position
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "not base64!",
+        _token({"a": 1}),
+        _token(["2024-01-01T00:00:00+00:00", 5]),
+        _token([5, str(uuid4())]),
+        _token(["2024-01-01T00:00:00", str(uuid4())]),  # naive
+        _token(["2024-01-01T00:00:00+00:00", str(uuid4()), "extra"]),
+    ],
+)
+def test_decode_cursor_rejects_malformed_tokens_with_value_error(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        _token([1.5, "2024-01-01T00:00:00+00:00", str(uuid4())]),
+        _token(["0x1p-1", "2024-01-01T00:00:00+00:00", 7]),
+        _token(["0x1p-1", None, str(uuid4())]),
+        _token(["2024-01-01T00:00:00+00:00", str(uuid4())]),
+    ],
+)
+def test_decode_search_cursor_rejects_malformed_tokens_with_value_error(token):
+    with pytest.raises(ValueError):
+        decode_search_cursor(token)
@@ -0,0 +1,76 @@
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from noosphera.core.errors import AuthThrottledError  # noqa: E402
+from noosphera.security import flood  # noqa: E402
+from noosphera.security.flood import AuthFloodGuard  # noqa: E402
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = _Clock()
+    monkeypatch.setattr(flood.time, "monotonic", c)
+    return c
+
+
+def _exhaust(guard: AuthFloodGuard, prefix: str, ip: str, n: int) -> None:
+    for i in range(n):
+        guard.record_failure(f"{prefix}.wrong{i}", prefix, ip)
+
+
+def test_recently_failed_token_is_rejected_until_ttl(clock):
+    guard = AuthFloodGuard(negative_ttl_s=60)
+    guard.record_failure("ns_abc.bad", "ns_abc", "10.0.0.1")
+    with pytest.raises(PermissionError):
+        guard.precheck("ns_abc.bad", "ns_abc", "10.0.0.1")
+    clock.now += 61
+    guard.precheck("ns_abc.bad", "ns_abc", "10.0.0.1")
+
+
+def test_prefix_bucket_refills_after_retry_after(clock):
+    guard = AuthFloodGuard(prefix_burst=3, prefix_refill_per_s=0.5, ip_burst=1000)
+    _exhaust(guard, "ns_abc", "10.0.0.1", 3)
+    with pytest.raises(AuthThrottledError) as exc:
+        guard.precheck("ns_abc.next", "ns_abc", "10.0.0.1")
+    assert exc.value.retry_after_s == pytest.approx(2.0)
+
+    clock.now += exc.value.retry_after_s / 2
+    with pytest.raises(AuthThrottledError):
+        guard.precheck("ns_abc.next", "ns_abc", "10.0.0.1")
+    clock.now += exc.value.retry_after_s / 2
+    guard.precheck("ns_abc.next", "ns_abc", "10.0.0.1")
+
+
+def test_prefix_failures_from_one_client_do_not_throttle_another(clock):
+    guard = AuthFloodGuard(prefix_burst=3, ip_burst=1000)
+    _exhaust(guard, "ns_abc", "198.51.100.7", 3)
+    with pytest.raises(AuthThrottledError):
+        guard.precheck("ns_abc.next", "ns_abc", "198.51.100.7")
+    guard.precheck("ns_abc.real", "ns_abc", "10.0.0.1")
+
+
+def test_ip_bucket_throttles_across_prefixes(clock):
+    guard = AuthFloodGuard(prefix_burst=1000, ip_burst=2, ip_refill_per_s=1.0)
+    guard.record_failure("ns_a.x", "ns_a", "10.0.0.1")
+    guard.record_failure("ns_b.x", "ns_b", "10.0.0.1")
+    with pytest.raises(AuthThrottledError):
+        guard.precheck("ns_c.x", "ns_c", "10.0.0.1")
+    clock.now += 1.0
+    guard.precheck("ns_c.x", "ns_c", "10.0.0.1")
+
+
+def test_client_ip_uses_forwarded_header_only_from_trusted_proxies():
+    guard = AuthFloodGuard(client_ip_header="X-Forwarded-For", trusted_proxies=["10.0.0.0/8"])
+    assert guard.client_ip("10.1.2.3", "203.0.113.9, 10.0.0.5") == "203.0.113.9"
+    assert guard.client_ip("10.1.2.3", "198.51.100.1, 203.0.113.9") == "203.0.113.9"
+    assert guard.client_ip("203.0.113.50", "198.51.100.1") == "203.0.113.50"
+    assert guard.client_ip("10.1.2.3", None) == "10.1.2.3"
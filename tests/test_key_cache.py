@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("prometheus_client")
+
+from noosphera.db.models.core import ApiKey, Tenant  # noqa: E402
+from noosphera.security.key_cache import VerifiedKeyCache  # noqa: E402
+
+
+def _verified(prefix: str = "ns_abc123"):
+    tenant = Tenant(id=uuid4(), name="acme", db_schema_name="tenant_acme")
+    key = ApiKey(id=uuid4(), tenant_id=tenant.id, key_prefix=prefix, key_hash="x")
+    return tenant, key
+
+
+async def _resolved(value):
+    return value
+
+
+def test_verified_result_is_cached():
+    cache = VerifiedKeyCache()
+    calls = 0
+
+    async def verify():
+        nonlocal calls
+        calls += 1
+        return _verified()
+
+    async def run():
+        first = await cache.get_or_verify("ns_abc123.secret", verify)
+        second = await cache.get_or_verify("ns_abc123.secret", verify)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert calls == 1
+    assert first == second
+    assert cache.contains("ns_abc123.secret")
+
+
+def test_result_verified_before_an_invalidation_is_not_stored():
+    cache = VerifiedKeyCache()
+
+    async def verify():
+        # The key is revoked while its (pre-revocation) verification is in flight.
+        cache.invalidate_prefix("ns_abc123")
+        return _verified()
+
+    tenant, key = asyncio.run(cache.get_or_verify("ns_abc123.secret", verify))
+    assert key.key_prefix == "ns_abc123"
+    assert not cache.contains("ns_abc123.secret")
+    assert len(cache) == 0
+
+
+def test_invalidation_drops_only_matching_entries():
+    cache = VerifiedKeyCache()
+
+    async def run():
+        await cache.get_or_verify("ns_aaa.secret", lambda: _resolved(_verified("ns_aaa")))
+        await cache.get_or_verify("ns_bbb.secret", lambda: _resolved(_verified("ns_bbb")))
+
+    asyncio.run(run())
+    assert cache.invalidate_prefix("ns_aaa") == 1
+    assert not cache.contains("ns_aaa.secret")
+    assert cache.contains("ns_bbb.secret")
+
+
+def test_contains_ignores_entries_of_expired_keys():
+    cache = VerifiedKeyCache(ttl_s=60)
+    tenant, key = _verified()
+    key.expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+    asyncio.run(cache.get_or_verify("ns_abc123.secret", lambda: _resolved((tenant, key))))
+    assert cache.contains("ns_abc123.secret")
+
+    key.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    assert not cache.contains("ns_abc123.secret")
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("psycopg")
+pytest.importorskip("confy")
+
+from sqlalchemy import create_engine, insert, text  # noqa: E402
+
+from noosphera.db.models.tenant_chat import TENANT_SCHEMA, ChatMessage  # noqa: E402
+from noosphera.repositories.chat_repository import session_messages_query  # noqa: E402
+
+# The keyset query only needs row-value comparisons, which SQLite has too.
+_OPTS = {"schema_translate_map": {TENANT_SCHEMA: None}}
+
+
+@pytest.fixture
+def conn():
+    engine = create_engine("sqlite://")
+    with engine.begin() as c:
+        c.execute(
+            text(
+                "CREATE TABLE chat_messages (id CHAR(32) PRIMARY KEY, session_id CHAR(32), role TEXT, "
+                "content TEXT, meta TEXT, token_count INTEGER, token_counter TEXT, created_at DATETIME)"
+            )
+        )
+        yield c
+
+
+@pytest.fixture
+def session(conn):
+    sid, t0 = uuid4(), datetime(2024, 1, 1, tzinfo=timezone.utc)
+    ids = [uuid4() for _ in range(5)]
+    for i, mid in enumerate(ids):
+        conn.execute(
+            insert(ChatMessage).values(
+                id=mid, session_id=sid, role="user", content=str(i), created_at=t0 + timedelta(minutes=i)
+            ),
+            execution_options=_OPTS,
+        )
+    return sid, ids
+
+
+def _contents(conn, query):
+    return [row[2] for row in conn.execute(query, execution_options=_OPTS)]
+
+
+def test_before_pages_back_from_that_message(conn, session):
+    sid, ids = session
+    assert _contents(conn, session_messages_query(sid, 10, before=ids[3])) == ["2", "1", "0"]
+
+
+def test_unknown_before_returns_the_newest_page(conn, session):
+    sid, _ = session
+    assert _contents(conn, session_messages_query(sid, 2, before=uuid4())) == ["4", "3", "2"]
+
+
+def test_after_position_pages_back(conn, session):
+    sid, ids = session
+    position = (datetime(2024, 1, 1, 0, 2, tzinfo=timezone.utc), ids[2])
+    assert _contents(conn, session_messages_query(sid, 10, after=position)) == ["1", "0"]